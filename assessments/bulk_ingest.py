@@ -0,0 +1,288 @@
+#assessments/bulk_ingest.py
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from collections import Counter
+import csv
+import json
+import time
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from books.services import BookAccessService
+from .gift_calculator import GiftCalculator
+from .gift_catalog import EMPTY_ROLES
+from .models import Assessment, GiftProfile
+from .question_bank import compact_answers
+from .result_cache import LATEST_RESULTS_KEY
+from .wire_format import MAX_ANSWER, MIN_ANSWER, decode_answers
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/json-lines')
+CSV_TYPES = ('text/csv', 'application/csv')
+
+
+class IngestError(ValueError):
+    """A row that can't be imported; reported back and the import continues"""
+
+
+def detect_format(content_type: str = '', filename: str = '', explicit: Optional[str] = None) -> str:
+    """ndjson or csv, from ?format=, the upload's file name or its content type"""
+    if explicit:
+        if explicit not in (NDJSON, CSV):
+            raise ValueError(f"Unsupported format: {explicit}")
+        return explicit
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if filename.lower().endswith('.csv') or content_type in CSV_TYPES:
+        return CSV
+    if filename.lower().endswith(('.ndjson', '.jsonl')) or content_type in NDJSON_TYPES:
+        return NDJSON
+    raise ValueError("Send NDJSON (application/x-ndjson) or CSV (text/csv)")
+
+
+def iter_lines(stream: Iterable[bytes]) -> Iterator[str]:
+    """Decoded lines of an upload, read as they arrive"""
+    first = True
+    for line in stream:
+        if isinstance(line, bytes):
+            try:
+                line = line.decode('utf-8-sig' if first else 'utf-8')
+            except UnicodeDecodeError:
+                raise IngestError("The upload is not UTF-8 text")
+        elif first:
+            line = line.lstrip('\ufeff')
+        first = False
+        yield line
+
+
+def iter_ndjson(lines: Iterable[str]) -> Iterator[Tuple[int, Dict]]:
+    """
+    (row number, row) per non-blank line. A row is an object with "user"
+    (id, username or email) and "answers": [{question_id, answer}, ...],
+    or one 1-5 value per question in bank order, or "packed" (see
+    wire_format). Malformed lines come back as IngestError rows.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, IngestError(f"Invalid JSON: {str(e)}")
+            continue
+        if not isinstance(row, dict):
+            yield number, IngestError("Each line must be a JSON object")
+            continue
+        yield number, row
+
+
+def iter_csv(lines: Iterable[str]) -> Iterator[Tuple[int, Dict]]:
+    """
+    Rows of a CSV whose header is "user", an optional "counselor_notes",
+    then one column per question id. Blank cells are unanswered questions.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if not header or header[0].strip().lower() != 'user':
+        raise IngestError('The CSV header must start with a "user" column')
+
+    columns = []
+    for name in header[1:]:
+        name = name.strip()
+        if name.lower() == 'counselor_notes':
+            columns.append(name.lower())
+            continue
+        try:
+            columns.append(int(name))
+        except ValueError:
+            raise IngestError(f"CSV column {name!r} is not a question id")
+
+    for number, cells in enumerate(reader, start=2):
+        if not any(cell.strip() for cell in cells):
+            continue
+        row = {'user': cells[0].strip(), 'answers': []}
+        for column, cell in zip(columns, cells[1:]):
+            cell = cell.strip()
+            if column == 'counselor_notes':
+                row['counselor_notes'] = cell
+            elif cell:
+                row['answers'].append({'question_id': column, 'answer': cell})
+        yield number, row
+
+
+def row_answers(row: Dict, question_bank) -> List[Dict]:
+    """Calculator answers for one row, checked against the question bank"""
+    try:
+        if 'packed' in row:
+            return decode_answers(question_bank, packed=row['packed'])
+        answers = row.get('answers')
+        if not answers:
+            raise IngestError("No answers provided")
+        if all(isinstance(answer, int) for answer in answers):
+            return decode_answers(question_bank, answers=answers)
+        answers = compact_answers(answers)
+        question_bank.rows_for(answer['question_id'] for answer in answers)
+    except (KeyError, TypeError, ValueError) as e:
+        raise IngestError(f"Invalid answers: {str(e)}")
+    if any(not MIN_ANSWER <= answer['answer'] <= MAX_ANSWER for answer in answers):
+        raise IngestError(f"Answers must be between {MIN_ANSWER} and {MAX_ANSWER}")
+    return answers
+
+
+class BulkIngest:
+    """
+    Imports paper assessments for a counselor's users: rows are read
+    incrementally, scored chunk_size at a time as one matrix batch, and
+    each chunk's Assessment, GiftProfile and book-access rows are written
+    in one transaction. run() yields one result dict per row as each
+    chunk commits, then a summary.
+    """
+
+    def __init__(self, counselor, question_bank, chunk_size: int = 500):
+        self.counselor = counselor
+        self.question_bank = question_bank
+        self.chunk_size = chunk_size
+        self.calculator = GiftCalculator()
+        self.created = 0
+        self.errors = 0
+
+    def run(self, rows: Iterator[Tuple[int, Dict]]) -> Iterator[Dict]:
+        started = time.perf_counter()
+        rows_seen = 0
+        chunk = []
+        try:
+            for number, row in rows:
+                rows_seen += 1
+                chunk.append((number, row))
+                if len(chunk) >= self.chunk_size:
+                    yield from self.process_chunk(chunk)
+                    chunk = []
+        except IngestError as e:
+            # The upload itself is unreadable (e.g. a bad CSV header)
+            yield from self.process_chunk(chunk)
+            chunk = []
+            self.errors += 1
+            yield {'row': None, 'status': 'error', 'error': str(e)}
+        yield from self.process_chunk(chunk)
+
+        yield {'summary': {
+            'rows': rows_seen,
+            'created': self.created,
+            'errors': self.errors,
+            'seconds': round(time.perf_counter() - started, 3),
+        }}
+
+    def resolve_users(self, references) -> Dict[str, object]:
+        """The counselor's users named by id, username or email, in one query"""
+        User = get_user_model()
+        ids = [int(ref) for ref in references if ref.isdigit()]
+        names = [ref for ref in references if not ref.isdigit()]
+        users = User.objects.filter(
+            id__in=self.counselor.counseled_users.values('user')
+        ).filter(Q(id__in=ids) | Q(username__in=names) | Q(email__in=names))
+
+        resolved = {}
+        for user in users:
+            for key in (str(user.id), user.username, user.email):
+                resolved.setdefault(key, user)
+        return resolved
+
+    def process_chunk(self, chunk: List[Tuple[int, Dict]]) -> Iterator[Dict]:
+        if not chunk:
+            return
+        results: Dict[int, Dict] = {}
+        valid = []
+        users = self.resolve_users({
+            str(row.get('user', '')).strip() for _, row in chunk if isinstance(row, dict)
+        })
+        for number, row in chunk:
+            try:
+                if isinstance(row, IngestError):
+                    raise row
+                user = users.get(str(row.get('user', '')).strip())
+                if user is None:
+                    raise IngestError(f"Unknown user {row.get('user')!r} for this counselor")
+                valid.append((number, row, user, row_answers(row, self.question_bank)))
+            except IngestError as e:
+                results[number] = {'row': number, 'status': 'error', 'error': str(e)}
+
+        if valid:
+            try:
+                results.update(self.write(valid))
+            except Exception as e:
+                for number, row, _, _ in valid:
+                    results[number] = {'row': number, 'status': 'error', 'error': f"Import failed: {str(e)}"}
+
+        for number, _ in chunk:
+            result = results[number]
+            if result['status'] == 'created':
+                self.created += 1
+            else:
+                self.errors += 1
+            yield result
+
+    def write(self, valid) -> Dict[int, Dict]:
+        """Score a chunk as one batch and store it in one transaction"""
+        calculator = self.calculator
+        catalog = calculator.catalog
+        all_scores = calculator.calculate_scores_batch(
+            [answers for _, _, _, answers in valid], question_bank=self.question_bank
+        )
+        selections = calculator.identify_gifts_batch(all_scores, threshold_factor=0.80)
+        now = timezone.now()
+
+        assessments, profiles = [], []
+        for (number, row, user, answers), scores, (primary_gift, secondary_gifts) in zip(valid, all_scores, selections):
+            # Same results_data as a counselor's submit_response
+            assessments.append(Assessment(
+                user=user,
+                completion_status=True,
+                results_data={
+                    'scores': scores,
+                    'primary_gift': primary_gift,
+                    'secondary_gifts': secondary_gifts,
+                    'descriptions': catalog.descriptions(primary_gift, secondary_gifts),
+                    'recommended_roles': {k: list(v) for k, v in EMPTY_ROLES.items()},
+                    'answers': answers,
+                },
+                counselor=self.counselor,
+                counselor_notes=row.get('counselor_notes', ''),
+                is_counselor_session=True,
+                session_date=now,
+            ))
+
+        with transaction.atomic():
+            Assessment.objects.bulk_create(assessments)
+            for assessment in assessments:
+                profile = GiftProfile(
+                    user=assessment.user,
+                    assessment=assessment,
+                    primary_gift=assessment.results_data['primary_gift'],
+                    secondary_gifts=assessment.results_data['secondary_gifts'],
+                    scores=assessment.results_data['scores'],
+                )
+                profile.materialize()  # bulk_create skips save()
+                profiles.append(profile)
+            GiftProfile.objects.bulk_create(profiles)
+            BookAccessService.grant_gift_based_access_bulk(profiles)
+            Assessment.record_completions(Counter(assessment.user_id for assessment in assessments))
+
+        # bulk_create skips the signals that normally drop cached dashboards
+        cache.delete_many([
+            LATEST_RESULTS_KEY.format(user_id=user_id)
+            for user_id in {assessment.user_id for assessment in assessments}
+        ])
+        return {
+            number: {
+                'row': number,
+                'status': 'created',
+                'user_id': assessment.user_id,
+                'assessment_id': assessment.id,
+                'primary_gift': assessment.results_data['primary_gift'],
+                'secondary_gifts': assessment.results_data['secondary_gifts'],
+            }
+            for (number, _, _, _), assessment in zip(valid, assessments)
+        }
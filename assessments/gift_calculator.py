@@ -2,6 +2,11 @@
 
 from typing import Dict, List, Tuple
 import json
+import numpy as np
+from .scoring import ScoringEngine
+from .gift_catalog import GiftCatalog
+from .instrumentation import configure_from_env
+from users.ministry_roles import MINISTRY_ROLE_MAPPINGS
 
 class GiftCalculator:
     # Define motivational gifts and their descriptions from Romans 12:6-8
@@ -150,72 +155,72 @@ class GiftCalculator:
         }
     }
 
+    # Shared vectorized kernel; gift order follows MOTIVATIONAL_GIFTS
+    engine = ScoringEngine(tuple(MOTIVATIONAL_GIFTS))
+
+    # Names, descriptions, roles and result JSON, indexed once at import
+    catalog = GiftCatalog(MOTIVATIONAL_GIFTS, MINISTRY_ROLE_MAPPINGS)
+
+    # Set by instrumentation.instrument(); None means the methods are unwrapped
+    instrumentation = None
+
     def __init__(self):
         self.gift_scores = {gift: 0.0 for gift in self.MOTIVATIONAL_GIFTS.keys()}
         self.total_questions = 0
 
-    def calculate_scores(self, answers: List[Dict]) -> Dict[str, float]:
-        """Calculate motivational gift scores based on assessment answers"""
-        # Initialize scores
-        raw_scores = {gift: 0.0 for gift in self.MOTIVATIONAL_GIFTS.keys()}
-        max_possible_scores = {gift: 0.0 for gift in self.MOTIVATIONAL_GIFTS.keys()}
-        
-        # Calculate raw scores and maximum possible scores
-        for answer in answers:
-            score = answer['answer']  # Score is 1-5
-            correlations = answer['gift_correlation']
-            
-            for gift, correlation in correlations.items():
-                if gift in raw_scores:
-                    raw_scores[gift] += score * correlation
-                    # Track maximum possible score for each gift
-                    max_possible_scores[gift] += 5 * correlation  # 5 is max answer value
+    def _compile(self, answers: List[Dict], question_bank=None) -> np.ndarray:
+        """Correlation matrix for a list of answers, from the bank when given"""
+        if question_bank is not None:
+            # Correlations come from the server-side bank, never the client
+            return question_bank.matrix_for(answer['question_id'] for answer in answers)
+        return self.engine.compile_correlations(
+            answer['gift_correlation'] for answer in answers
+        )
 
-        # Normalize scores relative to their individual maximum possible scores
-        normalized_scores = {}
-        for gift in raw_scores:
-            if max_possible_scores[gift] > 0:
-                normalized_scores[gift] = raw_scores[gift] / max_possible_scores[gift]
-            else:
-                normalized_scores[gift] = 0.0
+    def calculate_scores(self, answers: List[Dict], question_bank=None) -> Dict[str, float]:
+        """Calculate motivational gift scores based on assessment answers"""
+        # Compile the answers' correlations into a dense (questions x gifts)
+        # matrix and score them in one vectorized pass
+        matrix = self._compile(answers, question_bank)
+        values = np.fromiter(
+            (answer['answer'] for answer in answers),  # Score is 1-5
+            dtype=np.float64,
+            count=len(answers)
+        )
+        return self.engine.score(values, matrix)
 
-        # Convert to percentages that sum to 1 (100%) with higher precision
-        total = sum(normalized_scores.values())
-        if total > 0:
-            final_scores = {}
-            running_total = 0
-            
-            # Sort gifts by score for consistent rounding
-            sorted_gifts = sorted(normalized_scores.items(), key=lambda x: x[1], reverse=True)
-            
-            # Process all but the last gift
-            for gift, score in sorted_gifts[:-1]:
-                percentage = score / total
-                # Increase precision to 4 decimal places
-                rounded_score = round(percentage, 4)
-                final_scores[gift] = rounded_score
-                running_total += rounded_score
-            
-            # Last gift gets the remaining percentage to ensure sum is exactly 1
-            last_gift = sorted_gifts[-1][0]
-            final_scores[last_gift] = round(1 - running_total, 4)
-            
-            # Sort back to original order
-            final_scores = dict(sorted(final_scores.items()))
-        else:
-            # Fallback to equal distribution if all scores are 0
-            equal_share = round(1.0 / len(normalized_scores), 4)
-            final_scores = {gift: equal_share for gift in normalized_scores}
+    def calculate_scores_batch(self, answer_sets: List[List[Dict]], question_bank=None) -> List[Dict[str, float]]:
+        """Calculate scores for many respondents in one vectorized pass"""
+        # Respondents who answered the same questions in the same order share a
+        # correlation matrix and are scored as one (N x Q) by (Q x 7) product.
+        # Without a bank the correlations come with each answer set, so they
+        # are part of the signature too.
+        groups = {}
+        for position, answers in enumerate(answer_sets):
+            signature = tuple(answer.get('question_id') for answer in answers)
+            if None in signature:
+                signature = ('unkeyed', position)  # Can't share a matrix without ids
+            elif question_bank is None:
+                signature += tuple(
+                    tuple(sorted(answer['gift_correlation'].items())) for answer in answers
+                )
+            groups.setdefault(signature, []).append(position)
 
-        return final_scores
+        results = [None] * len(answer_sets)
+        for positions in groups.values():
+            template = answer_sets[positions[0]]
+            matrix = self._compile(template, question_bank)
+            values = np.array(
+                [[answer['answer'] for answer in answer_sets[p]] for p in positions],
+                dtype=np.float64
+            ).reshape(len(positions), len(template))
+            _, scores = self.engine.score_batch(values, matrix)
+            for position, score in zip(positions, scores):
+                results[position] = score
+        return results
 
     def identify_gifts(self, scores: Dict[str, float], threshold_factor: float = 0.80) -> Tuple[str, List[str]]:
         """Identify primary and secondary gifts based on scores"""
-        # Debug print to show the precise scores
-        print("Debug - Gift scores with high precision:")
-        for gift, score in sorted(scores.items(), key=lambda x: x[1], reverse=True):
-            print(f"  {gift}: {score:.4f}")
-            
         # Sort gifts by score
         sorted_gifts = sorted(
             scores.items(),
@@ -226,8 +231,6 @@ class GiftCalculator:
         # Primary gift is the highest score
         primary_gift = sorted_gifts[0][0]
         highest_score = sorted_gifts[0][1]
-        
-        print(f"Debug - Primary gift selected: {primary_gift} with score {highest_score:.4f}")
 
         # Calculate threshold for secondary gifts
         threshold = highest_score * threshold_factor
@@ -245,37 +248,74 @@ class GiftCalculator:
             secondary_gifts = secondary_gifts[:2]
 
         # Return the gift names without any parenthetical content
+        short_names = self.catalog.short_names
         return (
-            self.MOTIVATIONAL_GIFTS[primary_gift]['name'].split('(')[0].strip(),
-            [self.MOTIVATIONAL_GIFTS[gift]['name'].split('(')[0].strip() 
-             for gift in secondary_gifts]
+            short_names[primary_gift],
+            [short_names[gift] for gift in secondary_gifts]
+        )
+
+    def identify_gifts_batch(self, scores: List[Dict[str, float]], threshold_factor: float = 0.80) -> List[Tuple[str, List[str]]]:
+        """Identify primary and secondary gifts for many score sets at once"""
+        keys = self.engine.sorted_keys
+        if not scores:
+            return []
+        shares = np.array([[score[gift] for gift in keys] for score in scores], dtype=np.float64)
+        names = [self.catalog.short_names[gift] for gift in keys]
+        return [
+            (names[primary], [names[column] for column in secondary])
+            for primary, secondary in self.engine.select_gifts_batch(shares, threshold_factor)
+        ]
+
+    def answer_sensitivity(self, answers: List[Dict], question_bank=None, threshold_factor: float = 0.80) -> Dict:
+        """What-if view of a result: the scores and primary gift for every
+        single-answer change (each question x each value 1-5), scored as one
+        (Q*5 x Q) batch rather than Q*5 calculator calls"""
+        matrix = self._compile(answers, question_bank)
+        values = np.fromiter(
+            (answer['answer'] for answer in answers),
+            dtype=np.float64,
+            count=len(answers)
         )
+        engine = self.engine
+        shares, scores = engine.score_batch(engine.single_answer_variants(values), matrix)
+        names = [self.catalog.short_names[gift] for gift in engine.sorted_keys]
+        primaries = [names[primary] for primary, _ in engine.select_gifts_batch(shares, threshold_factor)]
+
+        baseline_scores = engine.score(values, matrix)
+        primary_gift, secondary_gifts = self.identify_gifts(baseline_scores, threshold_factor)
+
+        questions = []
+        flips = 0
+        for position, answer in enumerate(answers):
+            block = range(position * engine.MAX_ANSWER, (position + 1) * engine.MAX_ANSWER)
+            variants = [
+                {'answer': row % engine.MAX_ANSWER + 1, 'primary_gift': primaries[row], 'scores': scores[row]}
+                for row in block
+            ]
+            flipping = [variant['answer'] for variant in variants if variant['primary_gift'] != primary_gift]
+            flips += len(flipping)
+            questions.append({
+                'question_id': answer.get('question_id'),
+                'answer': answer['answer'],
+                'flips_primary': flipping,
+                'variants': variants
+            })
+
+        # Share of the alternative answers that keep the primary gift
+        alternatives = len(answers) * (engine.MAX_ANSWER - 1)
+        return {
+            'scores': baseline_scores,
+            'primary_gift': primary_gift,
+            'secondary_gifts': secondary_gifts,
+            'stability': 1 - flips / alternatives if alternatives else 1.0,
+            'questions': questions
+        }
 
     def get_gift_descriptions(self, primary_gift: str, secondary_gifts: List[str]) -> Dict:
         """Get detailed descriptions for primary and secondary gifts"""
-        # Convert gift names to uppercase for consistent comparison
-        primary_gift = primary_gift.upper()
-        secondary_gifts = [gift.upper() for gift in secondary_gifts]
-        
-        # Find the key that matches the gift name (case-insensitive)
-        primary_key = next(k for k, v in self.MOTIVATIONAL_GIFTS.items() 
-                          if v['name'].upper().startswith(primary_gift))
-        secondary_keys = [next(k for k, v in self.MOTIVATIONAL_GIFTS.items() 
-                             if v['name'].upper().startswith(gift))
-                         for gift in secondary_gifts]
-        
-        return {
-            'primary': {
-                'gift': self.MOTIVATIONAL_GIFTS[primary_key]['name'],
-                'description': self.MOTIVATIONAL_GIFTS[primary_key]['description'],
-                'details': self.MOTIVATIONAL_GIFTS[primary_key]['details']
-            },
-            'secondary': [
-                {
-                    'gift': self.MOTIVATIONAL_GIFTS[key]['name'],
-                    'description': self.MOTIVATIONAL_GIFTS[key]['description'],
-                    'details': self.MOTIVATIONAL_GIFTS[key]['details']
-                }
-                for key in secondary_keys
-            ]
-        }
\ No newline at end of file
+        # Accepts keys, display names or short names in any case
+        return self.catalog.descriptions(primary_gift, secondary_gifts)
+
+
+# Stage timers and sampled traces, only when enabled for this deployment
+configure_from_env(GiftCalculator)
@@ -0,0 +1,168 @@
+#assessments/gift_catalog.py
+
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from itertools import permutations
+from types import MappingProxyType
+import json
+
+
+def _dumps(value) -> bytes:
+    # Same settings Starlette's JSONResponse uses, so bodies are byte-identical
+    return json.dumps(
+        value,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(',', ':')
+    ).encode('utf-8')
+
+
+EMPTY_ROLES = MappingProxyType({
+    'primary_roles': (),
+    'secondary_roles': (),
+    'ministry_areas': ()
+})
+
+
+class GiftCatalog:
+    """
+    Import-time index of everything about a gift result that doesn't depend
+    on the scores: display names, description records, role recommendations
+    and the serialized JSON for every (primary, secondaries) combination.
+
+    Gifts can be looked up by key ('PERCEPTION'), full display name
+    ('Perception (Prophecy)') or short name ('Perception'), in any case.
+    """
+
+    MAX_SECONDARY = 2
+
+    def __init__(self, gifts: Mapping[str, Mapping], role_mappings: Optional[Mapping] = None):
+        self.keys = tuple(gifts)
+        # Display name without any parenthetical content
+        self.short_names = MappingProxyType({
+            key: gift['name'].split('(')[0].strip() for key, gift in gifts.items()
+        })
+        self.records = MappingProxyType({
+            key: MappingProxyType({
+                'gift': gift['name'],
+                'description': gift['description'],
+                'details': gift['details']
+            })
+            for key, gift in gifts.items()
+        })
+        self._prefixes = tuple((gift['name'].upper(), key) for key, gift in gifts.items())
+
+        index = {}
+        for key, gift in gifts.items():
+            for variant in (key, gift['name'], self.short_names[key]):
+                index.setdefault(variant.upper(), key)
+        self._index = index
+
+        role_mappings = role_mappings or {}
+        self._role_mappings = {
+            name: (tuple(mapping['primary']), tuple(mapping['secondary']))
+            for name, mapping in role_mappings.items()
+        }
+
+        self._fragments = {}
+        self._roles = {}
+        self._roles_json = {}
+        for combination in self.combinations():
+            primary, secondary = combination
+            self._fragments[combination] = self._build_fragment(primary, secondary)
+            roles = self._build_roles(primary, secondary)
+            self._roles[combination] = roles
+            self._roles_json[combination] = _dumps({k: list(v) for k, v in roles.items()})
+        self._empty_roles_json = _dumps({k: list(v) for k, v in EMPTY_ROLES.items()})
+
+    def combinations(self) -> List[Tuple[str, Tuple[str, ...]]]:
+        """Every (primary, secondaries) pair identify_gifts can produce, by short name"""
+        names = [self.short_names[key] for key in self.keys]
+        combinations = []
+        for primary in names:
+            others = [name for name in names if name != primary]
+            for count in range(1, self.MAX_SECONDARY + 1):
+                for secondary in permutations(others, count):
+                    combinations.append((primary, secondary))
+        return combinations
+
+    def resolve(self, name: str) -> str:
+        """Gift key for a key, display name or name prefix"""
+        upper = name.upper()
+        key = self._index.get(upper)
+        if key is not None:
+            return key
+        # Uncommon spellings: keep the original prefix match as a fallback
+        for display_name, key in self._prefixes:
+            if display_name.startswith(upper):
+                return key
+        raise ValueError(f"Unknown gift: {name}")
+
+    def short_name(self, key: str) -> str:
+        return self.short_names[key]
+
+    def descriptions(self, primary_gift: str, secondary_gifts: Sequence[str]) -> Dict:
+        """Description records for a result, as fresh (mutable) dicts"""
+        return {
+            'primary': dict(self.records[self.resolve(primary_gift)]),
+            'secondary': [dict(self.records[self.resolve(gift)]) for gift in secondary_gifts]
+        }
+
+    def recommended_roles(self, primary_gift: str, secondary_gifts: Sequence[str]) -> Dict[str, List[str]]:
+        """Ministry role recommendations for a result"""
+        roles = self._roles.get((primary_gift, tuple(secondary_gifts)))
+        if roles is None:
+            roles = self._build_roles(primary_gift, secondary_gifts)
+        return {k: list(v) for k, v in roles.items()}
+
+    def result_json(self, scores: Mapping[str, float], primary_gift: str,
+                    secondary_gifts: Sequence[str], with_roles: bool = True) -> bytes:
+        """
+        Serialized gift result. Only the scores are encoded per call; the
+        descriptions and roles are looked up as ready-made bytes.
+        """
+        combination = (primary_gift, tuple(secondary_gifts))
+        fragment = self._fragments.get(combination)
+        if fragment is None:
+            fragment = self._build_fragment(primary_gift, secondary_gifts)
+        if not with_roles:
+            roles = self._empty_roles_json
+        else:
+            roles = self._roles_json.get(combination)
+            if roles is None:
+                roles = _dumps(self.recommended_roles(primary_gift, secondary_gifts))
+        return b''.join((
+            b'{"scores":', _dumps(scores), fragment,
+            b',"recommended_roles":', roles, b'}'
+        ))
+
+    def _build_fragment(self, primary_gift: str, secondary_gifts: Sequence[str]) -> bytes:
+        # Everything between the scores and the roles, without the braces
+        body = _dumps({
+            'primary_gift': primary_gift,
+            'secondary_gifts': list(secondary_gifts),
+            'descriptions': self.descriptions(primary_gift, secondary_gifts)
+        })
+        return b',' + body[1:-1]
+
+    def _build_roles(self, primary_gift: str, secondary_gifts: Sequence[str]) -> Mapping:
+        primary_roles, secondary_roles, ministry_areas = [], [], set()
+
+        if primary_gift in self._role_mappings:
+            primary, secondary = self._role_mappings[primary_gift]
+            primary_roles.extend(primary)
+            ministry_areas.update(secondary)
+
+        for gift in secondary_gifts:
+            if gift in self._role_mappings:
+                primary, secondary = self._role_mappings[gift]
+                # Top 2 primary roles from each secondary gift
+                secondary_roles.extend(primary[:2])
+                ministry_areas.update(secondary)
+
+        # Remove duplicates while preserving order
+        return MappingProxyType({
+            'primary_roles': tuple(dict.fromkeys(primary_roles)),
+            'secondary_roles': tuple(dict.fromkeys(secondary_roles)),
+            'ministry_areas': tuple(sorted(ministry_areas))
+        })
@@ -0,0 +1,151 @@
+#assessments/instrumentation.py
+
+from typing import Dict, Optional
+from functools import wraps
+import logging
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# GiftCalculator methods that get timed, and the stage each one reports as
+STAGES = {
+    'calculate_scores': 'scoring',
+    'calculate_scores_batch': 'scoring',
+    'identify_gifts': 'selection',
+    'identify_gifts_batch': 'selection',
+    'get_gift_descriptions': 'descriptions',
+    'answer_sensitivity': 'sensitivity',
+}
+
+# Methods that take a list of assessments; everything else handles one
+BATCH_METHODS = {'calculate_scores_batch', 'identify_gifts_batch'}
+
+
+class Instrumentation:
+    """
+    Stage timers, counters and sampled debug traces for the scoring path.
+
+    Nothing here runs unless instrument() has wrapped the calculator
+    methods, so a disabled deployment executes exactly the plain methods.
+    """
+
+    def __init__(self, sample_rate: float = 0.0):
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self.timings = {}   # stage -> [calls, total seconds, max seconds]
+        self.counters = {}
+
+    def record(self, stage: str, elapsed: float):
+        with self._lock:
+            timing = self.timings.get(stage)
+            if timing is None:
+                self.timings[stage] = [1, elapsed, elapsed]
+            else:
+                timing[0] += 1
+                timing[1] += elapsed
+                if elapsed > timing[2]:
+                    timing[2] = elapsed
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def sampled(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def trace(self, method: str, elapsed: float, args, result):
+        self.count('traces')
+        logger.debug(
+            "%s took %.3fms args=%r result=%r", method, elapsed * 1000, args, result
+        )
+
+    def snapshot(self) -> Dict:
+        """Point-in-time copy of all metrics"""
+        with self._lock:
+            return {
+                'stages': {
+                    stage: {
+                        'calls': calls,
+                        'total_seconds': total,
+                        'max_seconds': maximum,
+                        'mean_seconds': total / calls,
+                    }
+                    for stage, (calls, total, maximum) in self.timings.items()
+                },
+                'counters': dict(self.counters),
+            }
+
+    def export_prometheus(self, prefix: str = 'pathfinders_gifts') -> str:
+        """Metrics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            f'# TYPE {prefix}_stage_seconds summary',
+        ]
+        for stage, timing in sorted(snapshot['stages'].items()):
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {timing["calls"]}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {timing["total_seconds"]:.9f}')
+        lines.append(f'# TYPE {prefix}_stage_seconds_max gauge')
+        for stage, timing in sorted(snapshot['stages'].items()):
+            lines.append(f'{prefix}_stage_seconds_max{{stage="{stage}"}} {timing["max_seconds"]:.9f}')
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f'# TYPE {prefix}_{name}_total counter')
+            lines.append(f'{prefix}_{name}_total {value}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self.timings.clear()
+            self.counters.clear()
+
+
+def _wrap(method, name: str, stage: str, instrumentation: Instrumentation):
+    batch = name in BATCH_METHODS
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        result = method(self, *args, **kwargs)
+        elapsed = time.perf_counter() - start
+        instrumentation.record(stage, elapsed)
+        instrumentation.count(f'{name}_calls')
+        if stage == 'scoring':
+            answer_sets = args[0] if args else kwargs.get('answer_sets', ())
+            instrumentation.count('assessments_scored', len(answer_sets) if batch else 1)
+        if instrumentation.sampled():
+            instrumentation.trace(name, elapsed, args, result)
+        return result
+
+    wrapper.__wrapped_by_instrumentation__ = method
+    return wrapper
+
+
+def instrument(cls, instrumentation: Instrumentation) -> Instrumentation:
+    """Wrap the calculator's stage methods so they report to instrumentation"""
+    uninstrument(cls)
+    for name, stage in STAGES.items():
+        setattr(cls, name, _wrap(cls.__dict__[name], name, stage, instrumentation))
+    cls.instrumentation = instrumentation
+    return instrumentation
+
+
+def uninstrument(cls):
+    """Restore the plain, unwrapped methods"""
+    for name in STAGES:
+        original = getattr(cls.__dict__.get(name), '__wrapped_by_instrumentation__', None)
+        if original is not None:
+            setattr(cls, name, original)
+    cls.instrumentation = None
+
+
+def configure_from_env(cls) -> Optional[Instrumentation]:
+    """
+    Enable instrumentation when GIFT_INSTRUMENTATION is set.
+    GIFT_TRACE_SAMPLE_RATE (0-1) turns on sampled debug traces.
+    """
+    if os.getenv('GIFT_INSTRUMENTATION', 'False') != 'True':
+        return None
+    sample_rate = float(os.getenv('GIFT_TRACE_SAMPLE_RATE', '0'))
+    return instrument(cls, Instrumentation(sample_rate=sample_rate))
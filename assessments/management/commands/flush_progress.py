@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from assessments.progress_buffer import get_progress_buffer
+
+class Command(BaseCommand):
+    help = 'Write buffered progress deltas to their assessments (run from cron with a shared cache)'
+
+    def handle(self, *args, **options):
+        written = get_progress_buffer().flush_all()
+        self.stdout.write(self.style.SUCCESS(f"Flushed progress for {written} assessment(s)"))
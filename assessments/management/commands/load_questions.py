@@ -1,5 +1,19 @@
+import hashlib
+import json
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from assessments.models import Question
+from assessments.question_bank import (
+    artifact_path,
+    get_question_bank,
+    invalidate_question_bank,
+    load_artifact
+)
+
+def content_hash(category, weight, gift_correlation):
+    """Stable hash of the fields load_questions owns"""
+    content = json.dumps([category, float(weight), gift_correlation], sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
 
 class Command(BaseCommand):
     help = 'Load initial motivational gift assessment questions'
@@ -441,30 +455,45 @@ class Command(BaseCommand):
             }
         ]
 
-        created_count = 0
-        updated_count = 0
+        path = artifact_path()
+        previous = load_artifact(path)
+
+        existing = {}
+        for question in Question.objects.filter(text__in=[q['text'] for q in questions]).order_by('id'):
+            existing.setdefault(question.text, question)
 
+        # Rows are matched by text and only written when their content hash changed
+        to_create = []
+        to_update = []
         for q in questions:
-            obj, created = Question.objects.get_or_create(
-                text=q['text'],
-                defaults={
-                    'category': q['category'],
-                    'weight': q['weight'],
-                    'gift_correlation': q['gift_correlation']
-                }
-            )
-            if created:
-                created_count += 1
-            else:
-                # Update existing question
+            obj = existing.get(q['text'])
+            if obj is None:
+                to_create.append(Question(**q))
+            elif content_hash(obj.category, obj.weight, obj.gift_correlation) != content_hash(
+                    q['category'], q['weight'], q['gift_correlation']):
                 obj.category = q['category']
                 obj.weight = q['weight']
                 obj.gift_correlation = q['gift_correlation']
-                obj.save()
-                updated_count += 1
+                to_update.append(obj)
+
+        if to_create or to_update:
+            with transaction.atomic():
+                Question.objects.bulk_create(to_create)
+                Question.objects.bulk_update(to_update, ['category', 'weight', 'gift_correlation'])
+            # Bulk writes don't send post_save, so invalidate explicitly
+            invalidate_question_bank()
 
         self.stdout.write(
             self.style.SUCCESS(
-                f'Successfully loaded questions: {created_count} created, {updated_count} updated'
+                f'Successfully loaded questions: {len(to_create)} created, {len(to_update)} updated, '
+                f'{len(questions) - len(to_create) - len(to_update)} unchanged'
             )
-        )
\ No newline at end of file
+        )
+
+        # Compile the bank and write the artifact both services load at startup
+        bank = get_question_bank()
+        if previous is not None and previous.version == bank.version and path.exists():
+            self.stdout.write(f'Question bank {bank.version} unchanged at {path}')
+        else:
+            bank.save(path)
+            self.stdout.write(self.style.SUCCESS(f'Question bank {bank.version} written to {path}'))
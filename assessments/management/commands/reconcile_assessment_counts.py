@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+from users.models import User
+
+class Command(BaseCommand):
+    help = 'Recount completed assessments and repair drifted User.completed_assessments counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report drifted users without changing them')
+
+    def handle(self, *args, **options):
+        actual = User.objects.annotate(
+            actual=Count('assessment', filter=Q(assessment__completion_status=True))
+        ).values_list('id', 'completed_assessments', 'actual')
+        drifted = [(user_id, stored, count) for user_id, stored, count in actual if stored != count]
+
+        for user_id, stored, count in drifted:
+            self.stdout.write(f"User {user_id}: stored {stored}, actual {count}")
+
+        if drifted and not options['dry_run']:
+            with transaction.atomic():
+                for user_id, stored, count in drifted:
+                    # Skip a user whose counter moved since it was read
+                    User.objects.filter(pk=user_id, completed_assessments=stored).update(
+                        completed_assessments=count
+                    )
+
+        verb = 'would be repaired' if options['dry_run'] else 'repaired'
+        self.stdout.write(self.style.SUCCESS(f"{len(drifted)} counter(s) {verb}"))
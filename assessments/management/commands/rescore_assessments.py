@@ -0,0 +1,176 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from assessments.gift_calculator import GiftCalculator
+from assessments.models import Assessment, GiftProfile
+from assessments.question_bank import get_question_bank
+from assessments.rescoring import Checkpoint, init_worker, score_chunk
+from assessments.result_cache import LATEST_RESULTS_KEY
+from books.services import BookAccessService
+
+class InlineExecutor:
+    """Runs chunks in this process; used for --workers 1"""
+
+    def __init__(self, bank_payload):
+        init_worker(bank_payload)
+
+    def submit(self, fn, *args):
+        return _Done(fn(*args))
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+class _Done:
+    def __init__(self, value):
+        self.value = value
+
+    def result(self):
+        return self.value
+
+class Command(BaseCommand):
+    help = 'Re-score completed assessments against the current question bank'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Assessments read, scored and written per batch')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Scoring processes (1 scores in this process)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report how many primary gifts would change without writing')
+        parser.add_argument('--checkpoint',
+                            default=str(settings.BASE_DIR / '.rescore_checkpoint.json'),
+                            help='Progress file used to resume an interrupted run')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignore an existing checkpoint and start from the first assessment')
+
+    def handle(self, *args, **options):
+        bank = get_question_bank()
+        dry_run = options['dry_run']
+        chunk_size = options['chunk_size']
+
+        if dry_run or options['restart']:
+            checkpoint = Checkpoint(options['checkpoint'], bank.version)
+        else:
+            checkpoint = Checkpoint.load(options['checkpoint'], bank.version)
+            if checkpoint.last_id:
+                self.stdout.write(f'Resuming after assessment {checkpoint.last_id}')
+
+        assessments = Assessment.objects.filter(
+            completion_status=True,
+            id__gt=checkpoint.last_id
+        ).order_by('id').values_list('id', 'results_data__answers', 'results_data__primary_gift')
+
+        workers = max(1, options['workers'])
+        if workers == 1:
+            executor = InlineExecutor(bank.to_payload())
+        else:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=init_worker,
+                initargs=(bank.to_payload(),)
+            )
+
+        # Chunks complete in submission order, so the checkpoint only ever
+        # covers a contiguous prefix of ids
+        self.regranted = 0
+        in_flight = deque()
+        try:
+            chunk, previous = [], {}
+            for assessment_id, answers, primary_gift in assessments.iterator(chunk_size=chunk_size):
+                chunk.append((assessment_id, answers))
+                previous[assessment_id] = primary_gift
+                if len(chunk) >= chunk_size:
+                    in_flight.append((executor.submit(score_chunk, chunk), previous, chunk[-1][0]))
+                    chunk, previous = [], {}
+                    if len(in_flight) >= workers * 2:
+                        self.apply(*in_flight.popleft(), checkpoint, dry_run)
+            if chunk:
+                in_flight.append((executor.submit(score_chunk, chunk), previous, chunk[-1][0]))
+            while in_flight:
+                self.apply(*in_flight.popleft(), checkpoint, dry_run)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        verb = 'would change' if dry_run else 'changed'
+        self.stdout.write(self.style.SUCCESS(
+            f'Re-scored {checkpoint.processed} assessments against bank {bank.version}: '
+            f'{checkpoint.changed} primary gifts {verb}, {checkpoint.skipped} skipped '
+            f'(no stored answers or retired questions)'
+        ))
+        if not dry_run:
+            self.stdout.write(f'Book access re-granted for {self.regranted} users whose latest gifts changed')
+        if not dry_run:
+            checkpoint.clear()
+
+    def apply(self, future, previous, last_id, checkpoint, dry_run):
+        """Write one scored chunk and advance the checkpoint past it"""
+        rows, skipped = future.result()
+        changed = sum(1 for assessment_id, _, primary_gift, _ in rows
+                      if previous[assessment_id] != primary_gift)
+
+        if not dry_run and rows:
+            self.regranted += self.write_rows(rows)
+
+        checkpoint.last_id = last_id
+        checkpoint.processed += len(rows)
+        checkpoint.changed += changed
+        checkpoint.skipped += len(skipped)
+        if not dry_run:
+            checkpoint.save()
+        self.stdout.write(f'  through assessment {last_id}: {checkpoint.processed} re-scored')
+
+    def write_rows(self, rows):
+        """
+        Write re-scored results and their gift profiles, re-granting book
+        access in the same transaction for users whose latest profile's
+        gifts changed. Returns how many users were re-granted.
+        """
+        catalog = GiftCalculator.catalog
+        results = {assessment_id: (scores, primary_gift, secondary_gifts)
+                   for assessment_id, scores, primary_gift, secondary_gifts in rows}
+
+        with transaction.atomic():
+            assessments = list(Assessment.objects.filter(id__in=results).only('id', 'user_id', 'results_data'))
+            for assessment in assessments:
+                scores, primary_gift, secondary_gifts = results[assessment.id]
+                assessment.results_data.update({
+                    'scores': scores,
+                    'primary_gift': primary_gift,
+                    'secondary_gifts': secondary_gifts,
+                    'descriptions': catalog.descriptions(primary_gift, secondary_gifts)
+                })
+            Assessment.objects.bulk_update(assessments, ['results_data'])
+
+            profiles = list(GiftProfile.objects.filter(assessment_id__in=results))
+            changed = set()
+            for profile in profiles:
+                gifts = (profile.primary_gift, profile.secondary_gifts)
+                profile.scores, profile.primary_gift, profile.secondary_gifts = results[profile.assessment_id]
+                profile.materialize()
+                if gifts != (profile.primary_gift, profile.secondary_gifts):
+                    changed.add(profile.id)
+            GiftProfile.objects.bulk_update(
+                profiles,
+                ['scores', 'primary_gift', 'secondary_gifts', 'description_keys', 'recommended_roles']
+            )
+
+            # Access follows each user's latest profile, so only re-grant
+            # where that one changed
+            latest = {}
+            for profile in GiftProfile.objects.filter(
+                user_id__in={profile.user_id for profile in profiles if profile.id in changed}
+            ).order_by('timestamp', 'id'):
+                latest[profile.user_id] = profile
+            regrant = [profile for profile in latest.values() if profile.id in changed]
+            BookAccessService.grant_gift_based_access_bulk(regrant)
+
+        # bulk_update skips the signals that normally drop cached dashboards
+        cache.delete_many([
+            LATEST_RESULTS_KEY.format(user_id=user_id)
+            for user_id in {assessment.user_id for assessment in assessments}
+        ])
+        return len(regrant)
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def materialize_existing(apps, schema_editor):
+    """Backfill description keys and roles for profiles saved before this migration"""
+    from assessments.gift_calculator import GiftCalculator
+
+    GiftProfile = apps.get_model('assessments', 'GiftProfile')
+    catalog = GiftCalculator.catalog
+    batch = []
+    for profile in GiftProfile.objects.only('id', 'primary_gift', 'secondary_gifts').iterator(chunk_size=2000):
+        keys = []
+        for gift in [profile.primary_gift, *profile.secondary_gifts]:
+            try:
+                keys.append(catalog.resolve(gift))
+            except ValueError:
+                pass
+        profile.description_keys = keys
+        profile.recommended_roles = catalog.recommended_roles(profile.primary_gift, profile.secondary_gifts)
+        batch.append(profile)
+        if len(batch) >= 2000:
+            GiftProfile.objects.bulk_update(batch, ['description_keys', 'recommended_roles'])
+            batch = []
+    if batch:
+        GiftProfile.objects.bulk_update(batch, ['description_keys', 'recommended_roles'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='giftprofile',
+            name='description_keys',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='giftprofile',
+            name='recommended_roles',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddIndex(
+            model_name='giftprofile',
+            index=models.Index(fields=['user', '-timestamp'], name='giftprofile_user_latest'),
+        ),
+        migrations.RunPython(materialize_existing, migrations.RunPython.noop),
+    ]
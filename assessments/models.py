@@ -3,6 +3,11 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from users.models import User
+from .gift_calculator import GiftCalculator
+
+def assessment_limit() -> int:
+    """How many completed assessments a user may have"""
+    return getattr(settings, 'ASSESSMENT_LIMIT', 3)
 
 class Assessment(models.Model):
     title = models.CharField(max_length=200, default="Default Assessment Title")
@@ -52,12 +57,24 @@ class Assessment(models.Model):
     
     @staticmethod
     def has_reached_limit(user):
-        """Check if a user has reached the maximum number of assessments (3)"""
-        assessments_count = Assessment.objects.filter(
-            user=user, 
-            completion_status=True
-        ).count()
-        return assessments_count >= 3
+        """Check if a user has reached the maximum number of assessments (ASSESSMENT_LIMIT)"""
+        # Read from the user's maintained counter rather than a COUNT query
+        return user.completed_assessments >= assessment_limit()
+
+    @staticmethod
+    def record_completions(counts):
+        """
+        Add newly completed assessments to users' counters, {user_id: n},
+        in one UPDATE. Call it inside the transaction that completes them.
+        """
+        counts = {user_id: n for user_id, n in counts.items() if n}
+        if not counts:
+            return
+        User.objects.filter(pk__in=counts).update(completed_assessments=models.F('completed_assessments') + models.Case(
+            *[models.When(pk=user_id, then=models.Value(n)) for user_id, n in counts.items()],
+            default=models.Value(0),
+            output_field=models.PositiveIntegerField()
+        ))
 
 class Question(models.Model):
     assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, null=True, blank=True)
@@ -77,14 +94,50 @@ class GiftProfile(models.Model):
     primary_gift = models.CharField(max_length=100)
     secondary_gifts = models.JSONField()
     scores = models.JSONField()
+    # Derived once at write time; a result never changes after submission
+    description_keys = models.JSONField(default=list)  # [primary key, *secondary keys]
+    recommended_roles = models.JSONField(default=dict)
     timestamp = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['user', '-timestamp'], name='giftprofile_user_latest'),
+        ]
         
     def __str__(self):
         return f"Gift Profile for {self.user.username}"
 
+    def save(self, *args, **kwargs):
+        if not self.description_keys:
+            self.materialize()
+        super().save(*args, **kwargs)
+
+    def materialize(self):
+        """Fill in description keys and role recommendations from the gifts"""
+        catalog = GiftCalculator.catalog
+        keys = []
+        for gift in [self.primary_gift, *self.secondary_gifts]:
+            try:
+                keys.append(catalog.resolve(gift))
+            except ValueError:
+                pass  # Legacy rows may name gifts outside the current set
+        self.description_keys = keys
+        self.recommended_roles = catalog.recommended_roles(self.primary_gift, self.secondary_gifts)
+
+    def get_descriptions(self):
+        """Gift descriptions for this result, looked up from the stored keys"""
+        if not self.description_keys:
+            self.materialize()
+        if not self.description_keys:
+            return {'primary': {}, 'secondary': []}
+        records = GiftCalculator.catalog.records
+        primary, *secondary = self.description_keys
+        return {
+            'primary': dict(records[primary]),
+            'secondary': [dict(records[key]) for key in secondary]
+        }
+
 class AssessmentResult(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE)
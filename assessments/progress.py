@@ -0,0 +1,183 @@
+#assessments/progress.py
+
+from typing import Dict, Iterable, List, Mapping, Optional
+from django.utils import timezone
+import numpy as np
+from .gift_calculator import GiftCalculator
+from .question_bank import CompiledQuestionBank, get_question_bank
+
+
+class ScoreAccumulator:
+    """
+    Running raw and max-possible sums per gift for an in-progress assessment.
+
+    Each save_progress call only applies the answers that were added,
+    changed or removed since the last save, so a provisional result is
+    available at any point. Totals are rebuilt from the stored answers
+    whenever the question bank version changes. Incremental updates can
+    differ from a full rescore in the last floating-point bit, so they
+    only ever back provisional results; final scores are a full rescore.
+    """
+
+    def __init__(self, bank_version: str, answers: Dict[int, int],
+                 raw: np.ndarray, maximum: np.ndarray):
+        self.bank_version = bank_version
+        self.answers = answers
+        self.raw = raw
+        self.maximum = maximum
+
+    @classmethod
+    def empty(cls, bank: CompiledQuestionBank) -> 'ScoreAccumulator':
+        width = len(bank.gifts)
+        return cls(bank.version, {}, np.zeros(width), np.zeros(width))
+
+    @classmethod
+    def from_state(cls, state: Optional[Mapping], bank: CompiledQuestionBank) -> 'ScoreAccumulator':
+        """Restore from results_data, rebuilding if it was built on another bank"""
+        if not state:
+            return cls.empty(bank)
+        answers = {int(question_id): int(value) for question_id, value in state['answers'].items()}
+        if state.get('bank_version') != bank.version:
+            accumulator = cls.empty(bank)
+            # Questions dropped from the new bank no longer count
+            accumulator.update(bank, {q: v for q, v in answers.items() if q in bank})
+            return accumulator
+        return cls(
+            bank.version,
+            answers,
+            np.asarray(state['raw'], dtype=np.float64),
+            np.asarray(state['max'], dtype=np.float64)
+        )
+
+    def to_state(self) -> Dict:
+        return {
+            'bank_version': self.bank_version,
+            'answers': {str(question_id): value for question_id, value in self.answers.items()},
+            'raw': self.raw.tolist(),
+            'max': self.maximum.tolist(),
+        }
+
+    def update(self, bank: CompiledQuestionBank, answers: Mapping[int, int], replace: bool = False) -> int:
+        """
+        Apply answers (question_id -> value). With replace=True, answers
+        missing from the mapping are treated as withdrawn. Returns the
+        number of questions whose contribution changed.
+        """
+        deltas = {}
+        added = {}
+        for question_id, value in answers.items():
+            previous = self.answers.get(question_id)
+            if previous == value:
+                continue
+            if previous is None:
+                added[question_id] = 1
+            deltas[question_id] = value - (previous or 0)
+        if replace:
+            for question_id in self.answers.keys() - answers.keys():
+                deltas[question_id] = -self.answers[question_id]
+                added[question_id] = -1
+
+        if deltas:
+            rows = bank.matrix[bank.rows_for(deltas)]
+            self.raw = self.raw + (np.fromiter(deltas.values(), dtype=np.float64)[:, None] * rows).sum(axis=0)
+            if added:
+                added_rows = bank.matrix[bank.rows_for(added)]
+                counts = np.fromiter(added.values(), dtype=np.float64)[:, None]
+                self.maximum = self.maximum + (
+                    counts * GiftCalculator.engine.MAX_ANSWER * added_rows
+                ).sum(axis=0)
+
+            for question_id, delta in deltas.items():
+                if added.get(question_id) == -1:
+                    del self.answers[question_id]
+                else:
+                    self.answers[question_id] = answers[question_id]
+        return len(deltas)
+
+    def covers(self, answers: Iterable[Mapping]) -> bool:
+        """True if the accumulated answers are exactly the submitted ones"""
+        submitted = {int(a['question_id']): int(a['answer']) for a in answers}
+        return submitted == self.answers
+
+    def scores(self) -> Dict[str, float]:
+        """Normalized 4-decimal shares from the running totals"""
+        engine = GiftCalculator.engine
+        return engine.finalize(engine.normalize(self.raw, self.maximum))
+
+
+def answer_map(answers: Iterable[Mapping]) -> Dict[int, int]:
+    """question_id -> answer for a list of submitted answers, skipping blanks"""
+    mapping = {}
+    for answer in answers:
+        value = answer.get('answer')
+        if value in (None, '', 0):
+            continue  # Unanswered questions are sent as 0 by the counselor UI
+        if not (1 <= int(value) <= 5):
+            raise ValueError("Answers must be between 1 and 5")
+        mapping[int(answer['question_id'])] = int(value)
+    return mapping
+
+
+def record_progress(assessment, current_answers: List[Mapping], seq: Optional[int] = None) -> ScoreAccumulator:
+    """
+    Save the answer list and fold only what changed into the running
+    totals. seq is the last progress delta applied (see progress_buffer);
+    it's kept from the previous save when not given.
+    """
+    bank = get_question_bank()
+    previous = assessment.results_data or {}
+    state = previous.get('accumulators')
+    accumulator = ScoreAccumulator.from_state(state, bank)
+    answers = {q: v for q, v in answer_map(current_answers).items() if q in bank}
+    accumulator.update(bank, answers, replace=True)
+
+    assessment.results_data = {
+        'progress': current_answers,
+        'accumulators': accumulator.to_state(),
+        'last_updated': timezone.now().isoformat(),
+        'progress_seq': previous.get('progress_seq', 0) if seq is None else seq,
+    }
+    assessment.save(update_fields=['results_data', 'updated_at'])
+    return accumulator
+
+
+def in_progress_scores(assessment, answers: List[Mapping]) -> Optional[Dict[str, float]]:
+    """
+    Final scores for a submission matching an assessment's saved progress,
+    scored here without calling the service. They're a full rescore of the
+    submitted answers (one matrix product), never the running totals, so
+    they don't depend on the order answers were entered or edited.
+    """
+    if assessment is None or not assessment.results_data:
+        return None
+    state = assessment.results_data.get('accumulators')
+    if not state:
+        return None
+    bank = get_question_bank()
+    if not ScoreAccumulator.from_state(state, bank).covers(answers):
+        return None
+    return GiftCalculator().calculate_scores(answers, question_bank=bank)
+
+
+def provisional_result(assessment) -> Dict:
+    """Live partial result for an in-progress assessment"""
+    bank = get_question_bank()
+    state = (assessment.results_data or {}).get('accumulators')
+    accumulator = ScoreAccumulator.from_state(state, bank)
+    result = {
+        'answered': len(accumulator.answers),
+        'total_questions': len(bank),
+        'scores': None,
+        'primary_gift': None,
+        'secondary_gifts': [],
+        'last_updated': (assessment.results_data or {}).get('last_updated')
+    }
+    if accumulator.answers:
+        scores = accumulator.scores()
+        primary_gift, secondary_gifts = GiftCalculator().identify_gifts(scores)
+        result.update({
+            'scores': scores,
+            'primary_gift': primary_gift,
+            'secondary_gifts': secondary_gifts
+        })
+    return result
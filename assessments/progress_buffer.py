@@ -0,0 +1,287 @@
+#assessments/progress_buffer.py
+
+from typing import Dict, Iterable, List, Mapping, Optional
+from contextlib import contextmanager
+import atexit
+import logging
+import threading
+import time
+from django.db import transaction
+from .models import Assessment
+from .progress import record_progress
+
+logger = logging.getLogger(__name__)
+
+# Per-assessment buffered deltas, the index of assessments with unflushed
+# deltas, and short-lived locks around both
+PROGRESS_BUFFER_KEY = 'assessments:progress:{assessment_id}'
+PROGRESS_DIRTY_KEY = 'assessments:progress:dirty'
+PROGRESS_LOCK_KEY = 'assessments:progress:lock:{name}'
+
+
+class SequenceGap(Exception):
+    """A delta arrived ahead of one that hasn't been applied yet"""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Expected sequence number {expected}")
+        self.expected = expected
+
+
+class BufferBusy(Exception):
+    """Another request held the assessment's buffer for too long"""
+
+
+def parse_deltas(deltas: Mapping, question_bank) -> Dict[int, Optional[int]]:
+    """
+    question_id -> answer from a delta body. null (or 0, as the counselor
+    UI sends for unanswered) withdraws an answer. Raises ValueError.
+    """
+    if not isinstance(deltas, Mapping):
+        raise ValueError("answers must be an object of question_id: answer")
+    parsed = {}
+    for question_id, value in deltas.items():
+        question_id = int(question_id)
+        if question_id not in question_bank:
+            raise ValueError(f"Unknown question {question_id}")
+        if value in (None, '', 0):
+            parsed[question_id] = None
+        elif 1 <= int(value) <= 5:
+            parsed[question_id] = int(value)
+        else:
+            raise ValueError("Answers must be between 1 and 5")
+    return parsed
+
+
+def merge_progress(progress: Iterable[Mapping], deltas: Mapping[int, Optional[int]]) -> List[Dict]:
+    """A saved answer list with deltas applied, keeping the list's order"""
+    merged = {int(answer['question_id']): dict(answer) for answer in progress}
+    for question_id, value in deltas.items():
+        if value is None:
+            merged.pop(question_id, None)
+        elif question_id in merged:
+            merged[question_id]['answer'] = value
+        else:
+            merged[question_id] = {'question_id': question_id, 'answer': value}
+    return list(merged.values())
+
+
+class ProgressBuffer:
+    """
+    Write-behind buffer for autosave deltas, kept in a Django cache.
+
+    Each delta carries a sequence number that must follow the last one
+    applied: a repeat is acknowledged without being applied again, and a
+    gap is refused so the client resends in order. Deltas for an
+    assessment are merged in the cache and written to results_data in one
+    update when the next delta finds them flush_interval seconds old, when
+    max_pending answers are waiting, on submit, at session end, or from
+    flush_all(). flush_all() runs at interpreter exit, from the process's
+    PeriodicFlusher for sessions that went idle, and from the
+    flush_progress command.
+
+    The cache must not evict these keys before they're flushed; any
+    backend with an atomic add() works, LocMemCache included (in which
+    case only the process that buffered a delta can flush it).
+    """
+
+    def __init__(self, cache, flush_interval: float = 30, max_pending: int = 50,
+                 lock_timeout: int = 10, lock_wait: float = 2.0, idle_timeout: int = 60 * 60 * 24):
+        self.cache = cache
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.lock_timeout = lock_timeout
+        self.lock_wait = lock_wait
+        self.idle_timeout = idle_timeout
+        self.flushes = 0
+
+    @contextmanager
+    def _lock(self, name):
+        key = PROGRESS_LOCK_KEY.format(name=name)
+        deadline = time.monotonic() + self.lock_wait
+        while not self.cache.add(key, 1, self.lock_timeout):
+            if time.monotonic() >= deadline:
+                raise BufferBusy(f"Progress buffer {name} is locked")
+            time.sleep(0.005)
+        try:
+            yield
+        finally:
+            self.cache.delete(key)
+
+    def _state(self, assessment) -> Dict:
+        state = self.cache.get(PROGRESS_BUFFER_KEY.format(assessment_id=assessment.pk))
+        if state is None:
+            # Nothing buffered (or the cache was reset): resume from the database
+            state = {
+                'seq': (assessment.results_data or {}).get('progress_seq', 0),
+                'answers': {},
+                'since': None,
+            }
+        return state
+
+    def _save_state(self, assessment_id, state: Dict):
+        # Unflushed answers never expire; an idle sequence number can, as
+        # the database has it too
+        timeout = None if state['answers'] else self.idle_timeout
+        self.cache.set(PROGRESS_BUFFER_KEY.format(assessment_id=assessment_id), state, timeout)
+
+    def _mark_dirty(self, assessment_id, dirty: bool):
+        with self._lock('dirty'):
+            ids = set(self.cache.get(PROGRESS_DIRTY_KEY) or ())
+            if dirty:
+                ids.add(assessment_id)
+            else:
+                ids.discard(assessment_id)
+            self.cache.set(PROGRESS_DIRTY_KEY, sorted(ids), None)
+
+    def apply(self, assessment, seq: int, deltas: Mapping[int, Optional[int]],
+              flush: bool = False) -> Dict:
+        """
+        Buffer one delta. Returns the acknowledged sequence number, whether
+        it was a repeat, how many answers are waiting and whether they were
+        flushed. Raises SequenceGap if seq skips ahead.
+        """
+        with self._lock(assessment.pk):
+            state = self._state(assessment)
+            duplicate = seq <= state['seq']
+            if not duplicate:
+                if seq != state['seq'] + 1:
+                    raise SequenceGap(state['seq'] + 1)
+                if deltas and not state['answers']:
+                    state['since'] = time.time()
+                    self._mark_dirty(assessment.pk, True)
+                state['answers'].update(deltas)
+                state['seq'] = seq
+                self._save_state(assessment.pk, state)
+
+            due = flush or (
+                len(state['answers']) >= self.max_pending
+                or time.time() - (state['since'] or 0) >= self.flush_interval
+            )
+            flushed = False
+            if state['answers'] and due:
+                try:
+                    flushed = self._flush_locked(assessment.pk, state, assessment)
+                except Exception:
+                    # Still buffered; the next flush tries again
+                    logger.exception(f"Failed to flush progress for assessment {assessment.pk}")
+            return {
+                'seq': state['seq'],
+                'duplicate': duplicate,
+                'pending': 0 if flushed else len(state['answers']),
+                'flushed': flushed,
+            }
+
+    def pending(self, assessment) -> Dict:
+        """The buffered sequence number and unflushed answers"""
+        return self._state(assessment)
+
+    def flush(self, assessment) -> bool:
+        """
+        Write an assessment's buffered answers now. The instance's
+        results_data is updated to match; returns True if anything was written.
+        """
+        with self._lock(assessment.pk):
+            state = self.cache.get(PROGRESS_BUFFER_KEY.format(assessment_id=assessment.pk))
+            if not state or not state['answers']:
+                return False
+            return self._flush_locked(assessment.pk, state, assessment)
+
+    def _flush_locked(self, assessment_id, state: Dict, assessment=None) -> bool:
+        with transaction.atomic():
+            current = Assessment.objects.select_for_update().filter(pk=assessment_id).first()
+            if current is None or current.completion_status:
+                # Deleted or already submitted; nothing left to save into
+                written = False
+            else:
+                progress = merge_progress((current.results_data or {}).get('progress', []), state['answers'])
+                record_progress(current, progress, seq=state['seq'])
+                written = True
+
+        if written:
+            if assessment is not None:
+                assessment.results_data = current.results_data
+            self._save_state(assessment_id, {'seq': state['seq'], 'answers': {}, 'since': None})
+        else:
+            self.cache.delete(PROGRESS_BUFFER_KEY.format(assessment_id=assessment_id))
+        self._mark_dirty(assessment_id, False)
+        self.flushes += written
+        return written
+
+    def flush_all(self, min_age: Optional[float] = None) -> int:
+        """
+        Flush every assessment with buffered answers, or only those first
+        buffered at least min_age seconds ago; returns how many were written
+        """
+        written = 0
+        for assessment_id in self.cache.get(PROGRESS_DIRTY_KEY) or ():
+            try:
+                with self._lock(assessment_id):
+                    state = self.cache.get(PROGRESS_BUFFER_KEY.format(assessment_id=assessment_id))
+                    if state and state['answers']:
+                        if min_age is not None and time.time() - (state['since'] or 0) < min_age:
+                            continue
+                        written += self._flush_locked(assessment_id, state)
+                    else:
+                        self._mark_dirty(assessment_id, False)
+            except Exception:
+                # Keep going: one bad assessment mustn't strand the others
+                logger.exception(f"Failed to flush progress for assessment {assessment_id}")
+        return written
+
+
+class PeriodicFlusher(threading.Thread):
+    """
+    Daemon thread that writes out buffered answers at least interval
+    seconds old, every interval seconds, so a session that stops sending
+    deltas without submitting is still saved. Only reaches what this
+    process's cache can see: with LocMemCache, its own buffered deltas.
+    """
+
+    def __init__(self, buffer: ProgressBuffer, interval: float):
+        super().__init__(name='progress-flusher', daemon=True)
+        self.buffer = buffer
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        from django.db import connections
+
+        while not self.stopped.wait(self.interval):
+            self.tick()
+            # This thread's connections would otherwise stay open between ticks
+            connections.close_all()
+
+    def tick(self) -> int:
+        try:
+            return self.buffer.flush_all(min_age=self.interval)
+        except Exception:
+            logger.exception("Periodic progress flush failed")
+            return 0
+
+    def stop(self):
+        self.stopped.set()
+
+
+_progress_buffer: Optional[ProgressBuffer] = None
+_progress_buffer_lock = threading.Lock()
+
+
+def get_progress_buffer() -> ProgressBuffer:
+    """Process-wide buffer configured from settings.PROGRESS_BUFFER"""
+    global _progress_buffer
+    with _progress_buffer_lock:
+        if _progress_buffer is None:
+            from django.conf import settings
+            from django.core.cache import cache
+
+            config = getattr(settings, 'PROGRESS_BUFFER', {})
+            _progress_buffer = ProgressBuffer(
+                cache,
+                flush_interval=config.get('FLUSH_INTERVAL', 30),
+                max_pending=config.get('MAX_PENDING', 50),
+            )
+            # Clean shutdown writes whatever is still buffered
+            atexit.register(_progress_buffer.flush_all)
+            if config.get('BACKGROUND_FLUSH', True):
+                PeriodicFlusher(_progress_buffer, _progress_buffer.flush_interval).start()
+        return _progress_buffer
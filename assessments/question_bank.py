@@ -0,0 +1,266 @@
+#assessments/question_bank.py
+
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import numpy as np
+from .gift_calculator import GiftCalculator
+
+logger = logging.getLogger(__name__)
+
+# Shared-cache key holding the version every process should be serving
+QUESTION_BANK_VERSION_KEY = 'assessments:question_bank_version'
+
+# Shared-cache key holding the serialized question list and its ETag
+QUESTION_LIST_KEY = 'assessments:question_list'
+
+# Bump when the arrays stored in the compiled artifact change
+ARTIFACT_FORMAT = 1
+DEFAULT_ARTIFACT_PATH = Path(__file__).resolve().parent / 'compiled' / 'question_bank.npz'
+
+
+def artifact_path() -> Path:
+    """Where load_questions writes the compiled bank (QUESTION_BANK_ARTIFACT overrides)"""
+    return Path(os.getenv('QUESTION_BANK_ARTIFACT', DEFAULT_ARTIFACT_PATH))
+
+
+class CompiledQuestionBank:
+    """
+    Immutable, versioned snapshot of the question bank compiled for scoring.
+
+    Rows of the correlation matrix are addressed by Question.id, so answers
+    only need to carry question_id and answer; correlations are never taken
+    from the client. The version is a content hash, so two processes that
+    compiled the same questions agree on it without coordinating.
+    """
+
+    def __init__(self, question_ids: Sequence[int], correlations: Sequence[Mapping[str, float]],
+                 weights: Sequence[float]):
+        engine = GiftCalculator.engine
+        self.gifts = engine.gift_keys
+        self.question_ids = np.asarray(question_ids, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.correlations = [
+            {gift.upper(): float(value) for gift, value in correlation.items()}
+            for correlation in correlations
+        ]
+        self.matrix = engine.compile_correlations(self.correlations)
+        self.index = {question_id: row for row, question_id in enumerate(self.question_ids.tolist())}
+        self.version = self._content_hash()
+
+        # Snapshots are shared between requests and threads
+        for array in (self.question_ids, self.weights, self.matrix):
+            array.flags.writeable = False
+
+    def _content_hash(self) -> str:
+        content = json.dumps(
+            [
+                [question_id, weight, sorted(correlation.items())]
+                for question_id, weight, correlation in zip(
+                    self.question_ids.tolist(), self.weights.tolist(), self.correlations
+                )
+            ],
+            separators=(',', ':')
+        )
+        return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, question_id) -> bool:
+        return question_id in self.index
+
+    def rows_for(self, question_ids: Iterable[int]) -> np.ndarray:
+        """Matrix row numbers for the given question ids, in the given order"""
+        try:
+            return np.fromiter(
+                (self.index[int(question_id)] for question_id in question_ids),
+                dtype=np.intp
+            )
+        except KeyError as e:
+            raise ValueError(f"Unknown question id: {e.args[0]}")
+
+    def matrix_for(self, question_ids: Iterable[int]) -> np.ndarray:
+        """Dense correlation matrix for a sequence of answered questions"""
+        return self.matrix[self.rows_for(question_ids)]
+
+    def correlation_for(self, question_id: int) -> Dict[str, float]:
+        return self.correlations[self.index[question_id]]
+
+    @classmethod
+    def from_questions(cls, questions: Iterable) -> 'CompiledQuestionBank':
+        """Compile Question instances (or anything with id/weight/gift_correlation)"""
+        question_ids, correlations, weights = [], [], []
+        for question in questions:
+            question_ids.append(question.id)
+            correlations.append(question.gift_correlation or {})
+            weights.append(question.weight)
+        return cls(question_ids, correlations, weights)
+
+    def to_payload(self) -> Dict:
+        """JSON-serializable form used to ship the bank to the FastAPI service"""
+        return {
+            'version': self.version,
+            'question_ids': self.question_ids.tolist(),
+            'weights': self.weights.tolist(),
+            'gift_correlations': self.correlations,
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Mapping) -> 'CompiledQuestionBank':
+        bank = cls(payload['question_ids'], payload['gift_correlations'], payload['weights'])
+        if payload.get('version') and payload['version'] != bank.version:
+            raise ValueError("Question bank payload does not match its version")
+        return bank
+
+    def save(self, path) -> Path:
+        """
+        Write the compiled artifact: correlation matrix, weights, question
+        order, gift order and content hash in one uncompressed .npz. The
+        file is replaced atomically so readers never see a partial write.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle, tmp = tempfile.mkstemp(dir=path.parent, suffix='.npz')
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                np.savez(
+                    f,
+                    format=np.array(ARTIFACT_FORMAT),
+                    version=np.array(self.version),
+                    gifts=np.array(self.gifts),
+                    question_ids=self.question_ids,
+                    weights=self.weights,
+                    matrix=self.matrix,
+                    # Original correlations (unknown gifts included) keep the hash reproducible
+                    correlations=np.frombuffer(json.dumps(self.correlations).encode(), dtype=np.uint8)
+                )
+            # mkstemp makes the file 0600; the FastAPI service may run as another user
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return path
+
+    @classmethod
+    def load(cls, path) -> 'CompiledQuestionBank':
+        """Read an artifact written by save(); raises ValueError if it doesn't check out"""
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['format']) != ARTIFACT_FORMAT:
+                raise ValueError(f"Unsupported question bank artifact format: {int(data['format'])}")
+            if tuple(data['gifts'].tolist()) != GiftCalculator.engine.gift_keys:
+                raise ValueError("Question bank artifact was compiled for a different gift order")
+            bank = cls(
+                data['question_ids'],
+                json.loads(data['correlations'].tobytes()),
+                data['weights']
+            )
+            if bank.version != str(data['version']) or not np.array_equal(bank.matrix, data['matrix']):
+                raise ValueError("Question bank artifact does not match its content hash")
+        return bank
+
+
+_question_bank: Optional[CompiledQuestionBank] = None
+
+
+def load_artifact(path=None) -> Optional[CompiledQuestionBank]:
+    """The compiled artifact, or None if it is missing or unusable"""
+    path = Path(path) if path is not None else artifact_path()
+    if not path.exists():
+        return None
+    try:
+        return CompiledQuestionBank.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring question bank artifact {path}: {e}")
+        return None
+
+
+def get_question_bank() -> CompiledQuestionBank:
+    """
+    Return this process's compiled question bank, recompiling it when the
+    shared version in the Django cache no longer matches (e.g. after
+    load_questions ran in another process).
+
+    A fresh process starts from the compiled artifact without touching the
+    database, unless the shared version says the artifact is out of date.
+    """
+    global _question_bank
+    from django.core.cache import cache
+    from .models import Question
+
+    current = cache.get(QUESTION_BANK_VERSION_KEY)
+    if _question_bank is not None and current == _question_bank.version:
+        return _question_bank
+
+    bank = load_artifact()
+    if bank is None or current not in (None, bank.version):
+        bank = CompiledQuestionBank.from_questions(
+            Question.objects.only('id', 'weight', 'gift_correlation').order_by('id')
+        )
+        try:
+            bank.save(artifact_path())
+        except OSError as e:
+            logger.warning(f"Could not write question bank artifact: {e}")
+
+    cache.set(QUESTION_BANK_VERSION_KEY, bank.version, None)
+    _question_bank = bank
+    return bank
+
+
+def invalidate_question_bank():
+    """
+    Drop the compiled bank here and tell other processes to recompile.
+    Bulk writes skip model signals, so callers using them must call this.
+    """
+    global _question_bank
+    from django.core.cache import cache
+
+    _question_bank = None
+    # Question text and category aren't part of the bank version, so the
+    # serialized list is dropped with it rather than keyed by it alone
+    cache.delete_many([QUESTION_BANK_VERSION_KEY, QUESTION_LIST_KEY])
+    # A stale artifact must not be picked up by the next fresh process
+    try:
+        artifact_path().unlink()
+    except FileNotFoundError:
+        pass
+
+
+def cached_question_list() -> Dict:
+    """
+    The question list as served to clients, serialized once per bank
+    version and shared through the Django cache: {'version', 'body',
+    'etag'}. The ETag is a strong validator over the exact body bytes.
+    """
+    from django.core.cache import cache
+    from core.renderers import ORJSONRenderer
+    from .models import Question
+    from .serializers import QuestionSerializer
+
+    version = get_question_bank().version
+    entry = cache.get(QUESTION_LIST_KEY)
+    if entry is not None and entry['version'] == version:
+        return entry
+
+    body = ORJSONRenderer().render(QuestionSerializer(Question.objects.all().order_by('id'), many=True).data)
+    entry = {
+        'version': version,
+        'body': body,
+        'etag': '"%s"' % hashlib.sha256(body).hexdigest()[:32],
+    }
+    cache.set(QUESTION_LIST_KEY, entry, None)
+    return entry
+
+
+def compact_answers(answers: Iterable[Mapping]) -> List[Dict[str, int]]:
+    """Strip submitted answers down to question_id and answer"""
+    return [
+        {'question_id': int(answer['question_id']), 'answer': int(answer['answer'])}
+        for answer in answers
+    ]
@@ -0,0 +1,93 @@
+#assessments/rescoring.py
+
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+import json
+import os
+import tempfile
+from .gift_calculator import GiftCalculator
+from .question_bank import CompiledQuestionBank
+
+# Set in each worker process by init_worker, so the bank is shipped once
+_worker_bank: Optional[CompiledQuestionBank] = None
+
+
+def init_worker(bank_payload: Mapping):
+    global _worker_bank
+    _worker_bank = CompiledQuestionBank.from_payload(bank_payload)
+
+
+def score_chunk(chunk: Sequence[Tuple[int, Optional[List[Dict]]]]) -> Tuple[List[Tuple], List[int]]:
+    """
+    Re-score a chunk of (assessment_id, answers) against the worker's bank.
+    Returns (assessment_id, scores, primary_gift, secondary_gifts) rows and
+    the ids that can't be re-scored (no stored answers, or questions that
+    are no longer in the bank).
+    """
+    bank = _worker_bank
+    calculator = GiftCalculator()
+    ids, answer_sets, skipped = [], [], []
+    for assessment_id, answers in chunk:
+        if not answers or any(answer['question_id'] not in bank for answer in answers):
+            skipped.append(assessment_id)
+            continue
+        ids.append(assessment_id)
+        answer_sets.append(answers)
+
+    # Respondents sharing a question set are scored as one matrix product
+    all_scores = calculator.calculate_scores_batch(answer_sets, question_bank=bank)
+    selections = calculator.identify_gifts_batch(all_scores)
+    rows = [
+        (assessment_id, scores, primary_gift, secondary_gifts)
+        for assessment_id, scores, (primary_gift, secondary_gifts) in zip(ids, all_scores, selections)
+    ]
+    return rows, skipped
+
+
+class Checkpoint:
+    """
+    Progress of a re-scoring run: the last assessment id whose updates are
+    committed, plus running totals. Only valid for the bank it was made with.
+    """
+
+    def __init__(self, path, bank_version: str):
+        self.path = path
+        self.bank_version = bank_version
+        self.last_id = 0
+        self.processed = 0
+        self.changed = 0
+        self.skipped = 0
+
+    @classmethod
+    def load(cls, path, bank_version: str) -> 'Checkpoint':
+        checkpoint = cls(path, bank_version)
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return checkpoint
+        if state.get('bank_version') == bank_version:
+            checkpoint.last_id = state['last_id']
+            checkpoint.processed = state['processed']
+            checkpoint.changed = state['changed']
+            checkpoint.skipped = state['skipped']
+        return checkpoint
+
+    def save(self):
+        # Write-then-rename so an interrupted run never leaves a torn file
+        directory = os.path.dirname(os.path.abspath(self.path))
+        handle, tmp = tempfile.mkstemp(dir=directory, suffix='.json')
+        with os.fdopen(handle, 'w') as f:
+            json.dump({
+                'bank_version': self.bank_version,
+                'last_id': self.last_id,
+                'processed': self.processed,
+                'changed': self.changed,
+                'skipped': self.skipped,
+            }, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
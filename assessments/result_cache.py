@@ -0,0 +1,147 @@
+#assessments/result_cache.py
+
+from typing import Callable, Dict, Iterable, Mapping, Optional
+from collections import OrderedDict
+import copy
+import hashlib
+import threading
+import numpy as np
+
+# Bump when the cached value shape or the scoring rules change
+KEY_SCHEMA = 'v1'
+
+# Per-user cached latest_results response, dropped when a GiftProfile changes
+LATEST_RESULTS_KEY = 'assessments:latest_results:{user_id}'
+
+
+def result_key(bank_version: str, answers: Iterable[Mapping]) -> str:
+    """
+    Content address of a submission: the question bank version plus the
+    ordered (question_id, answer) vector. Answer order is part of the key
+    because it determines the floating-point summation order.
+    """
+    vector = np.array(
+        [(int(a['question_id']), int(a['answer'])) for a in answers],
+        dtype=np.int64
+    )
+    digest = hashlib.sha256(f'{KEY_SCHEMA}:{bank_version}:'.encode())
+    digest.update(vector.tobytes())
+    return digest.hexdigest()
+
+
+def scores_key(scores: Mapping[str, float]) -> str:
+    """Content address of a finished score set"""
+    content = ','.join(f'{gift}={score!r}' for gift, score in sorted(scores.items()))
+    return hashlib.sha256(f'{KEY_SCHEMA}:scores:{content}'.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Bounded in-process LRU of gift results with an optional shared tier
+    (any Django cache backend) behind it.
+
+    Values are small dicts (scores, primary_gift, secondary_gifts, ...);
+    callers always get their own copy, so cached entries can't be mutated.
+    """
+
+    def __init__(self, max_entries: int = 4096, shared=None, timeout: Optional[int] = None,
+                 prefix: str = 'assessments:result:'):
+        self.max_entries = max_entries
+        self.shared = shared
+        self.timeout = timeout
+        self.prefix = prefix
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy(value)
+
+        if self.shared is not None:
+            value = self.shared.get(self.prefix + key)
+            if value is not None:
+                self._store(key, value)
+                with self._lock:
+                    self.shared_hits += 1
+                return _copy(value)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Mapping):
+        value = _copy(value)
+        self._store(key, value)
+        if self.shared is not None:
+            self.shared.set(self.prefix + key, value, self.timeout)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Mapping]) -> Dict:
+        value = self.get(key)
+        if value is None:
+            value = dict(compute())
+            self.set(key, value)
+        return value
+
+    def _store(self, key: str, value: Dict):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """Drop local entries and counters (the shared tier expires on its own)"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.shared_hits = self.misses = self.evictions = 0
+
+
+def _copy(value: Mapping) -> Dict:
+    # Values are a few hundred bytes; a deep copy keeps entries immutable
+    return copy.deepcopy(dict(value))
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """Process-wide result cache configured from settings.GIFT_RESULT_CACHE"""
+    global _result_cache
+    if _result_cache is None:
+        from django.conf import settings
+        from django.core.cache import cache
+
+        config = getattr(settings, 'GIFT_RESULT_CACHE', {})
+        _result_cache = ResultCache(
+            max_entries=config.get('MAX_ENTRIES', 4096),
+            shared=cache if config.get('SHARED', False) else None,
+            timeout=config.get('TIMEOUT')
+        )
+    return _result_cache
+
+
+def invalidate_latest_results(user_id):
+    from django.core.cache import cache
+    cache.delete(LATEST_RESULTS_KEY.format(user_id=user_id))
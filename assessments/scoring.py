@@ -0,0 +1,158 @@
+#assessments/scoring.py
+
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+import numpy as np
+
+
+class ScoringEngine:
+    """
+    Vectorized scoring kernel for the motivational gift assessment.
+
+    Answers are scored against a dense (questions x gifts) correlation matrix
+    instead of walking each answer's gift_correlation dict in Python. The
+    arithmetic mirrors the original per-answer loop step for step so that the
+    4-decimal scores are bit-for-bit identical.
+    """
+    MAX_ANSWER = 5
+    PRECISION = 4
+
+    def __init__(self, gift_keys: Sequence[str]):
+        self.gift_keys = tuple(gift_keys)
+        self.gift_index = {gift: i for i, gift in enumerate(self.gift_keys)}
+        # calculate_scores has always returned the gifts in alphabetical order
+        self.sorted_keys = tuple(sorted(self.gift_keys))
+
+    def compile_correlations(self, correlations: Iterable[Mapping[str, float]]) -> np.ndarray:
+        """Build a dense (questions x gifts) matrix, ignoring unknown gift keys"""
+        width = len(self.gift_keys)
+        index = self.gift_index
+        rows = []
+        for correlation in correlations:
+            row = [0.0] * width
+            for gift, value in correlation.items():
+                column = index.get(gift)
+                if column is not None:
+                    row[column] = value
+            rows.append(row)
+        return np.array(rows, dtype=np.float64).reshape(-1, width)
+
+    def raw_scores(self, values: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """Weighted answer totals per gift.
+
+        The reduction runs over axis 0 of a C-contiguous array, which numpy
+        accumulates row by row (pairwise summation only applies along the
+        fast axis), so the sums match the original sequential loop exactly.
+        """
+        return (values[:, None] * matrix).sum(axis=0)
+
+    def raw_scores_batch(self, values: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """(N x Q) answer values against a (Q x G) matrix -> (N x G) totals.
+
+        Reduces over the questions axis, which is never the fast axis, so
+        each respondent's totals accumulate in question order as above.
+        """
+        return (values[:, :, None] * matrix[None, :, :]).sum(axis=1)
+
+    def max_scores(self, matrix: np.ndarray) -> np.ndarray:
+        """Highest attainable total per gift if every answer were MAX_ANSWER"""
+        return (self.MAX_ANSWER * matrix).sum(axis=0)
+
+    def normalize(self, raw: np.ndarray, maximum: np.ndarray) -> np.ndarray:
+        """Scale each gift by its own maximum; gifts with no weight score 0"""
+        normalized = np.zeros_like(raw)
+        np.divide(raw, maximum, out=normalized, where=maximum > 0)
+        return normalized
+
+    def finalize(self, normalized: np.ndarray) -> Dict[str, float]:
+        """Convert one row of normalized scores into 4-decimal shares"""
+        return self.finalize_batch(normalized[None, :])[1][0]
+
+    def finalize_batch(self, normalized: np.ndarray) -> Tuple[np.ndarray, List[Dict[str, float]]]:
+        """Convert (N x G) normalized scores into 4-decimal shares that sum to 1.
+
+        Returns the shares both as an (N x G) array in sorted_keys column
+        order and as the per-respondent dicts calculate_scores returns. The
+        division and ordering are vectorized; the rounding itself uses
+        Python's correctly-rounded round() because np.round differs from it
+        on half-way cases.
+        """
+        count, width = normalized.shape
+        # Sequential row totals, matching sum() over the gift dict
+        totals = np.cumsum(normalized, axis=1)[:, -1] if width else np.zeros(count)
+        # Stable descending order matches sorted(..., reverse=True)
+        orders = np.argsort(-normalized, axis=1, kind='stable')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percentages = np.take_along_axis(normalized / totals[:, None], orders, axis=1)
+
+        equal_share = round(1.0 / width, self.PRECISION)
+        sorted_columns = [self.gift_index[gift] for gift in self.sorted_keys]
+        shares = np.empty((count, width), dtype=np.float64)
+        results = []
+        for row, (total, order, percentage) in enumerate(
+                zip(totals.tolist(), orders.tolist(), percentages.tolist())):
+            if total > 0:
+                final = [0.0] * width
+                running_total = 0
+                for column, value in zip(order[:-1], percentage[:-1]):
+                    rounded_score = round(value, self.PRECISION)
+                    final[column] = rounded_score
+                    running_total += rounded_score
+                # Last gift absorbs the remainder so the shares sum to exactly 1
+                final[order[-1]] = round(1 - running_total, self.PRECISION)
+                results.append({self.gift_keys[c]: final[c] for c in sorted_columns})
+            else:
+                # Fallback to equal distribution if all scores are 0
+                final = [equal_share] * width
+                results.append({gift: equal_share for gift in self.gift_keys})
+            shares[row] = [final[c] for c in sorted_columns]
+        return shares, results
+
+    def score(self, values: np.ndarray, matrix: np.ndarray) -> Dict[str, float]:
+        """Score one answer vector against a compiled correlation matrix"""
+        raw = self.raw_scores(values, matrix)
+        maximum = self.max_scores(matrix)
+        return self.finalize(self.normalize(raw, maximum))
+
+    def score_batch(self, values: np.ndarray, matrix: np.ndarray) -> Tuple[np.ndarray, List[Dict[str, float]]]:
+        """Score N answer vectors that share one (Q x G) correlation matrix"""
+        raw = self.raw_scores_batch(values, matrix)
+        maximum = self.max_scores(matrix)
+        return self.finalize_batch(self.normalize(raw, maximum[None, :]))
+
+    def single_answer_variants(self, values: np.ndarray) -> np.ndarray:
+        """Every single-answer change of one answer vector.
+
+        Returns a (Q * MAX_ANSWER x Q) array: row q * MAX_ANSWER + (v - 1) is
+        the original answers with question q set to v (including v equal
+        to the current answer, so each question's block is complete).
+        """
+        count = len(values)
+        variants = np.repeat(values[None, :], count * self.MAX_ANSWER, axis=0)
+        rows = np.arange(count * self.MAX_ANSWER)
+        variants[rows, rows // self.MAX_ANSWER] = rows % self.MAX_ANSWER + 1
+        return variants
+
+    def select_gifts_batch(self, shares: np.ndarray, threshold_factor: float = 0.80) -> List[Tuple[int, List[int]]]:
+        """Vectorized primary/secondary selection over (N x G) shares.
+
+        Mirrors GiftCalculator.identify_gifts: rank by score then gift name
+        (both descending), keep up to two runners-up scoring at least
+        threshold_factor of the top score, and always keep at least one.
+        Returns column indices into sorted_keys.
+        """
+        count, width = shares.shape
+        # Columns are alphabetical, so a higher column wins a tie on score
+        columns = np.broadcast_to(-np.arange(width), shares.shape)
+        orders = np.lexsort((columns, -shares), axis=-1)
+        ranked = np.take_along_axis(shares, orders, axis=1)
+
+        threshold = ranked[:, 0] * threshold_factor
+        keep = ranked[:, 1:3] >= threshold[:, None]
+        if width > 1:
+            keep[~keep.any(axis=1), 0] = True
+
+        selections = []
+        for order, kept in zip(orders.tolist(), keep.tolist()):
+            secondary = [column for column, flag in zip(order[1:3], kept) if flag]
+            selections.append((order[0], secondary))
+        return selections
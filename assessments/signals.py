@@ -0,0 +1,25 @@
+from django.db.models.signals import post_save, post_delete
+from django.db.models import F
+from django.dispatch import receiver
+from users.models import User
+from .models import Assessment, Question, GiftProfile
+from .question_bank import invalidate_question_bank
+from .result_cache import invalidate_latest_results
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_bank_changed(sender, **kwargs):
+    invalidate_question_bank()
+
+@receiver(post_save, sender=GiftProfile)
+@receiver(post_delete, sender=GiftProfile)
+def gift_profile_changed(sender, instance, **kwargs):
+    invalidate_latest_results(instance.user_id)
+
+@receiver(post_delete, sender=Assessment)
+def assessment_deleted(sender, instance, **kwargs):
+    # A deleted completed assessment no longer counts against the limit
+    if instance.completion_status:
+        User.objects.filter(pk=instance.user_id, completed_assessments__gt=0).update(
+            completed_assessments=F('completed_assessments') - 1
+        )
@@ -0,0 +1,83 @@
+from io import StringIO
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from assessments.models import Assessment, Question
+from assessments.result_cache import get_result_cache
+
+User = get_user_model()
+
+RESULT = {
+    'scores': {'TEACHING': 0.9, 'SERVICE': 0.8},
+    'primary_gift': 'Teaching',
+    'secondary_gifts': ['Service'],
+    'descriptions': {},
+    'recommended_roles': {},
+}
+
+
+class CompletedAssessmentCounterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='counted', email='counted@example.com')
+        self.client.force_authenticate(user=self.user)
+        question = Question.objects.create(category='Test', text='Question', gift_correlation={'TEACHING': 1.0})
+        self.answers = [{'question_id': question.id, 'answer': 4}]
+        get_result_cache().clear()
+
+    def submit(self):
+        get_result_cache().clear()
+        return self.client.post(reverse('assessment-submit'), {'answers': self.answers}, format='json')
+
+    @patch('assessments.views.FastAPIClient')
+    def test_submit_increments_counter(self, mock_client):
+        mock_client.return_value.calculate_gifts_sync.return_value = RESULT
+        self.assertEqual(self.submit().status_code, 200)
+        self.assertEqual(self.submit().status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.completed_assessments, 2)
+        response = self.client.get(reverse('assessment-assessment-count'))
+        self.assertEqual(response.data['completed_assessments'], 2)
+
+    @override_settings(ASSESSMENT_LIMIT=1)
+    @patch('assessments.views.FastAPIClient')
+    def test_limit_is_configurable(self, mock_client):
+        mock_client.return_value.calculate_gifts_sync.return_value = RESULT
+        self.assertEqual(self.submit().status_code, 200)
+
+        self.user.refresh_from_db()
+        self.client.force_authenticate(user=self.user)
+        response = self.submit()
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('limit of 1', response.data['error'])
+        self.assertEqual(Assessment.objects.filter(user=self.user).count(), 1)
+
+    def test_deleting_a_completed_assessment_decrements(self):
+        assessment = Assessment.objects.create(user=self.user, completion_status=True)
+        Assessment.record_completions({self.user.id: 1})
+        assessment.delete()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.completed_assessments, 0)
+
+    def test_reconcile_repairs_drift(self):
+        Assessment.objects.create(user=self.user, completion_status=True)
+        Assessment.objects.create(user=self.user, completion_status=False)
+        other = User.objects.create_user(username='other', email='other@example.com')
+        User.objects.filter(pk=other.pk).update(completed_assessments=5)
+
+        out = StringIO()
+        call_command('reconcile_assessment_counts', '--dry-run', stdout=out)
+        self.assertIn('2 counter(s) would be repaired', out.getvalue())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.completed_assessments, 0)
+
+        call_command('reconcile_assessment_counts', stdout=StringIO())
+        self.user.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.user.completed_assessments, 1)
+        self.assertEqual(other.completed_assessments, 0)
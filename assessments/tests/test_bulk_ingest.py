@@ -0,0 +1,125 @@
+import json
+import random
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from assessments.gift_calculator import GiftCalculator
+from assessments.models import Assessment, GiftProfile, Question
+from assessments.question_bank import get_question_bank
+from assessments.wire_format import pack_answers
+from books.models import Book, BookAccess
+from counselors.models import Counselor, CounselorUserRelation
+
+User = get_user_model()
+
+
+class BulkIngestTests(TestCase):
+    def setUp(self):
+        rng = random.Random(20)
+        gifts = list(GiftCalculator.MOTIVATIONAL_GIFTS)
+        self.questions = [
+            Question.objects.create(
+                category='Test',
+                text=f'Question {i}',
+                gift_correlation={gifts[i % 7]: 1.0, gifts[(i + 2) % 7]: round(rng.random(), 2)}
+            )
+            for i in range(14)
+        ]
+        counselor_user = User.objects.create_user(username='counselor', email='counselor@example.com')
+        self.counselor = Counselor.objects.create(
+            user=counselor_user, professional_title='Counselor', institution='Field office',
+            qualification='MA', phone_number='555-0100'
+        )
+        self.users = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'paper{i}', email=f'paper{i}@example.com')
+            CounselorUserRelation.objects.create(counselor=self.counselor, user=user)
+            self.users.append(user)
+        self.outsider = User.objects.create_user(username='outsider', email='outsider@example.com')
+        for key, name in Book.GIFT_CHOICES:
+            Book.objects.create(slug=key.lower(), title=name, associated_gift=key,
+                                copyright_info='Test', version='1.0')
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=counselor_user)
+        self.url = reverse('assessment-bulk-ingest')
+        self.values = [[rng.randint(1, 5) for _ in self.questions] for _ in self.users]
+
+    def post(self, body, content_type, **extra):
+        response = self.client.generic('POST', self.url, body, content_type=content_type, **extra)
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def expected_scores(self, values):
+        answers = [{'question_id': q.id, 'answer': v} for q, v in zip(self.questions, values)]
+        return GiftCalculator().calculate_scores(answers, question_bank=get_question_bank())
+
+    def test_ndjson_rows_are_scored_and_stored(self):
+        rows = [
+            {'user': self.users[0].id,
+             'answers': [{'question_id': q.id, 'answer': v} for q, v in zip(self.questions, self.values[0])]},
+            {'user': self.users[1].username, 'answers': self.values[1], 'counselor_notes': 'Paper form'},
+            {'user': self.users[2].email, 'packed': pack_answers(self.values[2])},
+        ]
+        body = '\n'.join(json.dumps(row) for row in rows) + '\n'
+        with self.settings(ASSESSMENT_BULK_CHUNK_SIZE=2):
+            results = self.post(body, 'application/x-ndjson')
+
+        self.assertEqual(results[-1]['summary']['created'], 3)
+        self.assertEqual(results[-1]['summary']['errors'], 0)
+        for user, values, result in zip(self.users, self.values, results):
+            self.assertEqual(result['status'], 'created')
+            assessment = Assessment.objects.get(id=result['assessment_id'])
+            self.assertEqual(assessment.user, user)
+            self.assertTrue(assessment.is_counselor_session)
+            self.assertEqual(assessment.counselor, self.counselor)
+            self.assertEqual(assessment.results_data['scores'], self.expected_scores(values))
+            profile = GiftProfile.objects.get(assessment=assessment)
+            self.assertEqual(profile.primary_gift, result['primary_gift'])
+            self.assertTrue(profile.description_keys)
+            self.assertTrue(BookAccess.objects.filter(user=user, access_reason='PRIMARY', is_active=True).exists())
+        self.assertEqual(Assessment.objects.get(id=results[1]['assessment_id']).counselor_notes, 'Paper form')
+
+    def test_csv_upload(self):
+        header = ','.join(['user', 'counselor_notes'] + [str(q.id) for q in self.questions])
+        lines = [header] + [
+            ','.join([user.username, 'keyed'] + [str(v) for v in values])
+            for user, values in zip(self.users, self.values)
+        ]
+        upload = SimpleUploadedFile('paper.csv', ('\n'.join(lines) + '\n').encode(), content_type='text/csv')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        results = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+        self.assertEqual([r['row'] for r in results[:-1]], [2, 3, 4])
+        self.assertEqual(results[-1]['summary']['created'], 3)
+        for values, result in zip(self.values, results):
+            assessment = Assessment.objects.get(id=result['assessment_id'])
+            self.assertEqual(assessment.results_data['scores'], self.expected_scores(values))
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        body = '\n'.join([
+            json.dumps({'user': self.users[0].id, 'answers': self.values[0]}),
+            '{not json',
+            json.dumps({'user': self.outsider.id, 'answers': self.values[1]}),
+            json.dumps({'user': self.users[1].id, 'answers': [9] * len(self.questions)}),
+            json.dumps({'user': self.users[2].id, 'answers': [{'question_id': 999999, 'answer': 3}]}),
+        ])
+        results = self.post(body, 'application/x-ndjson')
+
+        self.assertEqual([r['status'] for r in results[:-1]], ['created', 'error', 'error', 'error', 'error'])
+        self.assertEqual(results[-1]['summary'], {**results[-1]['summary'], 'rows': 5, 'created': 1, 'errors': 4})
+        self.assertEqual(Assessment.objects.count(), 1)
+        self.assertFalse(Assessment.objects.filter(user=self.outsider).exists())
+
+    def test_counselors_only(self):
+        self.client.force_authenticate(user=self.users[0])
+        response = self.client.generic('POST', self.url, '', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_unsupported_format(self):
+        response = self.client.generic('POST', self.url, '<xml/>', content_type='application/xml')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
@@ -10,17 +10,17 @@ class GiftCalculatorTests(TestCase):
                 'answer': 5, 
                 'gift_correlation': {
                     'TEACHING': 0.8,
-                    'LEADERSHIP': 0.4,
-                    'SHEPHERDING': 0.3
+                    'ADMINISTRATION': 0.4,
+                    'EXHORTATION': 0.3
                 }
             },
             {
                 'question_id': 2, 
                 'answer': 4,
                 'gift_correlation': {
-                    'SHEPHERDING': 0.9,
-                    'MERCY': 0.6,
-                    'SERVING': 0.3
+                    'EXHORTATION': 0.9,
+                    'COMPASSION': 0.6,
+                    'SERVICE': 0.3
                 }
             }
         ]
@@ -28,33 +28,35 @@ class GiftCalculatorTests(TestCase):
     def test_calculate_scores(self):
         results = self.calculator.calculate_scores(self.sample_answers)
         self.assertIsInstance(results, dict)
-        self.assertTrue(all(gift in results for gift in self.calculator.SPIRITUAL_GIFTS.keys()))
+        self.assertTrue(all(gift in results for gift in self.calculator.MOTIVATIONAL_GIFTS.keys()))
         
         # Verify some expected scores
         self.assertGreater(results['TEACHING'], 0)
-        self.assertGreater(results['SHEPHERDING'], 0)
+        self.assertGreater(results['EXHORTATION'], 0)
+        self.assertEqual(results['GIVING'], 0)
         self.assertLessEqual(max(results.values()), 1.0)
+        self.assertAlmostEqual(sum(results.values()), 1.0, places=4)
 
     def test_identify_gifts(self):
         scores = {
             'TEACHING': 0.8,
-            'SHEPHERDING': 0.75,
-            'LEADERSHIP': 0.7,
-            'MERCY': 0.5,
-            'SERVING': 0.4,
-            'ADMINISTRATION': 0.3,
-            'EVANGELISM': 0.2
+            'EXHORTATION': 0.75,
+            'ADMINISTRATION': 0.7,
+            'COMPASSION': 0.5,
+            'SERVICE': 0.4,
+            'GIVING': 0.3,
+            'PERCEPTION': 0.2
         }
         primary_gift, secondary_gifts = self.calculator.identify_gifts(scores)
         
         self.assertEqual(primary_gift, 'Teaching')
         self.assertEqual(len(secondary_gifts), 2)
-        self.assertIn('Shepherding', secondary_gifts)
-        self.assertIn('Leadership', secondary_gifts)
+        self.assertIn('Exhortation', secondary_gifts)
+        self.assertIn('Administration', secondary_gifts)
 
     def test_get_gift_descriptions(self):
         primary_gift = 'Teaching'
-        secondary_gifts = ['Leadership', 'Shepherding']
+        secondary_gifts = ['Administration', 'Perception']
         
         descriptions = self.calculator.get_gift_descriptions(primary_gift, secondary_gifts)
         
@@ -62,4 +64,5 @@ class GiftCalculatorTests(TestCase):
         self.assertIn('secondary', descriptions)
         self.assertEqual(descriptions['primary']['gift'], 'Teaching')
         self.assertTrue(descriptions['primary']['description'])
-        self.assertEqual(len(descriptions['secondary']), 2) 
\ No newline at end of file
+        self.assertEqual(len(descriptions['secondary']), 2)
+        self.assertEqual(descriptions['secondary'][1]['gift'], 'Perception (Prophecy)')
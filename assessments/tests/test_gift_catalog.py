@@ -0,0 +1,89 @@
+import json
+from django.test import TestCase
+from assessments.gift_calculator import GiftCalculator
+from users.ministry_roles import MINISTRY_ROLE_MAPPINGS
+
+GIFTS = GiftCalculator.MOTIVATIONAL_GIFTS
+
+
+def legacy_descriptions(primary_gift, secondary_gifts):
+    """Reference copy of the original prefix-scan lookup"""
+    def lookup(name):
+        key = next(k for k, v in GIFTS.items() if v['name'].upper().startswith(name.upper()))
+        return {
+            'gift': GIFTS[key]['name'],
+            'description': GIFTS[key]['description'],
+            'details': GIFTS[key]['details']
+        }
+    return {
+        'primary': lookup(primary_gift),
+        'secondary': [lookup(gift) for gift in secondary_gifts]
+    }
+
+
+def legacy_roles(primary_gift, secondary_gifts):
+    """Reference copy of the original per-request role mapping"""
+    roles = {'primary_roles': [], 'secondary_roles': [], 'ministry_areas': set()}
+    if primary_gift in MINISTRY_ROLE_MAPPINGS:
+        mapping = MINISTRY_ROLE_MAPPINGS[primary_gift]
+        roles['primary_roles'].extend(mapping['primary'])
+        roles['ministry_areas'].update(mapping['secondary'])
+    for gift in secondary_gifts:
+        if gift in MINISTRY_ROLE_MAPPINGS:
+            mapping = MINISTRY_ROLE_MAPPINGS[gift]
+            roles['secondary_roles'].extend(mapping['primary'][:2])
+            roles['ministry_areas'].update(mapping['secondary'])
+    roles['ministry_areas'] = sorted(roles['ministry_areas'])
+    roles['primary_roles'] = list(dict.fromkeys(roles['primary_roles']))
+    roles['secondary_roles'] = list(dict.fromkeys(roles['secondary_roles']))
+    return roles
+
+
+class GiftCatalogTests(TestCase):
+    def setUp(self):
+        self.calculator = GiftCalculator()
+        self.catalog = GiftCalculator.catalog
+        self.scores = {gift: round(1 / 7, 4) for gift in GIFTS}
+
+    def test_every_combination_is_precomputed(self):
+        # 7 primaries, each with 6 single or 30 ordered pairs of secondaries
+        self.assertEqual(len(self.catalog.combinations()), 7 * (6 + 30))
+
+    def test_lookup_variants_match_prefix_scan(self):
+        for key, gift in GIFTS.items():
+            short_name = gift['name'].split('(')[0].strip()
+            for variant in (key, gift['name'], short_name, short_name.lower(), short_name[:4]):
+                self.assertEqual(
+                    self.calculator.get_gift_descriptions(variant, [variant]),
+                    legacy_descriptions(variant, [variant])
+                )
+        with self.assertRaises(ValueError):
+            self.catalog.resolve('Leadership')
+
+    def test_descriptions_are_independent_copies(self):
+        first = self.calculator.get_gift_descriptions('Teaching', ['Service'])
+        first['primary']['gift'] = 'Changed'
+        second = self.calculator.get_gift_descriptions('Teaching', ['Service'])
+        self.assertEqual(second['primary']['gift'], 'Teaching')
+
+    def test_result_json_matches_legacy_result(self):
+        for primary_gift, secondary_gifts in self.catalog.combinations():
+            expected = {
+                'scores': self.scores,
+                'primary_gift': primary_gift,
+                'secondary_gifts': list(secondary_gifts),
+                'descriptions': legacy_descriptions(primary_gift, secondary_gifts),
+                'recommended_roles': legacy_roles(primary_gift, secondary_gifts)
+            }
+            body = self.catalog.result_json(self.scores, primary_gift, secondary_gifts)
+            self.assertEqual(json.loads(body), expected)
+
+    def test_result_json_without_roles(self):
+        body = json.loads(self.catalog.result_json(self.scores, 'Giving', ['Compassion'], with_roles=False))
+        self.assertEqual(body['recommended_roles'], {
+            'primary_roles': [], 'secondary_roles': [], 'ministry_areas': []
+        })
+        # Combinations identify_gifts never produces are still served
+        body = json.loads(self.catalog.result_json(self.scores, 'Giving', []))
+        self.assertEqual(body['descriptions']['secondary'], [])
+        self.assertEqual(body['recommended_roles'], legacy_roles('Giving', []))
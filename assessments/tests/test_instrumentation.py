@@ -0,0 +1,75 @@
+import io
+from contextlib import redirect_stdout
+from django.test import TestCase
+from fastapi.testclient import TestClient
+from assessments.gift_calculator import GiftCalculator
+from assessments.instrumentation import STAGES, Instrumentation, instrument, uninstrument
+
+ANSWERS = [
+    {'question_id': 1, 'answer': 5, 'gift_correlation': {'TEACHING': 1.0, 'PERCEPTION': 0.5}},
+    {'question_id': 2, 'answer': 2, 'gift_correlation': {'GIVING': 1.0, 'SERVICE': 0.3}},
+]
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        self.plain = {name: GiftCalculator.__dict__[name] for name in STAGES}
+        self.addCleanup(uninstrument, GiftCalculator)
+
+    def run_assessment(self):
+        calculator = GiftCalculator()
+        scores = calculator.calculate_scores(ANSWERS)
+        primary_gift, secondary_gifts = calculator.identify_gifts(scores)
+        calculator.get_gift_descriptions(primary_gift, secondary_gifts)
+        calculator.calculate_scores_batch([ANSWERS, ANSWERS, ANSWERS])
+
+    def test_disabled_leaves_methods_unwrapped(self):
+        self.assertIsNone(GiftCalculator.instrumentation)
+        for name, method in self.plain.items():
+            self.assertFalse(hasattr(method, '__wrapped_by_instrumentation__'))
+
+    def test_stage_timers_and_counters(self):
+        instrumentation = instrument(GiftCalculator, Instrumentation())
+        self.run_assessment()
+
+        snapshot = instrumentation.snapshot()
+        self.assertEqual(set(snapshot['stages']), {'scoring', 'selection', 'descriptions'})
+        self.assertEqual(snapshot['stages']['scoring']['calls'], 2)
+        self.assertEqual(snapshot['counters']['assessments_scored'], 4)
+        self.assertNotIn('traces', snapshot['counters'])
+
+        uninstrument(GiftCalculator)
+        for name, method in self.plain.items():
+            self.assertIs(GiftCalculator.__dict__[name], method)
+
+    def test_sampled_traces_go_to_debug_log(self):
+        instrumentation = instrument(GiftCalculator, Instrumentation(sample_rate=1.0))
+        with self.assertLogs('assessments.instrumentation', level='DEBUG') as logs:
+            self.run_assessment()
+        self.assertEqual(instrumentation.snapshot()['counters']['traces'], 4)
+        self.assertTrue(any('identify_gifts' in line for line in logs.output))
+
+    def test_prometheus_export(self):
+        instrumentation = instrument(GiftCalculator, Instrumentation())
+        self.run_assessment()
+        text = instrumentation.export_prometheus()
+        self.assertIn('pathfinders_gifts_stage_seconds_count{stage="scoring"} 2', text)
+        self.assertIn('pathfinders_gifts_assessments_scored_total 4', text)
+
+    def test_metrics_endpoint(self):
+        from fastapi_app.main import app
+        client = TestClient(app)
+        self.assertEqual(client.get('/metrics/').status_code, 404)
+
+        instrument(GiftCalculator, Instrumentation())
+        client.post('/calculate-gifts/', json={'answers': ANSWERS})
+        response = client.get('/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('stage="selection"', response.text)
+
+    def test_identify_gifts_does_not_print(self):
+        calculator = GiftCalculator()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            calculator.identify_gifts(calculator.calculate_scores(ANSWERS))
+        self.assertEqual(output.getvalue(), '')
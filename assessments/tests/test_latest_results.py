@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from assessments.gift_calculator import GiftCalculator
+from assessments.models import Assessment, GiftProfile
+from assessments.result_cache import LATEST_RESULTS_KEY
+
+User = get_user_model()
+
+SCORES = {
+    'TEACHING': 0.2, 'EXHORTATION': 0.18, 'ADMINISTRATION': 0.17, 'COMPASSION': 0.15,
+    'SERVICE': 0.12, 'GIVING': 0.1, 'PERCEPTION': 0.08
+}
+
+
+class LatestResultsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='latest', email='latest@example.com', password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('assessment-latest-results')
+        cache.delete(LATEST_RESULTS_KEY.format(user_id=self.user.id))
+
+    def complete(self, primary_gift, secondary_gifts):
+        assessment = Assessment.objects.create(user=self.user, completion_status=True, results_data={})
+        return GiftProfile.objects.create(
+            user=self.user,
+            assessment=assessment,
+            primary_gift=primary_gift,
+            secondary_gifts=secondary_gifts,
+            scores=SCORES
+        )
+
+    def test_profile_materializes_derived_fields(self):
+        profile = self.complete('Teaching', ['Exhortation', 'Administration'])
+        profile.refresh_from_db()
+        self.assertEqual(profile.description_keys, ['TEACHING', 'EXHORTATION', 'ADMINISTRATION'])
+        self.assertEqual(
+            profile.recommended_roles,
+            GiftCalculator.catalog.recommended_roles('Teaching', ['Exhortation', 'Administration'])
+        )
+        self.assertEqual(
+            profile.get_descriptions(),
+            GiftCalculator().get_gift_descriptions('Teaching', ['Exhortation', 'Administration'])
+        )
+
+    @override_settings(LATEST_RESULTS_CACHE_TIMEOUT=0)
+    def test_single_query(self):
+        self.complete('Teaching', ['Exhortation'])
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['primary_gift'], 'Teaching')
+        self.assertEqual(response.data['descriptions']['secondary'][0]['gift'], 'Exhortation')
+        self.assertTrue(response.data['recommended_roles']['primary_roles'])
+
+    def test_cached_until_next_result(self):
+        self.complete('Teaching', ['Exhortation'])
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).data['primary_gift'], 'Teaching')
+
+        self.complete('Giving', ['Compassion'])
+        self.assertEqual(self.client.get(self.url).data['primary_gift'], 'Giving')
+
+    def test_incomplete_assessments_are_ignored(self):
+        profile = self.complete('Teaching', ['Exhortation'])
+        Assessment.objects.filter(id=profile.assessment_id).update(completion_status=False)
+        cache.delete(LATEST_RESULTS_KEY.format(user_id=self.user.id))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
@@ -1,9 +1,12 @@
+from unittest.mock import patch
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from assessments.models import Assessment, Question
+from assessments.gift_calculator import GiftCalculator
+from assessments.question_bank import get_question_bank
 
 User = get_user_model()
 
@@ -48,4 +51,93 @@ class ProgressTrackingTests(TestCase):
     def tearDown(self):
         # Clean up created objects
         User.objects.all().delete()
-        Assessment.objects.all().delete() 
\ No newline at end of file
+        Assessment.objects.all().delete() 
+
+class RunningScoreTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='runner',
+            email='runner@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.assessment = Assessment.objects.create(user=self.user)
+        correlations = [
+            {'PERCEPTION': 1.0, 'TEACHING': 0.3},
+            {'SERVICE': 1.0, 'COMPASSION': 0.5},
+            {'TEACHING': 1.0, 'PERCEPTION': 0.4},
+            {'GIVING': 1.0, 'SERVICE': 0.4},
+        ]
+        self.questions = [
+            Question.objects.create(category='Test', text=f'Question {i}', gift_correlation=c)
+            for i, c in enumerate(correlations)
+        ]
+        self.save_progress_url = reverse('assessment-save-progress')
+        self.provisional_url = reverse('assessment-provisional-results', kwargs={'pk': self.assessment.pk})
+
+    def answers(self, values):
+        return [
+            {'question_id': q.id, 'answer': v}
+            for q, v in zip(self.questions, values)
+        ]
+
+    def test_accumulators_track_full_rescore(self):
+        calculator = GiftCalculator()
+        bank = get_question_bank()
+        for values in ([5], [5, 2], [3, 2, 4], [3, 2, 4, 1], [1, 5, 4, 1], [1, 5]):
+            response = self.client.post(
+                self.save_progress_url,
+                {'current_answers': self.answers(values)},
+                format='json'
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['answered'], len(values))
+
+            provisional = self.client.get(self.provisional_url).data
+            expected = calculator.calculate_scores(self.answers(values), question_bank=bank)
+            for gift, score in expected.items():
+                self.assertAlmostEqual(provisional['scores'][gift], score, places=4)
+
+    def test_submit_uses_running_totals(self):
+        answers = self.answers([4, 2, 5, 3])
+        self.client.post(self.save_progress_url, {'current_answers': answers}, format='json')
+
+        with patch('assessments.views.FastAPIClient') as mock_client:
+            response = self.client.post(reverse('assessment-submit'), {'answers': answers}, format='json')
+            mock_client.return_value.calculate_gifts_sync.assert_not_called()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = GiftCalculator().calculate_scores(answers, question_bank=get_question_bank())
+        self.assertEqual(response.data['scores'], expected)
+
+    def test_final_scores_do_not_depend_on_entry_order(self):
+        # Same final answers, reached through different orders and edits
+        histories = [
+            ([5], [5, 2], [5, 2, 4], [3, 2, 4, 1]),
+            ([1, 1, 1, 1], [2, 5, 1, 1], [3, 5, 4, 2], [3, 2, 4, 1]),
+        ]
+        final = self.answers([3, 2, 4, 1])
+        submitted = []
+        for number, history in enumerate(histories):
+            user = User.objects.create_user(username=f'order-{number}', email=f'order-{number}@example.com')
+            self.client.force_authenticate(user=user)
+            Assessment.objects.create(user=user)
+            for values in history:
+                answers = self.answers(values)
+                self.client.post(self.save_progress_url, {'current_answers': answers[::-1]}, format='json')
+
+            with patch('assessments.views.FastAPIClient') as mock_client:
+                response = self.client.post(reverse('assessment-submit'), {'answers': final}, format='json')
+                mock_client.return_value.calculate_gifts_sync.assert_not_called()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            submitted.append(response.data['scores'])
+
+        self.assertEqual(submitted[0], submitted[1])
+        self.assertEqual(submitted[0], GiftCalculator().calculate_scores(final, question_bank=get_question_bank()))
+
+    def test_provisional_results_before_any_answers(self):
+        response = self.client.get(self.provisional_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['answered'], 0)
+        self.assertIsNone(response.data['scores'])
@@ -0,0 +1,139 @@
+import threading
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from assessments.gift_calculator import GiftCalculator
+from assessments.models import Assessment, Question
+from assessments.progress_buffer import PeriodicFlusher, ProgressBuffer
+from assessments.question_bank import get_question_bank
+
+User = get_user_model()
+
+
+class ProgressDeltaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.buffer = ProgressBuffer(cache, flush_interval=3600, max_pending=50)
+        patcher = patch('assessments.progress_buffer._progress_buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='delta', email='delta@example.com')
+        self.client.force_authenticate(user=self.user)
+        self.assessment = Assessment.objects.create(user=self.user)
+        self.questions = [
+            Question.objects.create(category='Test', text=f'Question {i}', gift_correlation=c)
+            for i, c in enumerate([{'TEACHING': 1.0}, {'SERVICE': 1.0, 'GIVING': 0.4}, {'GIVING': 1.0}])
+        ]
+        get_question_bank()
+        self.url = reverse('assessment-progress-delta')
+
+    def send(self, seq, answers, **extra):
+        body = {'seq': seq, 'answers': {str(self.questions[i].id): v for i, v in answers.items()}, **extra}
+        return self.client.post(self.url, body, format='json')
+
+    def saved(self):
+        return Assessment.objects.get(pk=self.assessment.pk).results_data
+
+    def test_deltas_are_buffered_without_writing_the_row(self):
+        self.send(1, {0: 4})
+        # Only the in-progress lookup reaches the database
+        with self.assertNumQueries(1):
+            response = self.send(2, {1: 2, 0: 5})
+        self.assertEqual(response.data['status'], 'buffered')
+        self.assertEqual(response.data['pending'], 2)
+        self.assertIsNone(self.saved())
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['seq'], 2)
+        self.assertEqual(response.data['answers'], {str(self.questions[0].id): 5, str(self.questions[1].id): 2})
+        progress = self.client.get(reverse('assessment-get-progress')).data
+        self.assertEqual(len(progress), 2)
+
+    def test_repeats_are_acknowledged_and_gaps_refused(self):
+        self.send(1, {0: 4})
+        response = self.send(1, {0: 1})
+        self.assertTrue(response.data['duplicate'])
+        self.assertEqual(self.client.get(self.url).data['answers'], {str(self.questions[0].id): 4})
+
+        response = self.send(3, {1: 2})
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['expected_seq'], 2)
+
+    def test_invalid_deltas_are_rejected(self):
+        self.assertEqual(self.send(1, {0: 6}).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, {'seq': 1, 'answers': {'999999': 3}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_end_session_writes_answers_and_running_totals(self):
+        self.send(1, {0: 4, 1: 3})
+        response = self.send(2, {1: None, 2: 5}, end_session=True)
+        self.assertEqual(response.data['status'], 'flushed')
+
+        saved = self.saved()
+        self.assertEqual(saved['progress_seq'], 2)
+        self.assertEqual(
+            {a['question_id']: a['answer'] for a in saved['progress']},
+            {self.questions[0].id: 4, self.questions[2].id: 5}
+        )
+        expected = GiftCalculator().calculate_scores(saved['progress'], question_bank=get_question_bank())
+        provisional = self.client.get(
+            reverse('assessment-provisional-results', kwargs={'pk': self.assessment.pk})
+        ).data
+        for gift, score in expected.items():
+            self.assertAlmostEqual(provisional['scores'][gift], score, places=4)
+
+    def test_flush_when_max_pending_or_interval_is_reached(self):
+        self.buffer.max_pending = 2
+        self.assertEqual(self.send(1, {0: 4}).data['status'], 'buffered')
+        self.assertEqual(self.send(2, {1: 4}).data['status'], 'flushed')
+
+        self.buffer.max_pending = 50
+        self.buffer.flush_interval = 0
+        self.assertEqual(self.send(3, {2: 1}).data['status'], 'flushed')
+        self.assertEqual(len(self.saved()['progress']), 3)
+
+    def test_flush_all_writes_everything_left_at_shutdown(self):
+        self.send(1, {0: 2, 2: 3})
+        self.assertEqual(self.buffer.flush_all(), 1)
+        self.assertEqual(len(self.saved()['progress']), 2)
+
+        # With the cache gone the sequence resumes from the database
+        cache.clear()
+        self.assertTrue(self.send(1, {0: 5}).data['duplicate'])
+        self.assertEqual(self.send(2, {0: 5}).status_code, status.HTTP_200_OK)
+
+    def test_idle_sessions_are_flushed_in_the_background(self):
+        self.send(1, {0: 2})
+        # Answers younger than the interval are left alone
+        self.assertEqual(PeriodicFlusher(self.buffer, interval=3600).tick(), 0)
+        self.assertIsNone(self.saved())
+        self.assertEqual(PeriodicFlusher(self.buffer, interval=0).tick(), 1)
+        self.assertEqual(len(self.saved()['progress']), 1)
+
+    def test_flusher_thread_runs_every_interval(self):
+        ticked = threading.Event()
+        flusher = PeriodicFlusher(self.buffer, interval=0.01)
+        with patch.object(self.buffer, 'flush_all', side_effect=lambda min_age: ticked.set() or 0) as flush_all:
+            flusher.start()
+            self.assertTrue(ticked.wait(2))
+            flusher.stop()
+            flusher.join(2)
+        self.assertFalse(flusher.is_alive())
+        flush_all.assert_called_with(min_age=0.01)
+
+    def test_submit_flushes_buffered_answers_first(self):
+        self.send(1, {0: 4, 1: 2, 2: 5})
+        answers = [{'question_id': q.id, 'answer': v} for q, v in zip(self.questions, (4, 2, 5))]
+
+        with patch('assessments.views.FastAPIClient') as mock_client:
+            response = self.client.post(reverse('assessment-submit'), {'answers': answers}, format='json')
+            # The flushed progress covers the submission
+            mock_client.return_value.calculate_gifts_sync.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(self.saved()['progress']), 3)
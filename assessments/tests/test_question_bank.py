@@ -0,0 +1,272 @@
+import io
+import os
+import stat
+from unittest.mock import patch
+import numpy as np
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from assessments.gift_calculator import GiftCalculator
+from assessments import question_bank as question_bank_module
+from assessments.models import Question
+from assessments.question_bank import (
+    QUESTION_BANK_VERSION_KEY,
+    CompiledQuestionBank,
+    artifact_path,
+    get_question_bank,
+    invalidate_question_bank,
+    load_artifact
+)
+from assessments.result_cache import get_result_cache
+
+User = get_user_model()
+
+CORRELATIONS = [
+    {'PERCEPTION': 1.0, 'TEACHING': 0.3, 'ADMINISTRATION': 0.2},
+    {'SERVICE': 1.0, 'COMPASSION': 0.5, 'EXHORTATION': 0.3},
+    {'TEACHING': 1.0, 'PERCEPTION': 0.4},
+    {'GIVING': 1.0, 'SERVICE': 0.4, 'COMPASSION': 0.3},
+    {'compassion': 1.0, 'exhortation': 0.4},
+]
+
+
+class CompiledQuestionBankTests(TestCase):
+    def setUp(self):
+        self.questions = [
+            Question.objects.create(
+                category='Test',
+                text=f'Question {i}',
+                gift_correlation=correlation
+            )
+            for i, correlation in enumerate(CORRELATIONS)
+        ]
+        self.calculator = GiftCalculator()
+
+    def test_bank_scoring_matches_client_correlations(self):
+        bank = get_question_bank()
+        answers = [
+            {
+                'question_id': q.id,
+                'answer': (i % 5) + 1,
+                'gift_correlation': {k.upper(): v for k, v in q.gift_correlation.items()}
+            }
+            for i, q in enumerate(self.questions)
+        ]
+        compact = [{'question_id': a['question_id'], 'answer': a['answer']} for a in answers]
+        self.assertEqual(
+            self.calculator.calculate_scores(compact, question_bank=bank),
+            self.calculator.calculate_scores(answers)
+        )
+
+    def test_client_correlations_are_ignored_with_bank(self):
+        bank = get_question_bank()
+        honest = [{'question_id': q.id, 'answer': 3} for q in self.questions]
+        tampered = [dict(a, gift_correlation={'GIVING': 100.0}) for a in honest]
+        self.assertEqual(
+            self.calculator.calculate_scores(tampered, question_bank=bank),
+            self.calculator.calculate_scores(honest, question_bank=bank)
+        )
+
+    def test_unknown_question_rejected(self):
+        bank = get_question_bank()
+        with self.assertRaises(ValueError):
+            bank.matrix_for([self.questions[0].id, 987654])
+
+    def test_bank_is_cached_and_invalidated_on_save(self):
+        bank = get_question_bank()
+        with self.assertNumQueries(0):
+            self.assertIs(get_question_bank(), bank)
+
+        question = self.questions[0]
+        question.gift_correlation = {'PERCEPTION': 0.9}
+        question.save()
+
+        reloaded = get_question_bank()
+        self.assertNotEqual(reloaded.version, bank.version)
+        self.assertEqual(reloaded.correlation_for(question.id), {'PERCEPTION': 0.9})
+
+    def test_payload_round_trip_keeps_version(self):
+        bank = get_question_bank()
+        copy = CompiledQuestionBank.from_payload(bank.to_payload())
+        self.assertEqual(copy.version, bank.version)
+        self.assertEqual(copy.matrix.tolist(), bank.matrix.tolist())
+
+        payload = bank.to_payload()
+        payload['gift_correlations'][0] = {'GIVING': 1.0}
+        with self.assertRaises(ValueError):
+            CompiledQuestionBank.from_payload(payload)
+
+
+class CompactSubmissionTests(TestCase):
+    def setUp(self):
+        get_result_cache().clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='banktester',
+            email='bank@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.questions = [
+            Question.objects.create(category='Test', text=f'Question {i}', gift_correlation=c)
+            for i, c in enumerate(CORRELATIONS)
+        ]
+
+    @patch('assessments.views.FastAPIClient')
+    def test_submit_forwards_ids_and_bank_version_only(self, mock_client):
+        mock_client.return_value.calculate_gifts_sync.return_value = {
+            'scores': {'TEACHING': 1.0},
+            'primary_gift': 'Teaching',
+            'secondary_gifts': ['Perception'],
+        }
+        answers = [
+            {'question_id': q.id, 'answer': 4, 'gift_correlation': {'GIVING': 9.0}}
+            for q in self.questions
+        ]
+        response = self.client.post(reverse('assessment-submit'), {'answers': answers}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        payload = mock_client.return_value.calculate_gifts_sync.call_args[0][0]
+        self.assertEqual(payload['question_bank_version'], get_question_bank().version)
+        self.assertEqual(payload['answers'], [{'question_id': q.id, 'answer': 4} for q in self.questions])
+
+    def test_submit_rejects_unknown_question(self):
+        response = self.client.post(
+            reverse('assessment-submit'),
+            {'answers': [{'question_id': 987654, 'answer': 3}]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class CompiledArtifactTests(TestCase):
+    def setUp(self):
+        self.path = artifact_path()
+        invalidate_question_bank()
+
+    def test_artifact_round_trip(self):
+        bank = CompiledQuestionBank([3, 1, 2], CORRELATIONS[:3], [1.0, 0.5, 2.0])
+        loaded = CompiledQuestionBank.load(bank.save(self.path))
+        self.assertEqual(loaded.version, bank.version)
+        self.assertEqual(loaded.question_ids.tolist(), [3, 1, 2])
+        self.assertEqual(loaded.weights.tolist(), [1.0, 0.5, 2.0])
+        self.assertEqual(loaded.matrix.tolist(), bank.matrix.tolist())
+        # Readable by a service running as another user
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o644)
+
+    def test_tampered_artifact_is_ignored(self):
+        bank = CompiledQuestionBank([1], CORRELATIONS[:1], [1.0])
+        bank.save(self.path)
+        with np.load(self.path) as data:
+            arrays = dict(data)
+        arrays['matrix'] = arrays['matrix'] * 2
+        with open(self.path, 'wb') as f:
+            np.savez(f, **arrays)
+        with self.assertLogs('assessments.question_bank', level='WARNING'):
+            self.assertIsNone(load_artifact())
+
+    def test_fresh_process_loads_without_queries(self):
+        Question.objects.create(category='Test', text='Question', gift_correlation=CORRELATIONS[0])
+        bank = get_question_bank()
+        self.assertTrue(self.path.exists())
+
+        # Simulate a new process: nothing in memory or in the shared cache
+        question_bank_module._question_bank = None
+        cache.delete(QUESTION_BANK_VERSION_KEY)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_question_bank().version, bank.version)
+
+    def test_question_change_removes_stale_artifact(self):
+        question = Question.objects.create(category='Test', text='Question', gift_correlation=CORRELATIONS[0])
+        get_question_bank()
+        question.gift_correlation = {'GIVING': 1.0}
+        question.save()
+        self.assertFalse(self.path.exists())
+        self.assertEqual(get_question_bank().correlation_for(question.id), {'GIVING': 1.0})
+
+
+class LoadQuestionsCommandTests(TestCase):
+    def load(self):
+        out = io.StringIO()
+        call_command('load_questions', stdout=out)
+        return out.getvalue()
+
+    def test_bulk_load_then_noop(self):
+        invalidate_question_bank()
+        with self.assertNumQueries(5):
+            # Existing-row lookup, bulk insert in a savepoint, and the bank compile
+            output = self.load()
+        self.assertIn('70 created, 0 updated, 0 unchanged', output)
+        self.assertIn('written to', output)
+        bank = CompiledQuestionBank.load(artifact_path())
+        self.assertEqual(len(bank), 70)
+        self.assertEqual(bank.version, get_question_bank().version)
+
+        with self.assertNumQueries(1):
+            output = self.load()
+        self.assertIn('0 created, 0 updated, 70 unchanged', output)
+        self.assertIn('unchanged at', output)
+
+    def test_changed_question_invalidates_bank(self):
+        self.load()
+        before = get_question_bank().version
+        question = Question.objects.order_by('id').first()
+        Question.objects.filter(id=question.id).update(weight=2.0)  # No signal, like a raw edit
+
+        output = self.load()
+        self.assertIn('0 created, 1 updated, 69 unchanged', output)
+        self.assertEqual(get_question_bank().version, before)
+        self.assertEqual(Question.objects.get(id=question.id).weight, 1.0)
+
+
+class QuestionListCacheTests(TestCase):
+    def setUp(self):
+        self.questions = [
+            Question.objects.create(category='Test', text=f'Question {i}', gift_correlation=correlation)
+            for i, correlation in enumerate(CORRELATIONS)
+        ]
+        self.user = User.objects.create_user(username='lister', email='lister@example.com', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('question-list-all')
+
+    def test_list_is_serialized_once(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([q['id'] for q in first.json()], [q.id for q in self.questions])
+        self.assertEqual(first.json()[0]['gift_correlation'], CORRELATIONS[0])
+        self.assertEqual(first['X-Question-Bank-Version'], get_question_bank().version)
+        self.assertIn('max-age', first['Cache-Control'])
+        self.assertIn('private', first['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        for header in (etag, f'W/{etag}', f'"stale", {etag}', '*'):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=header)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['ETag'], etag)
+            self.assertEqual(response.content, b'')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_loader_and_edits_invalidate(self):
+        etag = self.client.get(self.url)['ETag']
+
+        # Text isn't part of the bank version, but the list must still change
+        self.questions[0].text = 'Reworded question'
+        self.questions[0].save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['text'], 'Reworded question')
+
+        call_command('load_questions', stdout=io.StringIO())
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), len(self.questions) + 70)
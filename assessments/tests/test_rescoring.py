@@ -0,0 +1,120 @@
+import io
+import json
+import os
+import tempfile
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from assessments.gift_calculator import GiftCalculator
+from assessments.models import Assessment, GiftProfile, Question
+from assessments.question_bank import get_question_bank
+from books.models import Book, BookAccess
+
+User = get_user_model()
+
+
+class RescoreAssessmentsTests(TestCase):
+    def setUp(self):
+        self.questions = [
+            Question.objects.create(category='Test', text=f'Question {i}', gift_correlation=c)
+            for i, c in enumerate([
+                {'TEACHING': 1.0, 'PERCEPTION': 0.3},
+                {'GIVING': 1.0, 'SERVICE': 0.4},
+                {'COMPASSION': 1.0, 'EXHORTATION': 0.5},
+            ])
+        ]
+        handle, self.checkpoint = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        os.remove(self.checkpoint)
+        self.addCleanup(lambda: os.path.exists(self.checkpoint) and os.remove(self.checkpoint))
+
+        self.user = User.objects.create_user(username='rescore', email='rescore@example.com', password='pass12345')
+        self.assessments = []
+        for values in ([5, 1, 1], [1, 5, 1], [1, 1, 5], [5, 4, 1], [2, 2, 5]):
+            answers = [{'question_id': q.id, 'answer': v} for q, v in zip(self.questions, values)]
+            # Stored results are stale: everything claims Perception
+            assessment = Assessment.objects.create(
+                user=self.user,
+                completion_status=True,
+                results_data={'primary_gift': 'Perception', 'secondary_gifts': ['Service'],
+                              'scores': {}, 'answers': answers}
+            )
+            GiftProfile.objects.create(
+                user=self.user, assessment=assessment, primary_gift='Perception',
+                secondary_gifts=['Service'], scores={}
+            )
+            self.assessments.append((assessment, answers))
+        # No stored answers: can't be re-scored
+        Assessment.objects.create(user=self.user, completion_status=True, results_data={'scores': {}})
+
+    def rescore(self, *args):
+        out = io.StringIO()
+        call_command('rescore_assessments', '--checkpoint', self.checkpoint, *args, stdout=out)
+        return out.getvalue()
+
+    def expected(self, answers):
+        calculator = GiftCalculator()
+        scores = calculator.calculate_scores(answers, question_bank=get_question_bank())
+        return scores, calculator.identify_gifts(scores)
+
+    def test_dry_run_reports_without_writing(self):
+        output = self.rescore('--dry-run', '--workers', '1')
+        self.assertIn('Re-scored 5 assessments', output)
+        self.assertIn('5 primary gifts would change, 1 skipped', output)
+        self.assertFalse(GiftProfile.objects.exclude(primary_gift='Perception').exists())
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def check_rescored(self):
+        for assessment, answers in self.assessments:
+            scores, (primary_gift, secondary_gifts) = self.expected(answers)
+            assessment.refresh_from_db()
+            self.assertEqual(assessment.results_data['scores'], scores)
+            self.assertEqual(assessment.results_data['primary_gift'], primary_gift)
+            self.assertEqual(assessment.results_data['answers'], answers)
+            profile = GiftProfile.objects.get(assessment=assessment)
+            self.assertEqual(profile.primary_gift, primary_gift)
+            self.assertEqual(profile.secondary_gifts, secondary_gifts)
+            self.assertEqual(profile.description_keys[0], GiftCalculator.catalog.resolve(primary_gift))
+
+    def test_rescore_in_process_pool(self):
+        output = self.rescore('--workers', '2', '--chunk-size', '2')
+        self.assertIn('5 primary gifts changed', output)
+        self.check_rescored()
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_book_access_follows_the_rescored_latest_profile(self):
+        exhortation = Book.objects.create(slug='exhortation', title='Exhortation', associated_gift='EXHORTATION',
+                                          copyright_info='Test', version='1.0')
+        perception = Book.objects.create(slug='perception', title='Perception', associated_gift='PERCEPTION',
+                                         copyright_info='Test', version='1.0')
+        BookAccess.objects.create(user=self.user, book=perception, access_reason='PRIMARY')
+
+        # The latest assessment re-scores to Exhortation, so access moves with it
+        output = self.rescore('--workers', '1')
+        self.assertIn('Book access re-granted for 1 users', output)
+        self.assertFalse(BookAccess.objects.get(user=self.user, book=perception).is_active)
+        access = BookAccess.objects.get(user=self.user, book=exhortation)
+        self.assertTrue(access.is_active)
+        self.assertEqual(access.access_reason, 'PRIMARY')
+
+    def test_resume_from_checkpoint(self):
+        resume_after = self.assessments[2][0].id
+        with open(self.checkpoint, 'w') as f:
+            json.dump({'bank_version': get_question_bank().version, 'last_id': resume_after,
+                       'processed': 3, 'changed': 3, 'skipped': 0}, f)
+
+        output = self.rescore('--workers', '1', '--chunk-size', '2')
+        self.assertIn(f'Resuming after assessment {resume_after}', output)
+        self.assertIn('Re-scored 5 assessments', output)
+        rescored = set(GiftProfile.objects.exclude(primary_gift='Perception').values_list('assessment_id', flat=True))
+        self.assertTrue(rescored <= {a.id for a, _ in self.assessments[3:]})
+        self.assertEqual(
+            GiftProfile.objects.filter(assessment_id__lte=resume_after).exclude(primary_gift='Perception').count(), 0
+        )
+
+    def test_checkpoint_for_another_bank_is_ignored(self):
+        with open(self.checkpoint, 'w') as f:
+            json.dump({'bank_version': 'old', 'last_id': 10 ** 9,
+                       'processed': 0, 'changed': 0, 'skipped': 0}, f)
+        self.rescore('--workers', '1')
+        self.check_rescored()
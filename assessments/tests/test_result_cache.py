@@ -0,0 +1,91 @@
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from assessments.models import Question
+from assessments.question_bank import get_question_bank
+from assessments.result_cache import ResultCache, get_result_cache, result_key, scores_key
+
+User = get_user_model()
+
+RESULT = {
+    'scores': {'TEACHING': 0.6, 'SERVICE': 0.4},
+    'primary_gift': 'Teaching',
+    'secondary_gifts': ['Service'],
+}
+
+
+class ResultCacheTests(TestCase):
+    def test_keys_are_content_addressed(self):
+        answers = [{'question_id': 1, 'answer': 5}, {'question_id': 2, 'answer': 3}]
+        same = [{'question_id': 1, 'answer': 5, 'gift_correlation': {}}, {'question_id': 2, 'answer': 3}]
+        self.assertEqual(result_key('abc', answers), result_key('abc', same))
+        self.assertNotEqual(result_key('abc', answers), result_key('abd', answers))
+        self.assertNotEqual(result_key('abc', answers), result_key('abc', answers[::-1]))
+        self.assertEqual(scores_key({'A': 0.5, 'B': 0.5}), scores_key({'B': 0.5, 'A': 0.5}))
+
+    def test_lru_eviction_and_stats(self):
+        result_cache = ResultCache(max_entries=2)
+        result_cache.set('a', RESULT)
+        result_cache.set('b', RESULT)
+        self.assertIsNotNone(result_cache.get('a'))  # 'b' is now least recently used
+        result_cache.set('c', RESULT)
+
+        self.assertIsNone(result_cache.get('b'))
+        self.assertEqual(result_cache.get('c'), RESULT)
+        stats = result_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (2, 1, 1))
+        self.assertEqual(stats['entries'], 2)
+
+    def test_entries_are_copied(self):
+        result_cache = ResultCache()
+        result_cache.set('a', RESULT)
+        result_cache.get('a')['secondary_gifts'].append('Giving')
+        self.assertEqual(result_cache.get('a')['secondary_gifts'], ['Service'])
+
+    def test_shared_tier_fills_other_processes(self):
+        writer = ResultCache(shared=cache, prefix='test:result:')
+        reader = ResultCache(shared=cache, prefix='test:result:')
+        writer.set('a', RESULT)
+
+        self.assertEqual(reader.get('a'), RESULT)
+        self.assertEqual(reader.get('a'), RESULT)
+        stats = reader.stats()
+        self.assertEqual((stats['shared_hits'], stats['hits']), (1, 1))
+
+    def test_get_or_compute_runs_once(self):
+        result_cache = ResultCache()
+        calls = []
+        for _ in range(3):
+            result_cache.get_or_compute('a', lambda: calls.append(1) or RESULT)
+        self.assertEqual(len(calls), 1)
+
+
+class MemoizedSubmitTests(TestCase):
+    def setUp(self):
+        get_result_cache().clear()
+        self.client = APIClient()
+        self.questions = [
+            Question.objects.create(category='Test', text=f'Question {i}', gift_correlation=c)
+            for i, c in enumerate([{'TEACHING': 1.0}, {'SERVICE': 1.0, 'GIVING': 0.4}])
+        ]
+
+    def submit(self, username):
+        user = User.objects.create_user(username=username, email=f'{username}@example.com', password='pass12345')
+        self.client.force_authenticate(user=user)
+        answers = [{'question_id': q.id, 'answer': 4} for q in self.questions]
+        return self.client.post(reverse('assessment-submit'), {'answers': answers}, format='json')
+
+    @patch('assessments.views.FastAPIClient')
+    def test_repeated_answers_skip_fastapi(self, mock_client):
+        mock_client.return_value.calculate_gifts_sync.return_value = RESULT
+        first = self.submit('first')
+        second = self.submit('second')
+
+        self.assertEqual(mock_client.return_value.calculate_gifts_sync.call_count, 1)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data['scores'], first.data['scores'])
+        self.assertEqual(second.data['primary_gift'], 'Teaching')
+        self.assertEqual(get_result_cache().stats()['hits'], 1)
@@ -0,0 +1,149 @@
+import random
+import numpy as np
+from django.test import TestCase
+from assessments.gift_calculator import GiftCalculator
+
+
+def legacy_calculate_scores(answers):
+    """Reference copy of the original per-answer scoring loop"""
+    gifts = GiftCalculator.MOTIVATIONAL_GIFTS.keys()
+    raw_scores = {gift: 0.0 for gift in gifts}
+    max_possible_scores = {gift: 0.0 for gift in gifts}
+
+    for answer in answers:
+        score = answer['answer']
+        for gift, correlation in answer['gift_correlation'].items():
+            if gift in raw_scores:
+                raw_scores[gift] += score * correlation
+                max_possible_scores[gift] += 5 * correlation
+
+    normalized_scores = {}
+    for gift in raw_scores:
+        if max_possible_scores[gift] > 0:
+            normalized_scores[gift] = raw_scores[gift] / max_possible_scores[gift]
+        else:
+            normalized_scores[gift] = 0.0
+
+    total = sum(normalized_scores.values())
+    if total > 0:
+        final_scores = {}
+        running_total = 0
+        sorted_gifts = sorted(normalized_scores.items(), key=lambda x: x[1], reverse=True)
+        for gift, score in sorted_gifts[:-1]:
+            rounded_score = round(score / total, 4)
+            final_scores[gift] = rounded_score
+            running_total += rounded_score
+        final_scores[sorted_gifts[-1][0]] = round(1 - running_total, 4)
+        return dict(sorted(final_scores.items()))
+
+    equal_share = round(1.0 / len(normalized_scores), 4)
+    return {gift: equal_share for gift in normalized_scores}
+
+
+def random_answers(rng, count=70):
+    gifts = list(GiftCalculator.MOTIVATIONAL_GIFTS.keys())
+    answers = []
+    for question_id in range(1, count + 1):
+        correlation = {rng.choice(gifts): 1.0}
+        for gift in rng.sample(gifts, rng.randint(0, 3)):
+            correlation.setdefault(gift, rng.choice([0.2, 0.3, 0.4, 0.5, 0.6]))
+        answers.append({
+            'question_id': question_id,
+            'answer': rng.randint(1, 5),
+            'gift_correlation': correlation
+        })
+    return answers
+
+
+class ScoringEngineTests(TestCase):
+    def setUp(self):
+        self.calculator = GiftCalculator()
+        self.rng = random.Random(1234)
+
+    def test_matches_legacy_loop_exactly(self):
+        for _ in range(500):
+            answers = random_answers(self.rng, self.rng.randint(1, 70))
+            scores = self.calculator.calculate_scores(answers)
+            expected = legacy_calculate_scores(answers)
+            self.assertEqual(list(scores.items()), list(expected.items()))
+
+    def test_uniform_answers_keep_tie_order(self):
+        answers = random_answers(self.rng)
+        for answer in answers:
+            answer['answer'] = 3
+            answer['gift_correlation'] = {gift: 1.0 for gift in GiftCalculator.MOTIVATIONAL_GIFTS}
+        self.assertEqual(
+            self.calculator.calculate_scores(answers),
+            legacy_calculate_scores(answers)
+        )
+
+    def test_unknown_gifts_are_ignored(self):
+        answers = [
+            {'question_id': 1, 'answer': 4, 'gift_correlation': {'TEACHING': 0.8, 'LEADERSHIP': 0.6}},
+            {'question_id': 2, 'answer': 2, 'gift_correlation': {'MERCY': 1.0, 'SERVICE': 0.3}},
+        ]
+        scores = self.calculator.calculate_scores(answers)
+        self.assertEqual(scores, legacy_calculate_scores(answers))
+        self.assertNotIn('LEADERSHIP', scores)
+        self.assertAlmostEqual(sum(scores.values()), 1.0, places=4)
+
+    def test_no_answers_falls_back_to_equal_shares(self):
+        scores = self.calculator.calculate_scores([])
+        self.assertEqual(list(scores), list(GiftCalculator.MOTIVATIONAL_GIFTS))
+        self.assertTrue(all(score == round(1 / 7, 4) for score in scores.values()))
+
+
+class BatchScoringTests(TestCase):
+    def setUp(self):
+        self.calculator = GiftCalculator()
+        self.rng = random.Random(99)
+
+    def test_batch_matches_single_scoring(self):
+        shared = random_answers(self.rng)
+        answer_sets = []
+        for _ in range(40):
+            answers = [dict(answer, answer=self.rng.randint(1, 5)) for answer in shared]
+            answer_sets.append(answers)
+        # Respondents with a different question set are scored in their own group
+        answer_sets.append(random_answers(self.rng, 12))
+        answer_sets.append([])
+
+        batch = self.calculator.calculate_scores_batch(answer_sets)
+        expected = [self.calculator.calculate_scores(answers) for answers in answer_sets]
+        self.assertEqual([list(s.items()) for s in batch], [list(s.items()) for s in expected])
+
+    def test_batch_keeps_each_respondents_correlations(self):
+        # Same question ids, different client-sent correlations
+        a = [{'question_id': 1, 'answer': 5, 'gift_correlation': {'SERVICE': 1.0}},
+             {'question_id': 2, 'answer': 1, 'gift_correlation': {'TEACHING': 1.0}}]
+        b = [{'question_id': 1, 'answer': 5, 'gift_correlation': {'TEACHING': 1.0}},
+             {'question_id': 2, 'answer': 1, 'gift_correlation': {'SERVICE': 1.0}}]
+        batch = self.calculator.calculate_scores_batch([a, b])
+        self.assertEqual(batch, [self.calculator.calculate_scores(a), self.calculator.calculate_scores(b)])
+        self.assertNotEqual(batch[0], batch[1])
+
+    def test_batch_selection_matches_identify_gifts(self):
+        answer_sets = [random_answers(self.rng) for _ in range(60)]
+        scores = self.calculator.calculate_scores_batch(answer_sets)
+        # Force ties and a no-runner-up case through the selection rules
+        scores.append({gift: round(1 / 7, 4) for gift in GiftCalculator.MOTIVATIONAL_GIFTS})
+        lopsided = {gift: 0.0 for gift in GiftCalculator.MOTIVATIONAL_GIFTS}
+        lopsided['GIVING'] = 1.0
+        scores.append(lopsided)
+
+        for threshold in (0.80, 0.95):
+            batch = self.calculator.identify_gifts_batch(scores, threshold_factor=threshold)
+            expected = [self.calculator.identify_gifts(s, threshold_factor=threshold) for s in scores]
+            self.assertEqual(batch, expected)
+
+    def test_empty_batch(self):
+        self.assertEqual(self.calculator.calculate_scores_batch([]), [])
+        self.assertEqual(self.calculator.identify_gifts_batch([]), [])
+
+    def test_single_answer_variants(self):
+        values = np.array([3.0, 1.0, 5.0])
+        variants = GiftCalculator.engine.single_answer_variants(values)
+        self.assertEqual(variants.shape, (15, 3))
+        self.assertEqual(variants[:5, 0].tolist(), [1, 2, 3, 4, 5])
+        self.assertEqual(variants[:5, 1:].tolist(), [[1.0, 5.0]] * 5)
+        self.assertEqual(variants[12].tolist(), [3.0, 1.0, 3.0])
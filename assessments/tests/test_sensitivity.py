@@ -0,0 +1,82 @@
+import random
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from assessments.models import Assessment, Question
+from assessments.gift_calculator import GiftCalculator
+from assessments.question_bank import get_question_bank
+
+User = get_user_model()
+
+
+class AnswerSensitivityTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='whatif',
+            email='whatif@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.assessment = Assessment.objects.create(user=self.user)
+        rng = random.Random(12)
+        gifts = list(GiftCalculator.MOTIVATIONAL_GIFTS)
+        self.questions = [
+            Question.objects.create(
+                category='Test',
+                text=f'Question {i}',
+                gift_correlation={gifts[i % 7]: 1.0, gifts[(i + 3) % 7]: round(rng.random(), 2)}
+            )
+            for i in range(21)
+        ]
+        self.answers = [
+            {'question_id': q.id, 'answer': rng.randint(1, 5)} for q in self.questions
+        ]
+        self.url = reverse('assessment-sensitivity', kwargs={'pk': self.assessment.pk})
+
+    def test_variants_match_individual_calculations(self):
+        calculator = GiftCalculator()
+        bank = get_question_bank()
+        result = calculator.answer_sensitivity(self.answers, question_bank=bank)
+
+        self.assertEqual(result['scores'], calculator.calculate_scores(self.answers, question_bank=bank))
+        self.assertEqual(len(result['questions']), len(self.answers))
+        flips = 0
+        for position, question in enumerate(result['questions']):
+            self.assertEqual([v['answer'] for v in question['variants']], [1, 2, 3, 4, 5])
+            for variant in question['variants']:
+                changed = [dict(a) for a in self.answers]
+                changed[position]['answer'] = variant['answer']
+                scores = calculator.calculate_scores(changed, question_bank=bank)
+                self.assertEqual(variant['scores'], scores)
+                self.assertEqual(variant['primary_gift'], calculator.identify_gifts(scores)[0])
+            flips += len(question['flips_primary'])
+        self.assertAlmostEqual(result['stability'], 1 - flips / (len(self.answers) * 4))
+
+    def test_current_answer_never_flips(self):
+        result = GiftCalculator().answer_sensitivity(self.answers, question_bank=get_question_bank())
+        for answer, question in zip(self.answers, result['questions']):
+            self.assertNotIn(answer['answer'], question['flips_primary'])
+            current = question['variants'][answer['answer'] - 1]
+            self.assertEqual(current['primary_gift'], result['primary_gift'])
+
+    def test_endpoint_with_posted_answers(self):
+        response = self.client.post(self.url, {'answers': self.answers}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['questions']), len(self.answers))
+        self.assertIn('stability', response.data)
+
+    def test_endpoint_uses_saved_progress(self):
+        self.client.post(reverse('assessment-save-progress'), {'current_answers': self.answers[:5]}, format='json')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([q['question_id'] for q in response.data['questions']],
+                         [a['question_id'] for a in self.answers[:5]])
+
+    def test_endpoint_rejects_missing_or_unknown_answers(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, {'answers': [{'question_id': 999999, 'answer': 3}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,173 @@
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from assessments.models import Assessment, GiftProfile, Question
+from assessments.question_bank import get_question_bank
+from assessments.result_cache import get_result_cache
+from books.models import Book, BookAccess
+
+User = get_user_model()
+
+RESULT = {
+    'scores': {'TEACHING': 0.9, 'SERVICE': 0.8, 'GIVING': 0.7},
+    'primary_gift': 'Teaching',
+    'secondary_gifts': ['Service', 'Giving'],
+    'descriptions': {},
+    'recommended_roles': {},
+}
+
+
+class SubmitPipelineTests(TestCase):
+    # In-progress lookup, savepoint, assessment insert, gift profile insert,
+    # book lookup, access deactivation, access upsert, completed counter
+    # increment, savepoint release (the limit check reads the counter)
+    SUBMIT_QUERIES = 9
+
+    def setUp(self):
+        self.client = APIClient()
+        self.questions = [
+            Question.objects.create(category='Test', text=f'Question {i}', gift_correlation=c)
+            for i, c in enumerate([{'TEACHING': 1.0}, {'SERVICE': 1.0, 'GIVING': 0.4}])
+        ]
+        self.answers = [{'question_id': q.id, 'answer': 4} for q in self.questions]
+        get_question_bank()  # Compiled outside the measured requests
+        get_result_cache().clear()
+
+    def add_books(self, per_gift):
+        for gift in ('TEACHING', 'SERVICE', 'GIVING', 'COMPASSION'):
+            for i in range(per_gift):
+                Book.objects.create(slug=f'{gift.lower()}-{per_gift}-{i}', title=f'{gift} {i}',
+                                    associated_gift=gift, copyright_info='Test', version='1.0')
+
+    def submit(self, username):
+        user = User.objects.create_user(username=username, email=f'{username}@example.com')
+        self.client.force_authenticate(user=user)
+        get_result_cache().clear()
+        return user, self.client.post(reverse('assessment-submit'), {'answers': self.answers}, format='json')
+
+    @patch('assessments.views.FastAPIClient')
+    def test_query_count_does_not_grow_with_books(self, mock_client):
+        mock_client.return_value.calculate_gifts_sync.return_value = RESULT
+        for per_gift, username in ((1, 'few'), (5, 'many')):
+            self.add_books(per_gift)
+            user = User.objects.create_user(username=username, email=f'{username}@example.com')
+            self.client.force_authenticate(user=user)
+            get_result_cache().clear()
+            with self.assertNumQueries(self.SUBMIT_QUERIES):
+                response = self.client.post(reverse('assessment-submit'), {'answers': self.answers}, format='json')
+            self.assertEqual(response.status_code, 200)
+
+            access = BookAccess.objects.filter(user=user, is_active=True)
+            self.assertEqual(access.filter(access_reason='PRIMARY').count(), Book.objects.filter(associated_gift='TEACHING').count())
+            self.assertEqual(access.filter(access_reason='SECONDARY').count(),
+                             Book.objects.filter(associated_gift__in=['SERVICE', 'GIVING']).count())
+            self.assertFalse(access.filter(book__associated_gift='COMPASSION').exists())
+
+    @patch('assessments.views.FastAPIClient')
+    def test_previous_access_is_replaced(self, mock_client):
+        mock_client.return_value.calculate_gifts_sync.return_value = RESULT
+        self.add_books(1)
+        user, _ = self.submit('again')
+        compassion = Book.objects.get(associated_gift='COMPASSION')
+        BookAccess.objects.create(user=user, book=compassion, access_reason='PRIMARY')
+        teaching = BookAccess.objects.get(user=user, book__associated_gift='TEACHING')
+
+        mock_client.return_value.calculate_gifts_sync.return_value = {
+            **RESULT, 'primary_gift': 'Service', 'secondary_gifts': ['Teaching']
+        }
+        get_result_cache().clear()
+        response = self.client.post(reverse('assessment-submit'), {'answers': self.answers}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertFalse(BookAccess.objects.get(user=user, book=compassion).is_active)
+        teaching.refresh_from_db()
+        self.assertEqual((teaching.access_reason, teaching.is_active), ('SECONDARY', True))
+        self.assertEqual(BookAccess.objects.filter(user=user, book=teaching.book).count(), 1)
+
+    @patch('assessments.views.FastAPIClient')
+    def test_failure_rolls_back_everything(self, mock_client):
+        mock_client.return_value.calculate_gifts_sync.return_value = RESULT
+        self.add_books(1)
+        with patch('books.services.BookAccess.objects.bulk_create', side_effect=RuntimeError('database went away')):
+            user, response = self.submit('rollback')
+
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(Assessment.objects.filter(user=user).exists())
+        self.assertFalse(GiftProfile.objects.filter(user=user).exists())
+        self.assertFalse(BookAccess.objects.filter(user=user).exists())
+
+
+class SubmitResponsePipelineTests(SubmitPipelineTests):
+    """The same guarantees for submit_response, which completes an existing assessment"""
+    # Assessment lookup, user lookup (limit check), buffered-progress
+    # lookup, savepoint, assessment update, gift profile insert, book
+    # lookup, access deactivation, access upsert, completed counter
+    # increment, savepoint release
+    SUBMIT_QUERIES = 11
+
+    def post_submit(self, user):
+        assessment = Assessment.objects.create(user=user)
+        self.client.force_authenticate(user=user)
+        url = reverse('assessment-submit-response', kwargs={'pk': assessment.pk})
+        return self.client.post(url, {'answers': self.answers}, format='json')
+
+    def submit(self, username):
+        user = User.objects.create_user(username=username, email=f'{username}@example.com')
+        get_result_cache().clear()
+        return user, self.post_submit(user)
+
+    @patch('assessments.views.FastAPIClient')
+    def test_query_count_does_not_grow_with_books(self, mock_client):
+        mock_client.return_value.calculate_gifts_sync.return_value = RESULT
+        for per_gift, username in ((1, 'few'), (5, 'many')):
+            self.add_books(per_gift)
+            user = User.objects.create_user(username=username, email=f'{username}@example.com')
+            assessment = Assessment.objects.create(user=user)
+            self.client.force_authenticate(user=user)
+            get_result_cache().clear()
+            url = reverse('assessment-submit-response', kwargs={'pk': assessment.pk})
+            with self.assertNumQueries(self.SUBMIT_QUERIES):
+                response = self.client.post(url, {'answers': self.answers}, format='json')
+            self.assertEqual(response.status_code, 200)
+
+            access = BookAccess.objects.filter(user=user, is_active=True)
+            self.assertEqual(access.filter(access_reason='PRIMARY').count(),
+                             Book.objects.filter(associated_gift='TEACHING').count())
+            user.refresh_from_db()
+            self.assertEqual(user.completed_assessments, 1)
+
+    @patch('assessments.views.FastAPIClient')
+    def test_previous_access_is_replaced(self, mock_client):
+        mock_client.return_value.calculate_gifts_sync.return_value = RESULT
+        self.add_books(1)
+        user, _ = self.submit('again')
+        compassion = Book.objects.get(associated_gift='COMPASSION')
+        BookAccess.objects.create(user=user, book=compassion, access_reason='PRIMARY')
+
+        mock_client.return_value.calculate_gifts_sync.return_value = {
+            **RESULT, 'primary_gift': 'Service', 'secondary_gifts': ['Teaching']
+        }
+        get_result_cache().clear()
+        self.assertEqual(self.post_submit(user).status_code, 200)
+
+        self.assertFalse(BookAccess.objects.get(user=user, book=compassion).is_active)
+        teaching = BookAccess.objects.get(user=user, book__associated_gift='TEACHING')
+        self.assertEqual((teaching.access_reason, teaching.is_active), ('SECONDARY', True))
+
+    @patch('assessments.views.FastAPIClient')
+    def test_failure_rolls_back_everything(self, mock_client):
+        mock_client.return_value.calculate_gifts_sync.return_value = RESULT
+        self.add_books(1)
+        with patch('books.services.BookAccess.objects.bulk_create', side_effect=RuntimeError('database went away')):
+            user, response = self.submit('rollback')
+
+        self.assertEqual(response.status_code, 500)
+        assessment = Assessment.objects.get(user=user)
+        self.assertFalse(assessment.completion_status)
+        self.assertIsNone(assessment.results_data)
+        self.assertFalse(GiftProfile.objects.filter(user=user).exists())
+        self.assertFalse(BookAccess.objects.filter(user=user).exists())
+        user.refresh_from_db()
+        self.assertEqual(user.completed_assessments, 0)
@@ -0,0 +1,48 @@
+from django.test import SimpleTestCase
+from assessments.question_bank import CompiledQuestionBank
+from assessments.wire_format import decode_answers, pack_answers, packed_length, unpack_answers
+
+
+class WireFormatTests(SimpleTestCase):
+    def setUp(self):
+        self.bank = CompiledQuestionBank(
+            [3, 7, 9],
+            [{'TEACHING': 1.0}, {'GIVING': 0.5}, {'SERVICE': 0.2}],
+            [1.0, 1.0, 1.0]
+        )
+
+    def test_pack_round_trip(self):
+        values = [1, 2, 3, 4, 5] * 14
+        packed = pack_answers(values)
+        self.assertEqual(len(packed), 36)  # 70 answers: 27 bytes of base64
+        self.assertEqual(unpack_answers(packed, len(values)).tolist(), values)
+
+    def test_unpack_rejects_malformed_input(self):
+        packed = pack_answers([5, 5, 5])
+        for bad, count in [('***', 3), (packed, 4), (pack_answers([5, 5, 5, 5, 5, 5]), 3)]:
+            with self.assertRaises(ValueError):
+                unpack_answers(bad, count)
+        # 0, 6 and 7 fit in 3 bits but are not answers
+        self.assertEqual(packed_length(3), 2)
+        with self.assertRaises(ValueError):
+            unpack_answers('/8A=', 3)  # 111 111 111 0000000
+
+    def test_decode_answers_in_bank_order(self):
+        expected = [
+            {'question_id': 3, 'answer': 5},
+            {'question_id': 7, 'answer': 1},
+            {'question_id': 9, 'answer': 3},
+        ]
+        self.assertEqual(decode_answers(self.bank, answers=[5, 1, 3]), expected)
+        self.assertEqual(decode_answers(self.bank, packed=pack_answers([5, 1, 3])), expected)
+
+    def test_decode_answers_validates(self):
+        for kwargs in [
+            {'answers': [5, 1]},
+            {'answers': [5, 1, 6]},
+            {'answers': [5, 0, 3]},
+            {},
+            {'answers': [5, 1, 3], 'packed': pack_answers([5, 1, 3])},
+        ]:
+            with self.assertRaises(ValueError):
+                decode_answers(self.bank, **kwargs)
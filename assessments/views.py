@@ -2,21 +2,106 @@ from django.shortcuts import render
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Question, Assessment, GiftProfile
+from .models import Question, Assessment, GiftProfile, assessment_limit
 from .serializers import (
     QuestionSerializer, 
     AssessmentSerializer, 
     AssessmentProgressSerializer
 )
 from .gift_calculator import GiftCalculator
+from .question_bank import get_question_bank, cached_question_list, compact_answers
+from .progress import record_progress, in_progress_scores, provisional_result, answer_map
+from .progress_buffer import BufferBusy, SequenceGap, get_progress_buffer, merge_progress, parse_deltas
+from .result_cache import LATEST_RESULTS_KEY, get_result_cache, result_key
+from .bulk_ingest import NDJSON, BulkIngest, detect_format, iter_csv, iter_lines, iter_ndjson
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags
 from django.utils import timezone
 import asyncio
-from core.services import FastAPIClient
+import json
+import logging
+from core.services import CalculationUnavailable, FastAPIClient
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from books.services import BookAccessService
 from django.db.models import Q
 
+logger = logging.getLogger(__name__)
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match check (weak comparison, as RFC 9110 specifies for it)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return etag in [tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(if_none_match)]
+
+def format_submission(user_id, answers):
+    """Build the calculation payload: question ids and answers plus the bank version"""
+    question_bank = get_question_bank()
+    formatted_answers = compact_answers(answers)
+    # Reject unknown questions here rather than in the calculation service
+    question_bank.rows_for(answer['question_id'] for answer in formatted_answers)
+    return {
+        'user_id': user_id,
+        'question_bank_version': question_bank.version,
+        'answers': formatted_answers
+    }
+
+def build_local_results(scores):
+    """Results in the same shape the FastAPI service returns, computed in-process"""
+    calculator = GiftCalculator()
+    primary_gift, secondary_gifts = calculator.identify_gifts(scores)
+    descriptions = calculator.get_gift_descriptions(primary_gift, secondary_gifts)
+    return {
+        'scores': scores,
+        'primary_gift': primary_gift,
+        'secondary_gifts': secondary_gifts,
+        'descriptions': descriptions,
+        'recommended_roles': {
+            'primary_roles': [],
+            'secondary_roles': [],
+            'ministry_areas': []
+        }
+    }
+
+def calculate_results(client, formatted_data, in_progress=None):
+    """
+    Results for a formatted submission, from the cheapest source available:
+    scored here when it matches the saved progress, the result memo, then
+    the FastAPI service.
+    """
+    scores = in_progress_scores(in_progress, formatted_data['answers'])
+    if scores is not None:
+        return build_local_results(scores)
+
+    result_cache = get_result_cache()
+    key = result_key(formatted_data['question_bank_version'], formatted_data['answers'])
+    cached = result_cache.get(key)
+    if cached is not None:
+        return build_local_results(cached['scores'])
+
+    try:
+        # Use synchronous request instead of async
+        results = client.calculate_gifts_sync(formatted_data)
+    except CalculationUnavailable as e:
+        # Remote unhealthy or its breaker is open: score here instead of waiting
+        logger.warning(f"FastAPI unavailable, calculating locally: {e}")
+        scores = GiftCalculator().calculate_scores(
+            formatted_data['answers'],
+            question_bank=get_question_bank()
+        )
+        results = build_local_results(scores)
+    result_cache.set(key, {
+        'scores': results['scores'],
+        'primary_gift': results['primary_gift'],
+        'secondary_gifts': results['secondary_gifts']
+    })
+    return results
+
 class QuestionViewSet(viewsets.ModelViewSet):
     serializer_class = QuestionSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -28,9 +113,17 @@ class QuestionViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def list_all(self, request):
         """Get all questions for assessment"""
-        questions = self.get_queryset()
-        serializer = self.get_serializer(questions, many=True)
-        return Response(serializer.data)
+        # Serialized once per question bank version; clients revalidate
+        # with If-None-Match and get 304 while it's unchanged
+        questions = cached_question_list()
+        if etag_matches(request.META.get('HTTP_IF_NONE_MATCH', ''), questions['etag']):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(questions['body'], content_type='application/json')
+        response['ETag'] = questions['etag']
+        response['Cache-Control'] = settings.QUESTION_BANK_CACHE_CONTROL
+        response['X-Question-Bank-Version'] = questions['version']
+        return response
 
 @method_decorator(csrf_exempt, name='dispatch')
 class AssessmentViewSet(viewsets.ModelViewSet):
@@ -54,7 +147,7 @@ class AssessmentViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         # Check if user has reached the assessment limit before creating a new one
         if not hasattr(self.request.user, 'counselor_profile') and Assessment.has_reached_limit(self.request.user):
-            raise ValueError("You have reached the maximum limit of 3 assessments")
+            raise ValueError(f"You have reached the maximum limit of {assessment_limit()} assessments")
             
         if hasattr(self.request.user, 'counselor_profile'):
             serializer.save(
@@ -91,7 +184,7 @@ class AssessmentViewSet(viewsets.ModelViewSet):
             # Check if user has reached the assessment limit
             if Assessment.has_reached_limit(request.user):
                 return Response(
-                    {'error': "You have reached the maximum limit of 3 assessments"},
+                    {'error': f"You have reached the maximum limit of {assessment_limit()} assessments"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
                 
@@ -102,52 +195,48 @@ class AssessmentViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Format answers for FastAPI
-            formatted_data = {
-                'user_id': request.user.id,
-                'answers': [
-                    {
-                        'question_id': answer['question_id'],
-                        'answer': int(answer['answer']),
-                        'gift_correlation': {
-                            k.upper(): float(v)
-                            for k, v in answer['gift_correlation'].items()
-                        }
-                    }
-                    for answer in answers
-                ]
-            }
+            # Format answers for FastAPI; correlations come from the question bank
+            try:
+                formatted_data = format_submission(request.user.id, answers)
+            except (KeyError, TypeError, ValueError) as e:
+                return Response(
+                    {'error': f"Invalid answers: {str(e)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
             # Calculate results using FastAPI client
             client = FastAPIClient()
             try:
-                # Use synchronous request instead of async
-                results = client.calculate_gifts_sync(formatted_data)
-                
-                # Create new assessment
-                assessment = Assessment.objects.create(
+                # A submission matching the saved progress is scored here
+                in_progress = Assessment.objects.filter(
                     user=request.user,
-                    completion_status=True,
-                    results_data=results
-                )
+                    completion_status=False
+                ).first()
+                if in_progress is not None:
+                    # Buffered autosave deltas belong in those totals too
+                    get_progress_buffer().flush(in_progress)
+                results = calculate_results(client, formatted_data, in_progress)
 
-                # Add debug logging before creating gift profile
-                print(f"Debug - Results from FastAPI: {results}")
-                print(f"Debug - Creating gift profile with primary: {results['primary_gift']}, secondary: {results['secondary_gifts']}")
-                
-                gift_profile = GiftProfile.objects.create(
-                    user=request.user,
-                    assessment=assessment,
-                    primary_gift=results['primary_gift'],
-                    secondary_gifts=results['secondary_gifts'],
-                    scores=results['scores']
-                )
-
-                # Add debug logging before granting book access
-                print(f"Debug - About to grant book access for user {request.user.id}")
-                print(f"Debug - Gift Profile ID: {gift_profile.id}")
-                BookAccessService.grant_gift_based_access(request.user, gift_profile)
-                print("Debug - Book access granted")
+                # One unit of work: the assessment, its gift profile and the
+                # book access swap land together or not at all
+                with transaction.atomic():
+                    assessment = Assessment.objects.create(
+                        user=request.user,
+                        completion_status=True,
+                        # Answers are kept so results can be re-scored if the bank changes
+                        results_data={**results, 'answers': formatted_data['answers']}
+                    )
+                    gift_profile = GiftProfile.objects.create(
+                        user=request.user,
+                        assessment=assessment,
+                        primary_gift=results['primary_gift'],
+                        secondary_gifts=results['secondary_gifts'],
+                        scores=results['scores']
+                    )
+                    # Three queries however many books match
+                    BookAccessService.grant_gift_based_access_bulk([gift_profile])
+                    Assessment.record_completions({request.user.id: 1})
+                logger.debug(f"Book access granted for gift profile {gift_profile.id}")
 
                 return Response(results, status=status.HTTP_200_OK)
 
@@ -177,13 +266,16 @@ class AssessmentViewSet(viewsets.ModelViewSet):
                 completion_status=False
             )
             current_answers = request.data.get('current_answers', [])
-            
-            assessment.results_data = {
-                'progress': current_answers,
-                'last_updated': timezone.now().isoformat()
-            }
-            assessment.save()
-            return Response({'status': 'progress saved'})
+            accumulator = record_progress(assessment, current_answers)
+            return Response({
+                'status': 'progress saved',
+                'answered': len(accumulator.answers)
+            })
+        except (KeyError, TypeError, ValueError) as e:
+            return Response(
+                {'error': f"Invalid answers: {str(e)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except Assessment.DoesNotExist:
             return Response(
                 {'error': 'No incomplete assessment found'},
@@ -198,63 +290,163 @@ class AssessmentViewSet(viewsets.ModelViewSet):
                 user=request.user,
                 completion_status=False
             )
-            progress = assessment.results_data.get('progress', [])
+            progress = (assessment.results_data or {}).get('progress', [])
+            pending = get_progress_buffer().pending(assessment)['answers']
+            if pending:
+                progress = merge_progress(progress, pending)
             return Response(progress)
         except Assessment.DoesNotExist:
             return Response([])
 
-    @action(detail=False, methods=['get'], url_path='latest-results')
-    def latest_results(self, request):
-        """Get user's latest assessment results"""
-        print("Debug: Accessing latest_results endpoint")
+    @action(detail=False, methods=['get', 'post'], url_path='progress-delta')
+    def progress_delta(self, request):
+        """
+        Autosave by delta: {"seq": n, "answers": {question_id: answer or null}}
+        is buffered and written to the assessment in batches. seq must be one
+        past the last acknowledged; "end_session": true writes everything now.
+        GET returns the last acknowledged seq and the answers so far.
+        """
         try:
-            latest_assessment = Assessment.objects.filter(
-                user=request.user,
-                completion_status=True
-            ).latest('created_at')
-            
-            latest_profile = GiftProfile.objects.get(
+            assessment = Assessment.objects.get(
                 user=request.user,
-                assessment=latest_assessment
+                completion_status=False
+            )
+        except Assessment.DoesNotExist:
+            return Response(
+                {'error': 'No incomplete assessment found'},
+                status=status.HTTP_404_NOT_FOUND
             )
 
-            print("Debug - Gift Scores:", latest_profile.scores)
+        buffer = get_progress_buffer()
+        if request.method == 'GET':
+            state = buffer.pending(assessment)
+            progress = merge_progress((assessment.results_data or {}).get('progress', []), state['answers'])
+            return Response({
+                'seq': state['seq'],
+                'answers': {str(answer['question_id']): answer['answer'] for answer in progress}
+            })
 
-            calculator = GiftCalculator()
-            primary_gift, secondary_gifts = calculator.identify_gifts(
-                latest_profile.scores, 
-                threshold_factor=0.80
+        try:
+            seq = int(request.data['seq'])
+            deltas = parse_deltas(request.data.get('answers', {}), get_question_bank())
+        except (KeyError, TypeError, ValueError) as e:
+            return Response(
+                {'error': f"Invalid progress delta: {str(e)}"},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            
-            descriptions = calculator.get_gift_descriptions(
-                primary_gift,
-                secondary_gifts
+
+        try:
+            result = buffer.apply(assessment, seq, deltas, flush=bool(request.data.get('end_session')))
+        except SequenceGap as e:
+            return Response(
+                {'error': str(e), 'expected_seq': e.expected},
+                status=status.HTTP_409_CONFLICT
             )
+        except BufferBusy as e:
+            response = Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = '1'
+            return response
 
-            # Get recommended roles
-            roles = latest_profile.user.profile.get_recommended_roles()
-            
-            return Response({
-                'scores': latest_profile.scores,
-                'primary_gift': primary_gift,
-                'secondary_gifts': secondary_gifts,
-                'last_assessment': latest_assessment.created_at.isoformat(),
-                'descriptions': descriptions or latest_assessment.results_data.get('descriptions', {}),
-                'recommended_roles': roles
-            })
-        except (Assessment.DoesNotExist, GiftProfile.DoesNotExist) as e:
-            print(f"Debug - Error in latest_results: {str(e)}")
+        return Response({'status': 'flushed' if result['flushed'] else 'buffered', **result})
+
+    @action(detail=True, methods=['get', 'post'], url_path='provisional-results')
+    def provisional_results(self, request, pk=None):
+        """Live partial results for an in-progress (e.g. counselor-conducted) session"""
+        assessment = self.get_object()
+        if assessment.completion_status:
+            return Response(
+                {'error': 'Assessment is already completed'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if request.method == 'POST':
+            try:
+                record_progress(assessment, request.data.get('current_answers', []))
+            except (KeyError, TypeError, ValueError) as e:
+                return Response(
+                    {'error': f"Invalid answers: {str(e)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        return Response(provisional_result(assessment))
+
+    @action(detail=True, methods=['get', 'post'], url_path='sensitivity')
+    def sensitivity(self, request, pk=None):
+        """
+        Which answers would flip the primary gift: scores and primary gift for
+        every single-answer change. POST the session's current answers, or GET
+        to use the stored answers (saved progress, or the submitted answers).
+        """
+        assessment = self.get_object()
+        results_data = assessment.results_data or {}
+        if request.method == 'POST':
+            current_answers = request.data.get('answers', [])
+        elif assessment.completion_status:
+            current_answers = results_data.get('answers', [])
+        else:
+            current_answers = results_data.get('progress', [])
+
+        try:
+            answers = [
+                {'question_id': question_id, 'answer': value}
+                for question_id, value in answer_map(current_answers).items()
+            ]
+            if not answers:
+                return Response(
+                    {'error': 'No answers to analyse'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            result = self.calculator.answer_sensitivity(answers, question_bank=get_question_bank())
+        except (KeyError, TypeError, ValueError) as e:
+            return Response(
+                {'error': f"Invalid answers: {str(e)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(result)
+
+    @action(detail=False, methods=['get'], url_path='latest-results')
+    def latest_results(self, request):
+        """Get user's latest assessment results"""
+        cache_key = LATEST_RESULTS_KEY.format(user_id=request.user.id)
+        timeout = settings.LATEST_RESULTS_CACHE_TIMEOUT
+        if timeout:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return Response(cached)
+
+        # Everything derived was stored at submit time: one indexed read
+        latest_profile = GiftProfile.objects.filter(
+            user=request.user,
+            assessment__completion_status=True
+        ).select_related('assessment').only(
+            'primary_gift', 'secondary_gifts', 'scores', 'description_keys',
+            'recommended_roles', 'assessment__created_at'
+        ).first()
+
+        if latest_profile is None:
             return Response(
                 {'error': 'No completed assessments found'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
 
+        data = {
+            'scores': latest_profile.scores,
+            'primary_gift': latest_profile.primary_gift,
+            'secondary_gifts': latest_profile.secondary_gifts,
+            'last_assessment': latest_profile.assessment.created_at.isoformat(),
+            'descriptions': latest_profile.get_descriptions(),
+            'recommended_roles': latest_profile.recommended_roles
+        }
+        if timeout:
+            cache.set(cache_key, data, timeout)
+        return Response(data)
+
     @action(detail=True, methods=['post'])
     async def submit_assessment(self, request, pk=None):
         # Check if user has reached the assessment limit
         if Assessment.has_reached_limit(request.user):
             return Response(
-                {'error': "You have reached the maximum limit of 3 assessments"},
+                {'error': f"You have reached the maximum limit of {assessment_limit()} assessments"},
                 status=status.HTTP_400_BAD_REQUEST
             )
             
@@ -277,7 +469,7 @@ class AssessmentViewSet(viewsets.ModelViewSet):
             )
             
             # Grant book access based on identified gifts
-            BookAccessService.grant_gift_based_access(request.user, gift_profile)
+            BookAccessService.grant_gift_based_access_bulk([gift_profile])
             
             return Response(results)
         finally:
@@ -286,6 +478,8 @@ class AssessmentViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def submit_response(self, request, pk=None):
         assessment = self.get_object()
+        # Only a first completion counts against the user's limit
+        newly_completed = 0 if assessment.completion_status else 1
         
         try:
             # If a counselor is submitting, skip the limit check
@@ -293,7 +487,7 @@ class AssessmentViewSet(viewsets.ModelViewSet):
                 # Check if user has reached the assessment limit
                 if Assessment.has_reached_limit(assessment.user):
                     return Response(
-                        {'error': "The user has reached the maximum limit of 3 assessments"},
+                        {'error': f"The user has reached the maximum limit of {assessment_limit()} assessments"},
                         status=status.HTTP_400_BAD_REQUEST
                     )
             
@@ -312,109 +506,106 @@ class AssessmentViewSet(viewsets.ModelViewSet):
                 assessment.is_counselor_session = True
                 assessment.counselor = request.user.counselor_profile
             
-            # Format answers for FastAPI
-            formatted_data = {
-                'user_id': assessment.user.id,
-                'answers': [
-                    {
-                        'question_id': answer['question_id'],
-                        'answer': int(answer['answer']),
-                        'gift_correlation': {
-                            k.upper(): float(v)
-                            for k, v in answer['gift_correlation'].items()
-                        }
-                    }
-                    for answer in answers
-                ]
-            }
+            # Format answers for FastAPI; correlations come from the question bank
+            try:
+                formatted_data = format_submission(assessment.user.id, answers)
+            except (KeyError, TypeError, ValueError) as e:
+                return Response(
+                    {'error': f"Invalid answers: {str(e)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
             # Calculate results using FastAPI client
             client = FastAPIClient()
             try:
-                print(f"Debug - Submitting assessment responses to FastAPI for user {assessment.user.id}")
-                # Use synchronous request
-                results = client.calculate_gifts_sync(formatted_data)
-                
-                print(f"Debug - Results from FastAPI: {results}")
-                print(f"Debug - Creating gift profile with primary: {results['primary_gift']}, secondary: {results['secondary_gifts']}")
-                
-                # Update assessment with results
-                assessment.results_data = results
+                # A submission matching the saved progress is scored here
+                get_progress_buffer().flush(assessment)
+                results = calculate_results(client, formatted_data, assessment)
+
+                # Update assessment with results (and answers, for re-scoring)
+                assessment.results_data = {**results, 'answers': formatted_data['answers']}
                 assessment.completion_status = True
-                assessment.save()
-                
-                # Create gift profile
-                gift_profile = GiftProfile.objects.create(
-                    user=assessment.user,
-                    assessment=assessment,
-                    primary_gift=results['primary_gift'],
-                    secondary_gifts=results['secondary_gifts'],
-                    scores=results['scores']
-                )
-                
-                # Grant book access based on identified gifts
-                print(f"Debug - About to grant book access for user {assessment.user.id}")
-                print(f"Debug - Gift Profile ID: {gift_profile.id}")
-                BookAccessService.grant_gift_based_access(assessment.user, gift_profile)
-                print("Debug - Book access granted")
-                
+                # One unit of work, as in submit: the completed assessment,
+                # its gift profile, the book access swap and the counter
+                with transaction.atomic():
+                    assessment.save()
+                    gift_profile = GiftProfile.objects.create(
+                        user=assessment.user,
+                        assessment=assessment,
+                        primary_gift=results['primary_gift'],
+                        secondary_gifts=results['secondary_gifts'],
+                        scores=results['scores']
+                    )
+                    BookAccessService.grant_gift_based_access_bulk([gift_profile])
+                    Assessment.record_completions({assessment.user_id: newly_completed})
+                logger.debug(f"Book access granted for gift profile {gift_profile.id}")
+
                 return Response({
                     'message': 'Assessment completed successfully',
                     'assessment_id': assessment.id,
                     'results': assessment.results_data
                 }, status=status.HTTP_200_OK)
-                
+
             except ValueError as e:
-                print(f"Debug - FastAPI calculation error: {str(e)}")
-                # Fallback to local calculation if FastAPI fails
-                calculator = GiftCalculator()
-                scores = calculator.calculate_scores(answers)
-                primary_gift, secondary_gifts = calculator.identify_gifts(scores)
-                descriptions = calculator.get_gift_descriptions(primary_gift, secondary_gifts)
-                
-                # Update assessment with results
-                assessment.results_data = {
-                    'scores': scores,
-                    'primary_gift': primary_gift,
-                    'secondary_gifts': secondary_gifts,
-                    'descriptions': descriptions,
-                    'answers': answers
-                }
-                assessment.completion_status = True
-                assessment.save()
-                
-                # Create gift profile
-                gift_profile = GiftProfile.objects.create(
-                    user=assessment.user,
-                    assessment=assessment,
-                    primary_gift=primary_gift,
-                    secondary_gifts=secondary_gifts,
-                    scores=scores
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-                
-                # Grant book access based on identified gifts
-                BookAccessService.grant_gift_based_access(assessment.user, gift_profile)
-                
-                return Response({
-                    'message': 'Assessment completed successfully (fallback calculation)',
-                    'assessment_id': assessment.id,
-                    'results': assessment.results_data
-                }, status=status.HTTP_200_OK)
-                
             except Exception as e:
-                print(f"Debug - Unexpected error in FastAPI calculation: {str(e)}")
+                logger.exception(f"Submitting assessment {assessment.id} failed")
                 return Response(
                     {'error': f"Calculation failed: {str(e)}"}, 
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
             
         except Exception as e:
-            print(f"Debug - Exception in submit_response: {str(e)}")
             return Response(
                 {'error': str(e)}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+    @action(detail=False, methods=['post'], url_path='bulk-ingest')
+    def bulk_ingest(self, request):
+        """
+        Import paper assessments for the counselor's users from NDJSON or CSV,
+        sent as the request body or as a multipart "file". Results stream
+        back as NDJSON, one line per row plus a closing summary.
+        """
+        if not hasattr(request.user, 'counselor_profile'):
+            return Response(
+                {"error": "Only counselors can import assessments"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            if request.content_type.startswith('multipart/'):
+                upload = request.FILES.get('file')
+                if upload is None:
+                    return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+                stream = upload
+                upload_format = detect_format(upload.content_type, upload.name, request.query_params.get('format'))
+            else:
+                # Read incrementally from the request body, never all at once
+                stream = request.stream
+                if stream is None:
+                    return Response({'error': 'Empty upload'}, status=status.HTTP_400_BAD_REQUEST)
+                upload_format = detect_format(request.content_type, explicit=request.query_params.get('format'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+        logger.info(f"Bulk import ({upload_format}) for counselor {request.user.counselor_profile.id}")
+        parse = iter_ndjson if upload_format == NDJSON else iter_csv
+        ingest = BulkIngest(
+            request.user.counselor_profile,
+            get_question_bank(),
+            chunk_size=settings.ASSESSMENT_BULK_CHUNK_SIZE
+        )
+        lines = (
+            json.dumps(result).encode() + b'\n'
+            for result in ingest.run(parse(iter_lines(stream)))
+        )
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+
     @action(detail=True, methods=['post'])
     def add_counselor_notes(self, request, pk=None):
         if not hasattr(request.user, 'counselor_profile'):
@@ -438,13 +629,11 @@ class AssessmentViewSet(viewsets.ModelViewSet):
         if not request.user.is_authenticated:
             return Response({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
             
-        completed_count = Assessment.objects.filter(
-            user=request.user,
-            completion_status=True
-        ).count()
+        completed_count = request.user.completed_assessments
+        max_limit = assessment_limit()
         
         return Response({
             'completed_assessments': completed_count,
-            'max_limit': 3,
-            'can_take_more': completed_count < 3
+            'max_limit': max_limit,
+            'can_take_more': completed_count < max_limit
         })
@@ -0,0 +1,80 @@
+#assessments/wire_format.py
+
+from typing import Dict, List, Optional, Sequence
+import base64
+import binascii
+import numpy as np
+
+# Answers travel as 3-bit values: 1-5 fit, 0, 6 and 7 are invalid
+BITS_PER_ANSWER = 3
+MIN_ANSWER = 1
+MAX_ANSWER = 5
+
+_PLACE_VALUES = np.array([4, 2, 1], dtype=np.uint8)
+
+
+def packed_length(count: int) -> int:
+    """Bytes needed for count packed answers"""
+    return (count * BITS_PER_ANSWER + 7) // 8
+
+
+def pack_answers(values: Sequence[int]) -> str:
+    """
+    Pack answers (1-5, in question bank order) into base64, 3 bits each,
+    most significant bit first, zero-padded to a whole byte. 70 answers
+    take 27 bytes, 36 characters of base64.
+    """
+    values = _validated(np.asarray(values))
+    bits = (values[:, None] & _PLACE_VALUES).astype(bool)
+    return base64.b64encode(np.packbits(bits.ravel()).tobytes()).decode('ascii')
+
+
+def unpack_answers(packed: str, count: int) -> np.ndarray:
+    """Inverse of pack_answers; raises ValueError for anything malformed"""
+    try:
+        raw = base64.b64decode(packed, validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError("Packed answers are not valid base64")
+    if len(raw) != packed_length(count):
+        raise ValueError(f"Packed answers must be {packed_length(count)} bytes for {count} questions")
+
+    bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8))
+    if bits[count * BITS_PER_ANSWER:].any():
+        raise ValueError("Packed answers have non-zero padding")
+    values = bits[:count * BITS_PER_ANSWER].reshape(count, BITS_PER_ANSWER) @ _PLACE_VALUES
+    return _validated(values)
+
+
+def _validated(values: np.ndarray) -> np.ndarray:
+    """One vectorized range check over every answer"""
+    if values.ndim != 1 or (values.size and values.dtype.kind not in 'iu'):
+        raise ValueError("Answers must be a flat list of integers")
+    values = values.astype(np.int64)
+    invalid = np.flatnonzero((values < MIN_ANSWER) | (values > MAX_ANSWER))
+    if invalid.size:
+        raise ValueError(
+            f"Answers must be between {MIN_ANSWER} and {MAX_ANSWER}; position {int(invalid[0])} is {int(values[invalid[0]])}"
+        )
+    return values
+
+
+def decode_answers(question_bank, answers: Optional[Sequence[int]] = None,
+                   packed: Optional[str] = None) -> List[Dict]:
+    """
+    Expand a v2 submission into calculator answers. Exactly one of answers
+    (a positional list) or packed must be given, with one value per
+    question in the bank's question_ids order.
+    """
+    if (answers is None) == (packed is None):
+        raise ValueError("Send exactly one of answers or packed")
+    count = len(question_bank)
+    if packed is not None:
+        values = unpack_answers(packed, count)
+    else:
+        if len(answers) != count:
+            raise ValueError(f"Expected {count} answers for question bank {question_bank.version}, got {len(answers)}")
+        values = _validated(np.asarray(answers))
+    return [
+        {'question_id': question_id, 'answer': answer}
+        for question_id, answer in zip(question_bank.question_ids.tolist(), values.tolist())
+    ]
@@ -23,11 +23,12 @@ class CareerSerializer(serializers.ModelSerializer):
         ]
     
     def get_specializations(self, obj):
-        if obj.parent is None:  # Only get specializations for parent careers
+        if obj.parent_id is None:  # Only get specializations for parent careers
+            # Sorted here so a prefetch_related('specializations') is used
             return [{
                 'title': spec.title,
                 'order': spec.order
-            } for spec in obj.specializations.all().order_by('order')]
+            } for spec in sorted(obj.specializations.all(), key=lambda spec: spec.order)]
         return None
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -126,8 +127,13 @@ class CareerChoiceSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at', 'research_notes']
 
     def get_bookmarked_careers(self, obj):
-        bookmarks = CareerBookmark.objects.filter(
-            user=obj.user,
-            career__category__book=obj.book
-        )
+        # Lists load the user's bookmarks once (see CareerChoiceViewSet)
+        bookmarks_by_book = self.context.get('bookmarks_by_book')
+        if bookmarks_by_book is not None:
+            bookmarks = bookmarks_by_book.get(obj.book_id, [])
+        else:
+            bookmarks = CareerBookmark.objects.filter(
+                user_id=obj.user_id,
+                career__category__book_id=obj.book_id
+            ).select_related('career__category')
         return CareerBookmarkSerializer(bookmarks, many=True).data 
\ No newline at end of file
@@ -5,61 +5,57 @@ from .models import Book, BookAccess
 
 class BookAccessService:
     @staticmethod
-    def grant_gift_based_access(user, gift_profile):
-        """Grant book access based on primary and secondary gifts"""
-        try:
-            print(f"Debug - Starting grant_gift_based_access for user {user.id}")
-            print(f"Debug - Primary gift: {gift_profile.primary_gift}")
-            print(f"Debug - Secondary gifts: {gift_profile.secondary_gifts}")
-            
-            # First, deactivate any existing book access
-            BookAccess.objects.filter(user=user).update(is_active=False)
-            
-            # Clean and standardize the gift names
-            def clean_gift_name(gift):
-                gift = gift.split('(')[0].strip().upper()
-                print(f"Debug - Cleaned gift name: {gift}")
-                return gift
-            
-            primary_gift = clean_gift_name(gift_profile.primary_gift)
-            print(f"Debug - Looking for books with primary gift: {primary_gift}")
-            primary_books = Book.objects.filter(associated_gift=primary_gift)
-            print(f"Debug - Found {primary_books.count()} primary books")
-            
-            secondary_gifts = [clean_gift_name(gift) for gift in gift_profile.secondary_gifts]
-            print(f"Debug - Looking for books with secondary gifts: {secondary_gifts}")
-            secondary_books = Book.objects.filter(associated_gift__in=secondary_gifts)
-            print(f"Debug - Found {secondary_books.count()} secondary books")
-            
-            # Grant access and log each book
-            for book in primary_books:
-                print(f"Debug - Granting PRIMARY access to book: {book.title}")
-                BookAccess.objects.update_or_create(
-                    user=user,
-                    book=book,
-                    defaults={
-                        'access_reason': 'PRIMARY',
-                        'is_active': True,
-                        'expires_at': timezone.now() + timedelta(days=365)
-                    }
-                )
-            
-            for book in secondary_books:
-                print(f"Debug - Granting SECONDARY access to book: {book.title}")
-                BookAccess.objects.update_or_create(
-                    user=user,
-                    book=book,
-                    defaults={
-                        'access_reason': 'SECONDARY',
-                        'is_active': True,
-                        'expires_at': timezone.now() + timedelta(days=365)
-                    }
-                )
-            
-            print("Debug - Book access grant completed successfully")
-        except Exception as e:
-            print(f"Error in grant_gift_based_access: {str(e)}")
-            raise
+    def grant_gift_based_access_bulk(gift_profiles):
+        """
+        Grant book access for many gift profiles in three queries however
+        many books match: one book lookup, one deactivation of the users'
+        existing access and one upsert of the grants. A user's existing
+        access is replaced, so with several profiles per user the last wins.
+        Run it inside the caller's transaction to make the swap atomic.
+        """
+        # Clean and standardize the gift names
+        def clean_gift_name(gift):
+            return gift.split('(')[0].strip().upper()
+
+        latest = {profile.user_id: profile for profile in gift_profiles}
+        if not latest:
+            return []
+        wanted = {
+            user_id: [
+                ('PRIMARY', clean_gift_name(profile.primary_gift)),
+                *(('SECONDARY', clean_gift_name(gift)) for gift in profile.secondary_gifts)
+            ]
+            for user_id, profile in latest.items()
+        }
+
+        books = {}
+        gifts = {gift for grants in wanted.values() for _, gift in grants}
+        for book_id, gift in Book.objects.filter(associated_gift__in=gifts).values_list('id', 'associated_gift'):
+            books.setdefault(gift, []).append(book_id)
+
+        expires_at = timezone.now() + timedelta(days=365)
+        grants = {}
+        for user_id, user_grants in wanted.items():
+            for reason, gift in user_grants:
+                for book_id in books.get(gift, []):
+                    grants[(user_id, book_id)] = BookAccess(
+                        user_id=user_id,
+                        book_id=book_id,
+                        access_reason=reason,
+                        is_active=True,
+                        expires_at=expires_at
+                    )
+
+        # First, deactivate any existing book access
+        BookAccess.objects.filter(user_id__in=latest).update(is_active=False)
+        if not grants:
+            return []
+        return BookAccess.objects.bulk_create(
+            list(grants.values()),
+            update_conflicts=True,
+            unique_fields=['user', 'book'],
+            update_fields=['access_reason', 'is_active', 'expires_at']
+        )
 
     @staticmethod
     def get_accessible_books(user):
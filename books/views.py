@@ -2,7 +2,7 @@ from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Book, BookAccess, Career, ReadingHistory, CareerChoice, CareerResearchNote, CareerBookmark
+from .models import Book, BookAccess, Career, CareerCategory, ReadingHistory, CareerChoice, CareerResearchNote, CareerBookmark
 from .serializers import (
     BookSerializer, 
     BookDetailSerializer,
@@ -15,6 +15,7 @@ from .serializers import (
 )
 from .services import BookAccessService
 from datetime import timedelta
+from django.db.models import Prefetch
 from django.utils import timezone
 import pytz
 
@@ -32,15 +33,23 @@ class BookViewSet(viewsets.ReadOnlyModelViewSet):
         book_access = BookAccess.objects.filter(
             user=request.user,
             is_active=True
-        ).select_related('book')
+        ).select_related('book').prefetch_related(
+            Prefetch('book__categories', queryset=CareerCategory.objects.prefetch_related('careers__specializations'))
+        )
+        
+        print(f"Debug - Found {len(book_access)} active book access records")
         
-        print(f"Debug - Found {book_access.count()} active book access records")
+        # One query for the progress on every book
+        progress_by_book = {
+            progress.book_id: progress
+            for progress in request.user.book_progress.select_related('current_category')
+        }
         
         books_data = []
         for access in book_access:
             if access.is_valid():
                 print(f"Debug - Processing book: {access.book.title} ({access.book.associated_gift})")
-                progress = request.user.book_progress.filter(book=access.book).first()
+                progress = progress_by_book.get(access.book_id)
                 book_data = BookDetailSerializer(access.book).data
                 book_data.update({
                     'access_details': {
@@ -63,7 +72,7 @@ class BookViewSet(viewsets.ReadOnlyModelViewSet):
         """Get book's table of contents with categories and careers"""
         try:
             book = self.get_object()
-            categories = book.categories.all().prefetch_related('careers').order_by('order')
+            categories = book.categories.all().prefetch_related('careers__specializations').order_by('order')
             
             if not categories.exists():
                 return Response({
@@ -149,7 +158,7 @@ class BookViewSet(viewsets.ReadOnlyModelViewSet):
         book = self.get_object()
         careers = Career.objects.filter(
             category__book=book
-        ).select_related('category')
+        ).select_related('category').prefetch_related('specializations')
         return Response(CareerSerializer(careers, many=True).data)
 
     @action(detail=True, methods=['post'])
@@ -330,7 +339,21 @@ class CareerChoiceViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return CareerChoice.objects.filter(user=self.request.user)
+        return CareerChoice.objects.filter(user=self.request.user).select_related(
+            'career_choice_1__category', 'career_choice_2__category'
+        ).prefetch_related(
+            'career_choice_1__specializations', 'career_choice_2__specializations', 'research_notes'
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'list':
+            # Bookmarks for every listed choice in one query
+            bookmarks_by_book = {}
+            for bookmark in CareerBookmark.objects.filter(user=self.request.user).select_related('career__category'):
+                bookmarks_by_book.setdefault(bookmark.career.category.book_id, []).append(bookmark)
+            context['bookmarks_by_book'] = bookmarks_by_book
+        return context
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 import django
 from django.conf import settings
 
@@ -6,6 +7,12 @@ from django.conf import settings
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pathfinders_project.settings')
 django.setup()
 
+# Keep tests from replacing the compiled question bank artifact in the tree
+os.environ.setdefault(
+    'QUESTION_BANK_ARTIFACT',
+    os.path.join(tempfile.mkdtemp(prefix='pathfinders-tests-'), 'question_bank.npz')
+)
+
 # Add pytest markers
 def pytest_configure(config):
     config.addinivalue_line(
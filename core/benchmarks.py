@@ -0,0 +1,375 @@
+#core/benchmarks.py
+
+from typing import Callable, Dict, List, Optional
+from contextlib import contextmanager
+from unittest.mock import patch
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+import numpy as np
+
+# A benchmark regresses when its median is this much slower than the baseline
+DEFAULT_TOLERANCE = 0.25
+
+
+def measure(operation: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Time repeated calls and summarize them in microseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    timings.sort()
+    return {
+        'runs': repeat,
+        'median_us': statistics.median(timings),
+        'p95_us': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'min_us': timings[0],
+    }
+
+
+def synthetic_answers(rng: random.Random, question_ids: List[int]) -> List[Dict]:
+    """One respondent: a dominant gift pattern plus noise, like real submissions"""
+    lean = rng.random()
+    return [
+        {
+            'question_id': question_id,
+            'answer': max(1, min(5, round(rng.gauss(1 + 4 * lean, 1.2)))),
+        }
+        for question_id in question_ids
+    ]
+
+
+@contextmanager
+def isolated_run():
+    """
+    Run the suite inside a transaction that is rolled back, with the
+    question bank artifact written to a temporary directory. Afterwards
+    the shared question bank and memoized results, which referenced the
+    rolled-back questions, are invalidated.
+    """
+    from django.db import transaction
+    from assessments.question_bank import invalidate_question_bank
+    from assessments.result_cache import get_result_cache
+
+    with tempfile.TemporaryDirectory() as directory:
+        artifact = os.path.join(directory, 'question_bank.npz')
+        with patch.dict(os.environ, {'QUESTION_BANK_ARTIFACT': artifact}):
+            try:
+                with transaction.atomic():
+                    yield
+                    transaction.set_rollback(True)
+            finally:
+                invalidate_question_bank()
+                get_result_cache().clear()
+
+
+class InProcessFastAPIClient:
+    """Stands in for core.services.FastAPIClient, calling the app in-process"""
+
+    _client = None
+
+    def __init__(self, *args, **kwargs):
+        if InProcessFastAPIClient._client is None:
+            from fastapi.testclient import TestClient
+            from fastapi_app.main import app
+            InProcessFastAPIClient._client = TestClient(app)
+        self.client = InProcessFastAPIClient._client
+
+    def calculate_gifts_sync(self, data):
+        from assessments.question_bank import get_question_bank
+        response = self.client.post('/calculate-gifts/', json=data)
+        if response.status_code == 409:
+            self.client.put('/question-bank/', json=get_question_bank().to_payload())
+            response = self.client.post('/calculate-gifts/', json=data)
+        if response.status_code != 200:
+            raise ValueError(response.text)
+        return response.json()
+
+
+class BenchmarkSuite:
+    """
+    Seeds the real question bank, one book per gift and a synthetic
+    respondent population, then times each stage of a submission. Meant to
+    run inside isolated_run().
+    """
+
+    def __init__(self, respondents: int = 200, repeat: int = 200, seed: int = 2024):
+        self.respondents = respondents
+        self.repeat = repeat
+        self.rng = random.Random(seed)
+        self._payloads = {}
+
+    def seed(self):
+        from django.core.management import call_command
+        from assessments.question_bank import get_question_bank
+        from books.models import Book
+
+        call_command('load_questions', stdout=io.StringIO())
+        for key, name in Book.GIFT_CHOICES:
+            Book.objects.get_or_create(
+                slug=f'benchmark-{key.lower()}',
+                defaults={
+                    'title': f'The Gift of {name}',
+                    'associated_gift': key,
+                    'copyright_info': 'Benchmark fixture',
+                    'version': '1.0',
+                }
+            )
+        self.bank = get_question_bank()
+        question_ids = self.bank.question_ids.tolist()
+        self.population = [
+            synthetic_answers(self.rng, question_ids) for _ in range(self.respondents)
+        ]
+
+    def cycle(self, items):
+        position = [0]
+
+        def next_item():
+            item = items[position[0] % len(items)]
+            position[0] += 1
+            return item
+        return next_item
+
+    def run(self, only: Optional[List[str]] = None) -> Dict[str, Dict]:
+        from django.conf import settings
+        from django.test.utils import override_settings
+        from rest_framework.parsers import JSONParser
+        from rest_framework.renderers import JSONRenderer
+        from core.renderers import ORJSONParser, ORJSONRenderer
+
+        self.seed()
+        benchmarks = {
+            'calculate_scores': self.bench_calculate_scores,
+            'calculate_scores_batch': self.bench_calculate_scores_batch,
+            'identify_gifts': self.bench_identify_gifts,
+            'get_gift_descriptions': self.bench_get_gift_descriptions,
+            'fastapi_calculate_gifts': self.bench_fastapi_calculate_gifts,
+            'django_submit': self.bench_django_submit,
+            # Encoding alone, DRF's stdlib renderer against the orjson one
+            'render_book_detail_json': lambda: self.bench_render('book_detail', JSONRenderer()),
+            'render_book_detail_orjson': lambda: self.bench_render('book_detail', ORJSONRenderer()),
+            'render_dashboard_json': lambda: self.bench_render('dashboard', JSONRenderer()),
+            'render_dashboard_orjson': lambda: self.bench_render('dashboard', ORJSONRenderer()),
+            'parse_submission_json': lambda: self.bench_parse(JSONParser()),
+            'parse_submission_orjson': lambda: self.bench_parse(ORJSONParser()),
+        }
+        results = {}
+        httpx_logger = logging.getLogger('httpx')
+        httpx_level = httpx_logger.level
+        httpx_logger.setLevel(logging.WARNING)  # One INFO line per test-client request
+        try:
+            # No SQL debug logging, and let the test clients' host through
+            with override_settings(DEBUG=False, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                for name, benchmark in benchmarks.items():
+                    if only and name not in only:
+                        continue
+                    results[name] = benchmark()
+        finally:
+            httpx_logger.setLevel(httpx_level)
+        return results
+
+    def bench_calculate_scores(self):
+        from assessments.gift_calculator import GiftCalculator
+        calculator = GiftCalculator()
+        respondent = self.cycle(self.population)
+        return measure(lambda: calculator.calculate_scores(respondent(), question_bank=self.bank), self.repeat)
+
+    def bench_calculate_scores_batch(self):
+        from assessments.gift_calculator import GiftCalculator
+        calculator = GiftCalculator()
+        result = measure(
+            lambda: calculator.calculate_scores_batch(self.population, question_bank=self.bank),
+            max(1, self.repeat // 20)
+        )
+        result['per_assessment_us'] = result['median_us'] / len(self.population)
+        return result
+
+    def bench_identify_gifts(self):
+        from assessments.gift_calculator import GiftCalculator
+        calculator = GiftCalculator()
+        scores = self.cycle(calculator.calculate_scores_batch(self.population, question_bank=self.bank))
+        return measure(lambda: calculator.identify_gifts(scores()), self.repeat)
+
+    def bench_get_gift_descriptions(self):
+        from assessments.gift_calculator import GiftCalculator
+        calculator = GiftCalculator()
+        selections = self.cycle(calculator.identify_gifts_batch(
+            calculator.calculate_scores_batch(self.population, question_bank=self.bank)
+        ))
+        return measure(lambda: calculator.get_gift_descriptions(*selections()), self.repeat)
+
+    def bench_fastapi_calculate_gifts(self):
+        from fastapi.testclient import TestClient
+        from fastapi_app.main import app, result_cache
+
+        client = TestClient(app)
+        client.put('/question-bank/', json=self.bank.to_payload())
+        respondent = self.cycle(self.population)
+
+        def post():
+            result_cache.clear()  # Measure the calculation, not the memo
+            response = client.post('/calculate-gifts/', json={
+                'question_bank_version': self.bank.version,
+                'answers': respondent()
+            })
+            assert response.status_code == 200, response.text
+        return measure(post, self.repeat)
+
+    def bench_django_submit(self):
+        from django.contrib.auth import get_user_model
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+        from assessments.result_cache import get_result_cache
+
+        User = get_user_model()
+        client = APIClient()
+        url = reverse('assessment-submit')
+        respondent = self.cycle(self.population)
+        count = [0]
+
+        def submit():
+            # A fresh user each time: the assessment limit is per user
+            count[0] += 1
+            user = User.objects.create_user(
+                username=f'benchmark-{count[0]}', email=f'benchmark-{count[0]}@example.com'
+            )
+            client.force_authenticate(user=user)
+            get_result_cache().clear()
+            response = client.post(url, {'answers': respondent()}, format='json')
+            assert response.status_code == 200, response.content
+
+        with patch('assessments.views.FastAPIClient', InProcessFastAPIClient):
+            return measure(submit, max(1, self.repeat // 4))
+
+    def payload(self, name: str):
+        """Response data as the views hand it to the renderer, built once per run"""
+        if name not in self._payloads:
+            self._payloads[name] = getattr(self, f'build_{name}')()
+        return self._payloads[name]
+
+    def build_book_detail(self):
+        """One book with 12 categories of 25 careers, a fifth of them with specializations"""
+        from books.models import Book, Career, CareerCategory
+        from books.serializers import BookDetailSerializer
+
+        book = Book.objects.create(
+            slug='benchmark-book-detail', title='The Gift of Benchmarking',
+            associated_gift='SERVICE', copyright_info='Benchmark fixture', version='1.0',
+            publication_info={'publisher': 'Pathfinders', 'year': 2024}
+        )
+        for order in range(12):
+            category = CareerCategory.objects.create(
+                book=book, title=f'Category {order}', order=order,
+                description='Careers that suit this gift. ' * 8
+            )
+            parents = Career.objects.bulk_create([
+                Career(category=category, title=f'Career {order}.{i}', order=i,
+                       possibility_rating=('HP', 'VP', 'P')[i % 3],
+                       description='What the work involves and why it fits. ' * 4)
+                for i in range(25)
+            ])
+            Career.objects.bulk_create([
+                Career(category=category, parent=parent, title=f'{parent.title} specialization {j}',
+                       order=j, possibility_rating='P')
+                for parent in parents[::5] for j in range(3)
+            ])
+        return BookDetailSerializer(book).data
+
+    def build_dashboard(self):
+        """Counselor dashboard rows for the respondent population, three results each"""
+        from django.utils import timezone
+        from assessments.gift_calculator import GiftCalculator
+
+        calculator = GiftCalculator()
+        all_scores = calculator.calculate_scores_batch(self.population, question_bank=self.bank)
+        now = timezone.now()
+        rows = []
+        for number, (answers, scores, (primary_gift, secondary_gifts)) in enumerate(
+                zip(self.population, all_scores, calculator.identify_gifts_batch(all_scores))):
+            results = {
+                'scores': scores,
+                'primary_gift': primary_gift,
+                'secondary_gifts': secondary_gifts,
+                'descriptions': calculator.catalog.descriptions(primary_gift, secondary_gifts),
+                'answers': answers,
+            }
+            rows.append({
+                'user_id': number,
+                'full_name': f'Respondent {number}',
+                'email': f'respondent-{number}@example.com',
+                'status': 'active',
+                'notes': '',
+                'created_at': now,
+                'assessments': [
+                    {'id': number * 3 + i, 'completion_status': True, 'created_at': now,
+                     'counselor_notes': '', 'results': results}
+                    for i in range(3)
+                ],
+                'gift_profile': {
+                    'primary_gift': primary_gift, 'secondary_gifts': secondary_gifts,
+                    'scores': scores, 'timestamp': now,
+                },
+                'assessment_count': 3,
+                'max_limit': 3,
+                'can_take_more': False,
+            })
+        return rows
+
+    def bench_render(self, name: str, renderer):
+        data = self.payload(name)
+        return measure(lambda: renderer.render(data, 'application/json', {}), max(1, self.repeat // 4))
+
+    def bench_parse(self, parser):
+        body = json.dumps({'answers': self.population[0]}).encode()
+        return measure(lambda: parser.parse(io.BytesIO(body), 'application/json', {}), self.repeat)
+
+
+def environment() -> Dict[str, str]:
+    from core.renderers import orjson
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'orjson': orjson.__version__ if orjson is not None else 'missing',
+        'machine': platform.machine(),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[Dict]:
+    """One row per benchmark with its change against the baseline median"""
+    rows = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        row = {'name': name, 'median_us': result['median_us'], 'baseline_us': None,
+               'change': None, 'regressed': False}
+        if previous:
+            row['baseline_us'] = previous['median_us']
+            row['change'] = result['median_us'] / previous['median_us'] - 1
+            row['regressed'] = row['change'] > tolerance
+        rows.append(row)
+    return rows
+
+
+def load_baseline(path) -> Dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, results: Dict[str, Dict], respondents: int):
+    with open(path, 'w') as f:
+        json.dump({
+            'environment': environment(),
+            'respondents': respondents,
+            'benchmarks': results,
+        }, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -0,0 +1,254 @@
+#core/calculation_backends.py
+
+from typing import Dict, List, Optional
+import hashlib
+import logging
+import threading
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BackendError(Exception):
+    """A backend couldn't produce a result; the client fails over to the next one"""
+
+
+class BackendUnavailable(BackendError):
+    """The backend itself is unhealthy (unreachable, timed out, 5xx), not the request"""
+
+
+class CircuitOpen(BackendUnavailable):
+    """Every backend was skipped: open breakers or no time left in the budget"""
+
+
+class BackendStats:
+    """Process-wide call counts and latency per backend name"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name: str, elapsed: float, ok: bool):
+        with self._lock:
+            stats = self._stats.setdefault(name, {
+                'calls': 0, 'failures': 0, 'total_seconds': 0.0, 'max_seconds': 0.0
+            })
+            stats['calls'] += 1
+            if not ok:
+                stats['failures'] += 1
+            stats['total_seconds'] += elapsed
+            stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                name: {**stats, 'mean_seconds': stats['total_seconds'] / stats['calls']}
+                for name, stats in self._stats.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+backend_stats = BackendStats()
+
+
+class InProcessBackend:
+    """
+    Scores with this process's GiftCalculator and question bank: no
+    serialization and no network hop. Results have the same shape as the
+    FastAPI service's.
+    """
+    name = 'inprocess'
+    breaker = None  # Nothing remote to protect
+
+    def _question_bank(self, data):
+        from assessments.question_bank import get_question_bank
+
+        version = data.get('question_bank_version')
+        if version is None:
+            return None
+        bank = get_question_bank()
+        if bank.version != version:
+            raise BackendError(f"Unknown question bank version: {version}")
+        return bank
+
+    def _answers(self, data, question_bank):
+        if question_bank is not None:
+            return data['answers']
+        # Same normalization as the FastAPI service for correlation-carrying answers
+        return [
+            {**answer, 'gift_correlation': {k.upper(): v for k, v in answer['gift_correlation'].items()}}
+            for answer in data['answers']
+        ]
+
+    def _result(self, calculator, scores, primary_gift, secondary_gifts):
+        from assessments.gift_catalog import EMPTY_ROLES
+
+        return {
+            'scores': scores,
+            'primary_gift': primary_gift,
+            'secondary_gifts': secondary_gifts,
+            'descriptions': calculator.catalog.descriptions(primary_gift, secondary_gifts),
+            'recommended_roles': {k: list(v) for k, v in EMPTY_ROLES.items()}
+        }
+
+    def calculate(self, data, timeout: Optional[float] = None) -> Dict:
+        from assessments.gift_calculator import GiftCalculator
+
+        calculator = GiftCalculator()
+        try:
+            question_bank = self._question_bank(data)
+            scores = calculator.calculate_scores(self._answers(data, question_bank), question_bank=question_bank)
+        except (KeyError, TypeError, ValueError) as e:
+            raise BackendError(f"In-process calculation failed: {str(e)}")
+        primary_gift, secondary_gifts = calculator.identify_gifts(scores, threshold_factor=0.80)
+        return self._result(calculator, scores, primary_gift, secondary_gifts)
+
+    def calculate_batch(self, assessments, timeout: Optional[float] = None) -> List[Dict]:
+        from assessments.gift_calculator import GiftCalculator
+
+        calculator = GiftCalculator()
+        versions = {a.get('question_bank_version') for a in assessments}
+        if len(versions) > 1:
+            raise BackendError("All assessments in a batch must use the same question bank version")
+        try:
+            question_bank = self._question_bank(assessments[0]) if assessments else None
+            answer_sets = [self._answers(a, question_bank) for a in assessments]
+            all_scores = calculator.calculate_scores_batch(answer_sets, question_bank=question_bank)
+        except (KeyError, TypeError, ValueError) as e:
+            raise BackendError(f"In-process batch calculation failed: {str(e)}")
+        selections = calculator.identify_gifts_batch(all_scores, threshold_factor=0.80)
+        return [
+            self._result(calculator, scores, primary_gift, secondary_gifts)
+            for scores, (primary_gift, secondary_gifts) in zip(all_scores, selections)
+        ]
+
+
+# Keep-alive clients shared by every FastAPIClient in the process, keyed
+# by (base_url, uds path); httpx.Client is safe to share between threads
+_clients: Dict[tuple, httpx.Client] = {}
+_clients_lock = threading.Lock()
+
+# Connection limits for the shared clients
+POOL_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30.0)
+
+
+def shared_client(base_url: str, uds: Optional[str] = None) -> httpx.Client:
+    key = (base_url, uds)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = httpx.Client(
+                base_url=base_url,
+                limits=POOL_LIMITS,
+                transport=httpx.HTTPTransport(uds=uds, limits=POOL_LIMITS) if uds else None
+            )
+            _clients[key] = client
+        return client
+
+
+def close_shared_clients():
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+def remote_label(kind: str, address: str) -> str:
+    """Stable per-remote breaker name that doesn't reveal the remote's address"""
+    return f"{kind}:{hashlib.sha256(address.encode()).hexdigest()[:8]}"
+
+
+class HTTPBackend:
+    """The FastAPI service over TCP"""
+    name = 'http'
+
+    def __init__(self, base_url: str, timeout: float = 30.0, breaker_name: Optional[str] = None):
+        from .circuit_breaker import get_breaker
+
+        self.base_url = base_url
+        self.timeout = timeout
+        # One breaker per remote, shared by every client in the process
+        self.breaker = get_breaker(
+            breaker_name or remote_label(self.name, base_url),
+            failure_threshold=getattr(settings, 'GIFT_BREAKER_FAILURES', None),
+            reset_timeout=getattr(settings, 'GIFT_BREAKER_RESET_SECONDS', None)
+        )
+
+    def client(self) -> httpx.Client:
+        return shared_client(self.base_url)
+
+    def publish_question_bank(self, client, timeout: float):
+        """Push this process's compiled question bank to the FastAPI service"""
+        from assessments.question_bank import get_question_bank
+
+        payload = get_question_bank().to_payload()
+        logger.info(f"Publishing question bank {payload['version']} to FastAPI")
+        response = client.put("/question-bank/", json=payload, timeout=timeout)
+        response.raise_for_status()
+
+    def _post_calculation(self, client, path, data, timeout: float):
+        """POST a calculation, publishing the question bank once if FastAPI lacks it"""
+        response = client.post(path, json=data, timeout=timeout)
+        if response.status_code == 409:
+            # 409 means FastAPI doesn't hold the question bank version we referenced
+            self.publish_question_bank(client, timeout)
+            response = client.post(path, json=data, timeout=timeout)
+        return response
+
+    def _call(self, path, data, timeout: Optional[float]):
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        try:
+            response = self._post_calculation(self.client(), path, data, timeout)
+            logger.info(f"FastAPI response status: {response.status_code}")
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= 500:
+                raise BackendUnavailable(f"FastAPI HTTP error: {str(e)}")
+            raise BackendError(f"FastAPI HTTP error: {str(e)}")
+        except httpx.HTTPError as e:
+            raise BackendUnavailable(f"FastAPI HTTP error: {str(e)}")
+
+    def calculate(self, data, timeout: Optional[float] = None) -> Dict:
+        return self._call("/calculate-gifts/", data, timeout)
+
+    def calculate_batch(self, assessments, timeout: Optional[float] = None) -> List[Dict]:
+        return self._call("/calculate-gifts/batch/", {'assessments': assessments}, timeout)['results']
+
+
+class UDSBackend(HTTPBackend):
+    """The FastAPI service over a Unix domain socket (uvicorn --uds)"""
+    name = 'uds'
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        # The host part is ignored on a socket but httpx needs one
+        super().__init__('http://fastapi', timeout, breaker_name=remote_label(self.name, path))
+        self.path = path
+
+    def client(self) -> httpx.Client:
+        return shared_client(self.base_url, uds=self.path)
+
+
+def build_backends(names: List[str], base_url: str, uds_path: Optional[str] = None,
+                   timeout: float = 30.0) -> List:
+    """Backends in failover order, from names like ['inprocess', 'http']"""
+    backends = []
+    for name in names:
+        name = name.strip().lower()
+        if name == 'inprocess':
+            backends.append(InProcessBackend())
+        elif name == 'http':
+            backends.append(HTTPBackend(base_url, timeout))
+        elif name == 'uds':
+            if not uds_path:
+                raise ValueError("The uds calculation backend needs FASTAPI_UDS_PATH")
+            backends.append(UDSBackend(uds_path, timeout))
+        elif name:
+            raise ValueError(f"Unknown calculation backend: {name}")
+    if not backends:
+        raise ValueError("No calculation backends configured")
+    return backends
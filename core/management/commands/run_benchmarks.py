@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmarks import (
+    DEFAULT_TOLERANCE,
+    BenchmarkSuite,
+    compare,
+    isolated_run,
+    load_baseline,
+    save_baseline
+)
+
+class Command(BaseCommand):
+    help = 'Benchmark scoring and the submit path against stored JSON baselines'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--baseline',
+            default=str(settings.BASE_DIR / 'benchmarks' / 'baseline.json'),
+            help='Baseline file to compare against (and write with --update-baseline)'
+        )
+        parser.add_argument('--update-baseline', action='store_true',
+                            help='Store this run as the new baseline')
+        parser.add_argument('--respondents', type=int, default=200,
+                            help='Size of the synthetic respondent population')
+        parser.add_argument('--repeat', type=int, default=200,
+                            help='Timed runs per benchmark (the submit path runs a quarter of these)')
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help='Allowed median slowdown before a benchmark counts as regressed')
+        parser.add_argument('--only', nargs='*', help='Run only these benchmarks')
+
+    def handle(self, *args, **options):
+        suite = BenchmarkSuite(respondents=options['respondents'], repeat=options['repeat'])
+
+        # Seeded questions, books and users never outlive the run, nor
+        # does the question bank compiled from them
+        with isolated_run():
+            results = suite.run(only=options['only'])
+
+        baseline = load_baseline(options['baseline']).get('benchmarks', {})
+        rows = compare(results, baseline, options['tolerance'])
+
+        for row in rows:
+            line = f"{row['name']:<28} {row['median_us']:>12.1f}us"
+            if row['baseline_us'] is None:
+                self.stdout.write(f'{line}   (no baseline)')
+            elif row['regressed']:
+                self.stdout.write(self.style.ERROR(
+                    f"{line}   {row['change']:+.1%} vs {row['baseline_us']:.1f}us"
+                ))
+            else:
+                self.stdout.write(f"{line}   {row['change']:+.1%} vs {row['baseline_us']:.1f}us")
+
+        if options['update_baseline']:
+            save_baseline(options['baseline'], results, options['respondents'])
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+
+        regressed = [row['name'] for row in rows if row['regressed']]
+        if regressed:
+            raise CommandError(f"Slower than baseline: {', '.join(regressed)}")
+        self.stdout.write(self.style.SUCCESS('No benchmark regressions'))
@@ -0,0 +1,135 @@
+#core/query_inspector.py
+
+from typing import Dict, Iterable, List
+from collections import Counter
+from contextlib import ExitStack
+import logging
+import os
+import re
+import time
+import traceback
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def query_shape(sql: str) -> str:
+    """SQL with its literals and parameter lists collapsed, so an N+1's queries compare equal"""
+    shape = _STRING.sub('?', sql)
+    shape = _NUMBER.sub('?', shape)
+    shape = shape.replace('%s', '?')
+    shape = _IN_LIST.sub('IN (...)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+def caller_frames(limit: int = 3) -> List[str]:
+    """The innermost project frames (not Django, DRF or other packages) on the stack"""
+    base_dir = str(settings.BASE_DIR)
+    frames = []
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename == _THIS_FILE or not filename.startswith(base_dir) or 'site-packages' in filename:
+            continue
+        frames.append(f"{os.path.relpath(filename, base_dir)}:{frame.lineno} in {frame.name}")
+        if len(frames) >= limit:
+            break
+    return frames
+
+
+class QueryRecorder:
+    """
+    A connection.execute_wrapper that records each query's SQL, shape,
+    duration and the project code that ran it. Works without DEBUG.
+    """
+
+    def __init__(self, stack_depth: int = 3):
+        self.stack_depth = stack_depth
+        self.queries: List[Dict] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'shape': query_shape(sql),
+                'duration': time.perf_counter() - started,
+                'stack': caller_frames(self.stack_depth),
+            })
+
+
+def duplicate_shapes(queries: Iterable[Dict], threshold: int = 3) -> List[Dict]:
+    """
+    Query shapes run threshold or more times, most repeated first, each
+    with where it was run from. Accepts QueryRecorder entries or Django's
+    captured_queries ({'sql': ...}).
+    """
+    groups: Dict[str, List[Dict]] = {}
+    for query in queries:
+        shape = query.get('shape') or query_shape(query['sql'])
+        groups.setdefault(shape, []).append(query)
+
+    duplicates = []
+    for shape, group in groups.items():
+        if len(group) < threshold:
+            continue
+        locations = Counter(' <- '.join(query['stack']) for query in group if query.get('stack'))
+        duplicates.append({
+            'shape': shape,
+            'count': len(group),
+            'locations': [location for location, _ in locations.most_common(3)],
+        })
+    return sorted(duplicates, key=lambda duplicate: -duplicate['count'])
+
+
+def format_duplicates(duplicates: List[Dict]) -> str:
+    lines = []
+    for duplicate in duplicates:
+        lines.append(f"{duplicate['count']}x {duplicate['shape'][:300]}")
+        lines.extend(f"    at {location}" for location in duplicate['locations'])
+    return '\n'.join(lines)
+
+
+class QueryInspectorMiddleware:
+    """
+    Debug-only N+1 detector: records every query a request runs and logs
+    a warning for each query shape repeated QUERY_INSPECTOR['THRESHOLD']
+    or more times, with the code that ran it. Adds X-Query-Count (and
+    X-Duplicate-Queries when something repeats) to the response.
+    Not loaded at all unless DEBUG is on.
+    """
+
+    def __init__(self, get_response):
+        config = getattr(settings, 'QUERY_INSPECTOR', {})
+        if not settings.DEBUG or not config.get('ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = config.get('THRESHOLD', 3)
+        self.stack_depth = config.get('STACK_DEPTH', 3)
+
+    def __call__(self, request):
+        recorder = QueryRecorder(self.stack_depth)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        response['X-Query-Count'] = str(len(recorder.queries))
+        duplicates = duplicate_shapes(recorder.queries, self.threshold)
+        if duplicates:
+            response['X-Duplicate-Queries'] = str(sum(duplicate['count'] for duplicate in duplicates))
+            logger.warning(
+                f"Repeated queries in {request.method} {request.path} "
+                f"({len(recorder.queries)} queries):\n{format_duplicates(duplicates)}"
+            )
+        return response
@@ -0,0 +1,79 @@
+#core/renderers.py
+
+import codecs
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # Optional: without it these behave exactly like DRF's classes
+    orjson = None
+
+# Datetimes go through DRF's encoder so their format doesn't change
+# (millisecond precision, 'Z' for UTC); numpy values are encoded natively
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    if orjson is not None else 0
+)
+
+_drf_encoder = encoders.JSONEncoder()
+
+
+def orjson_available() -> bool:
+    return orjson is not None
+
+
+def _default(obj):
+    # Decimal, UUID, lazy translations, querysets and the like
+    return _drf_encoder.default(obj)
+
+
+def _is_utf8(encoding: str) -> bool:
+    try:
+        return codecs.lookup(encoding).name == 'utf-8'
+    except LookupError:
+        return False
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer on orjson: the same compact output (floats in exponent
+    form aside: 1e-7 rather than 1e-07), several times faster on large
+    payloads such as books with hundreds of careers, counselor dashboards
+    and results_data. Indented output, and anything orjson refuses (e.g.
+    integers beyond 64 bits), falls back to DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same strict-javascript-subset escaping as DRF
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser on orjson, for UTF-8 request bodies"""
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None or not _is_utf8((parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
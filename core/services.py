@@ -1,70 +1,151 @@
 import httpx
 from django.conf import settings
 from typing import Dict, Any
+from .calculation_backends import (
+    BackendError,
+    BackendUnavailable,
+    CircuitOpen,
+    backend_stats,
+    build_backends
+)
+from .circuit_breaker import CircuitBreaker, Deadline, all_breakers
 import os
 import logging
 import time
 
 logger = logging.getLogger(__name__)
 
+class CalculationUnavailable(ValueError):
+    """No calculation backend is healthy right now; callers should score locally"""
+
+
 class FastAPIClient:
-    def __init__(self):
+    def __init__(self, backends=None):
         # Use internal network URL since both services are on same server
         self.base_url = os.getenv('FASTAPI_URL', 'http://127.0.0.1:8001')
         self.timeout = 30.0
         self.max_retries = 2
-        
-    def calculate_gifts_sync(self, data):
-        """Synchronous request to FastAPI calculate-gifts endpoint with retry logic"""
-        logger.info(f"Attempting to connect to FastAPI at {self.base_url}/calculate-gifts/")
-        
-        retries = 0
-        last_error = None
-        
-        while retries <= self.max_retries:
+        # Total time one calculation may take across every attempt and backend
+        self.deadline = getattr(settings, 'GIFT_CALCULATION_DEADLINE', 5.0)
+        self.retry_backoff = 0.1
+        # Tried in order; the first one that answers wins
+        self.backends = backends or build_backends(
+            getattr(settings, 'GIFT_CALCULATION_BACKENDS', ['http']),
+            self.base_url,
+            uds_path=getattr(settings, 'FASTAPI_UDS_PATH', None),
+            timeout=self.timeout
+        )
+
+    def _run(self, method, payload, deadline: Deadline):
+        """One pass over the backends, failing over on errors and open breakers"""
+        errors = []
+        attempted = 0
+        unavailable = True
+        for backend in self.backends:
+            breaker = getattr(backend, 'breaker', None)
+            if deadline.expired:
+                errors.append('deadline exceeded')
+                break
+            if breaker is not None and not breaker.allow():
+                errors.append(f"{backend.name}: circuit open")
+                continue
+
+            attempted += 1
+            start = time.perf_counter()
             try:
-                with httpx.Client() as client:
-                    logger.info(f"Sending request to FastAPI (attempt {retries+1}/{self.max_retries+1})")
-                    
-                    # Log request data summary without sensitive info
-                    logger.debug(f"Request data: user_id={data.get('user_id')}, answers count={len(data.get('answers', []))}")
-                    
-                    response = client.post(
-                        f"{self.base_url}/calculate-gifts/",  # Add endpoint path
-                        json=data,
-                        timeout=self.timeout
-                    )
-                    
-                    # Log response status
-                    logger.info(f"FastAPI response status: {response.status_code}")
-                    
-                    response.raise_for_status()
-                    result = response.json()
-                    
-                    # Log success with summary of results
-                    logger.info(f"Successfully calculated gifts: primary={result.get('primary_gift')}")
-                    return result
-                    
-            except httpx.HTTPError as e:
-                last_error = f"FastAPI HTTP error: {str(e)}"
-                logger.warning(last_error)
-            except httpx.TimeoutException as e:
-                last_error = f"FastAPI timeout error: {str(e)}"
-                logger.warning(last_error)
+                result = getattr(backend, method)(payload, timeout=deadline.remaining())
+            except BackendUnavailable as e:
+                backend_stats.record(backend.name, time.perf_counter() - start, ok=False)
+                if breaker is not None:
+                    breaker.record_failure()
+                logger.warning(f"{backend.name} backend unavailable: {str(e)}")
+                errors.append(f"{backend.name}: {str(e)}")
+                continue
             except Exception as e:
-                last_error = f"FastAPI unexpected error: {str(e)}"
-                logger.error(last_error)
-                
-            # Increase retry count and wait before retry
-            retries += 1
-            if retries <= self.max_retries:
-                wait_time = retries * 2  # Progressive backoff
-                logger.info(f"Retrying in {wait_time} seconds...")
-                time.sleep(wait_time)
-        
-        # If we've exhausted retries, raise an error
-        logger.error(f"FastAPI calculation failed after {self.max_retries+1} attempts")
-        raise ValueError(f"FastAPI calculation failed: {last_error}")
+                backend_stats.record(backend.name, time.perf_counter() - start, ok=False)
+                # The backend answered; the request itself was bad
+                if breaker is not None:
+                    breaker.record_success()
+                unavailable = False
+                logger.warning(f"{backend.name} backend failed: {str(e)}")
+                errors.append(f"{backend.name}: {str(e)}")
+                continue
+            backend_stats.record(backend.name, time.perf_counter() - start, ok=True)
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+        message = '; '.join(errors)
+        if not attempted:
+            raise CircuitOpen(message)
+        if unavailable:
+            raise BackendUnavailable(message)
+        raise BackendError(message)
+
+    def _any_closed(self):
+        """False once every backend's breaker has opened; no point retrying then"""
+        return any(
+            getattr(backend, 'breaker', None) is None or backend.breaker.state != CircuitBreaker.OPEN
+            for backend in self.backends
+        )
+
+    def calculate_gifts_sync(self, data):
+        """
+        Calculate gifts on the first healthy backend within the deadline budget.
+        Raises CalculationUnavailable straight away while every breaker is open,
+        so the caller can score locally instead of holding the worker.
+        """
+        logger.info(f"Calculating gifts via {', '.join(b.name for b in self.backends)}")
+        logger.debug(f"Request data: user_id={data.get('user_id')}, answers count={len(data.get('answers', []))}")
+
+        deadline = Deadline(self.deadline)
+        attempt = 0
+        while True:
+            try:
+                result = self._run('calculate', data, deadline)
+                logger.info(f"Successfully calculated gifts: primary={result.get('primary_gift')}")
+                return result
+            except CircuitOpen as e:
+                last_error = e
+                break
+            except BackendUnavailable as e:
+                last_error = e
+            except BackendError as e:
+                raise ValueError(f"FastAPI calculation failed: {str(e)}")
+
+            # Short backoff, only while the budget allows another attempt
+            attempt += 1
+            if attempt > self.max_retries or deadline.expired or not self._any_closed():
+                break
+            logger.info(f"Calculation attempt {attempt}/{self.max_retries+1} failed: {str(last_error)}")
+            time.sleep(min(self.retry_backoff * attempt, deadline.remaining() / 2))
+
+        logger.error(f"FastAPI calculation unavailable: {str(last_error)}")
+        raise CalculationUnavailable(f"FastAPI calculation failed: {str(last_error)}")
+
+    def calculate_gifts_batch_sync(self, assessments):
+        """Score several assessments in one call to the first available backend"""
+        logger.info(f"Sending batch of {len(assessments)} assessments")
+        try:
+            return self._run('calculate_batch', assessments, Deadline(self.deadline))
+        except BackendUnavailable as e:
+            error_msg = f"FastAPI batch error: {str(e)}"
+            logger.error(error_msg)
+            raise CalculationUnavailable(error_msg)
+        except BackendError as e:
+            error_msg = f"FastAPI batch error: {str(e)}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+    @staticmethod
+    def backend_stats() -> Dict[str, Dict]:
+        """Per-backend call counts, failures and latency for this process"""
+        return backend_stats.snapshot()
+
+    @staticmethod
+    def breaker_stats() -> Dict[str, Dict]:
+        """State of each remote's circuit breaker"""
+        return {name: breaker.snapshot() for name, breaker in all_breakers().items()}
 
     async def calculate_gifts(self, data):
         """Asynchronous request to FastAPI calculate-gifts endpoint"""
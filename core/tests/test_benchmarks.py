@@ -0,0 +1,67 @@
+import io
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from assessments.models import Question
+from assessments.question_bank import QUESTION_BANK_VERSION_KEY
+from core.benchmarks import compare, save_baseline
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        handle, self.baseline = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        os.remove(self.baseline)
+        self.addCleanup(lambda: os.path.exists(self.baseline) and os.remove(self.baseline))
+
+    def run_benchmarks(self, *args):
+        out = io.StringIO()
+        call_command(
+            'run_benchmarks', '--baseline', self.baseline,
+            '--respondents', '8', '--repeat', '8', *args, stdout=out
+        )
+        return out.getvalue()
+
+    def test_suite_writes_and_checks_baseline(self):
+        output = self.run_benchmarks('--update-baseline')
+        self.assertIn('no baseline', output)
+        with open(self.baseline) as f:
+            baseline = json.load(f)
+        self.assertEqual(set(baseline['benchmarks']), {
+            'calculate_scores', 'calculate_scores_batch', 'identify_gifts',
+            'get_gift_descriptions', 'fastapi_calculate_gifts', 'django_submit',
+            'render_book_detail_json', 'render_book_detail_orjson',
+            'render_dashboard_json', 'render_dashboard_orjson',
+            'parse_submission_json', 'parse_submission_orjson'
+        })
+
+        # Generous tolerance: only checks that the comparison runs end to end
+        output = self.run_benchmarks('--tolerance', '100')
+        self.assertIn('No benchmark regressions', output)
+
+    def test_seeded_question_bank_does_not_outlive_the_run(self):
+        artifact = os.path.join(tempfile.mkdtemp(), 'question_bank.npz')
+        with patch.dict(os.environ, {'QUESTION_BANK_ARTIFACT': artifact}):
+            self.run_benchmarks('--only', 'calculate_scores')
+        self.assertFalse(Question.objects.exists())
+        self.assertFalse(os.path.exists(artifact))
+        self.assertIsNone(cache.get(QUESTION_BANK_VERSION_KEY))
+
+    def test_regression_fails_the_run(self):
+        save_baseline(self.baseline, {'identify_gifts': {'median_us': 0.001}}, 8)
+        with self.assertRaises(CommandError):
+            self.run_benchmarks('--only', 'identify_gifts')
+
+    def test_compare(self):
+        rows = compare(
+            {'a': {'median_us': 130.0}, 'b': {'median_us': 110.0}, 'c': {'median_us': 5.0}},
+            {'a': {'median_us': 100.0}, 'b': {'median_us': 100.0}},
+            tolerance=0.25
+        )
+        self.assertEqual([row['regressed'] for row in rows], [True, False, False])
+        self.assertIsNone(rows[2]['baseline_us'])
@@ -0,0 +1,139 @@
+import json
+import os
+import socketserver
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from fastapi.testclient import TestClient
+from assessments.models import Question
+from assessments.question_bank import get_question_bank
+from core.calculation_backends import (
+    BackendError,
+    BackendUnavailable,
+    HTTPBackend,
+    InProcessBackend,
+    UDSBackend,
+    backend_stats,
+    build_backends,
+    close_shared_clients
+)
+from core.services import FastAPIClient
+from fastapi_app.main import app
+
+SAMPLE_ANSWERS = [
+    {'question_id': 1, 'answer': 5, 'gift_correlation': {'teaching': 1.0, 'PERCEPTION': 0.5}},
+    {'question_id': 2, 'answer': 4, 'gift_correlation': {'GIVING': 1.0, 'COMPASSION': 0.7}},
+    {'question_id': 3, 'answer': 2, 'gift_correlation': {'EXHORTATION': 1.0, 'SERVICE': 0.4}},
+]
+
+
+class FailingBackend:
+    name = 'failing'
+
+    def calculate(self, data, timeout=None):
+        raise BackendUnavailable('down')
+
+    def calculate_batch(self, assessments, timeout=None):
+        raise BackendUnavailable('down')
+
+
+class CalculationHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        body = json.dumps({'primary_gift': 'Teaching', 'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        return 'uds'
+
+    def log_message(self, *args):
+        pass
+
+
+class CalculationBackendTests(TestCase):
+    def setUp(self):
+        backend_stats.reset()
+        self.questions = [
+            Question.objects.create(category='Test', text=f'Question {i}', gift_correlation=answer['gift_correlation'])
+            for i, answer in enumerate(SAMPLE_ANSWERS)
+        ]
+        self.bank = get_question_bank()
+        self.compact = [
+            {'question_id': question.id, 'answer': answer['answer']}
+            for question, answer in zip(self.questions, SAMPLE_ANSWERS)
+        ]
+        self.api = TestClient(app)
+        self.api.put('/question-bank/', json=self.bank.to_payload())
+
+    def test_in_process_matches_fastapi(self):
+        backend = InProcessBackend()
+        data = {'question_bank_version': self.bank.version, 'answers': self.compact}
+        self.assertEqual(backend.calculate(data), self.api.post('/calculate-gifts/', json=data).json())
+
+        legacy = {'answers': SAMPLE_ANSWERS}
+        self.assertEqual(backend.calculate(legacy), self.api.post('/calculate-gifts/', json=legacy).json())
+
+        batch = [data, {'question_bank_version': self.bank.version, 'answers': self.compact[:2]}]
+        self.assertEqual(
+            backend.calculate_batch(batch),
+            self.api.post('/calculate-gifts/batch/', json={'assessments': batch}).json()['results']
+        )
+
+    def test_in_process_rejects_other_bank_versions(self):
+        with self.assertRaises(BackendError):
+            InProcessBackend().calculate({'question_bank_version': 'stale', 'answers': self.compact})
+
+    def test_failover_and_latency_stats(self):
+        client = FastAPIClient(backends=[FailingBackend(), InProcessBackend()])
+        result = client.calculate_gifts_sync({'question_bank_version': self.bank.version, 'answers': self.compact})
+        self.assertIn('primary_gift', result)
+
+        stats = FastAPIClient.backend_stats()
+        self.assertEqual(stats['failing']['failures'], 1)
+        self.assertEqual(stats['inprocess']['calls'], 1)
+        self.assertEqual(stats['inprocess']['failures'], 0)
+        self.assertGreater(stats['inprocess']['mean_seconds'], 0)
+
+    @patch('core.services.time.sleep')
+    def test_all_backends_failing_raises_value_error(self, sleep):
+        client = FastAPIClient(backends=[FailingBackend()])
+        with self.assertRaises(ValueError):
+            client.calculate_gifts_sync({'answers': SAMPLE_ANSWERS})
+        with self.assertRaises(ValueError):
+            client.calculate_gifts_batch_sync([{'answers': SAMPLE_ANSWERS}])
+        self.assertEqual(backend_stats.snapshot()['failing']['calls'], 4)
+
+    def test_uds_backend(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'fastapi.sock')
+        server = socketserver.ThreadingUnixStreamServer(path, CalculationHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(os.rmdir, directory)
+        self.addCleanup(os.remove, path)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.addCleanup(close_shared_clients)  # Drop the kept-alive connection first
+
+        result = UDSBackend(path).calculate({'answers': SAMPLE_ANSWERS})
+        self.assertEqual(result, {'primary_gift': 'Teaching', 'path': '/calculate-gifts/'})
+
+    def test_unreachable_http_backend_is_a_backend_error(self):
+        with self.assertRaises(BackendError):
+            HTTPBackend('http://127.0.0.1:9', timeout=1).calculate({'answers': SAMPLE_ANSWERS})
+
+    @override_settings(GIFT_CALCULATION_BACKENDS=['inprocess', 'http'])
+    def test_backends_from_settings(self):
+        self.assertEqual([b.name for b in FastAPIClient().backends], ['inprocess', 'http'])
+        with self.assertRaises(ValueError):
+            build_backends(['uds'], 'http://127.0.0.1:8001')
+        with self.assertRaises(ValueError):
+            build_backends(['carrier-pigeon'], 'http://127.0.0.1:8001')
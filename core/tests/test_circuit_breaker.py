@@ -0,0 +1,157 @@
+import time
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from assessments.models import Question
+from core.calculation_backends import BackendUnavailable, InProcessBackend, backend_stats, remote_label
+from core.circuit_breaker import CircuitBreaker, Deadline, get_breaker, reset_breakers
+from core.services import CalculationUnavailable, FastAPIClient
+
+User = get_user_model()
+
+SAMPLE_ANSWERS = [
+    {'question_id': 1, 'answer': 5, 'gift_correlation': {'TEACHING': 1.0}},
+    {'question_id': 2, 'answer': 2, 'gift_correlation': {'GIVING': 1.0}},
+]
+
+
+class DownBackend:
+    """A remote that always fails, with its own breaker"""
+    name = 'down'
+
+    def __init__(self, threshold=2):
+        self.breaker = get_breaker('down', failure_threshold=threshold, reset_timeout=60)
+        self.calls = 0
+        self.timeouts = []
+
+    def calculate(self, data, timeout=None):
+        self.calls += 1
+        self.timeouts.append(timeout)
+        raise BackendUnavailable('connection refused')
+
+
+class CircuitBreakerTests(TestCase):
+    def test_opens_after_consecutive_failures_and_probes_after_timeout(self):
+        breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())        # The probe
+        self.assertFalse(breaker.allow())       # Only one at a time
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.snapshot()['opened'], 2)
+
+    def test_success_resets_the_failure_count(self):
+        breaker = CircuitBreaker('test', failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class FastAPIClientBreakerTests(TestCase):
+    def setUp(self):
+        reset_breakers()
+        backend_stats.reset()
+        self.addCleanup(reset_breakers)
+
+    def test_open_breaker_fails_fast_without_calling_the_remote(self):
+        backend = DownBackend(threshold=2)
+        client = FastAPIClient(backends=[backend])
+        with patch('core.services.time.sleep') as sleep:
+            with self.assertRaises(CalculationUnavailable):
+                client.calculate_gifts_sync({'answers': SAMPLE_ANSWERS})
+        self.assertEqual(backend.calls, 2)   # Retried until the breaker opened
+        self.assertEqual(sleep.call_count, 1)
+
+        start = time.perf_counter()
+        with self.assertRaises(CalculationUnavailable):
+            FastAPIClient(backends=[DownBackend()]).calculate_gifts_sync({'answers': SAMPLE_ANSWERS})
+        self.assertLess(time.perf_counter() - start, 0.05)
+        self.assertEqual(get_breaker('down').snapshot()['rejected'], 1)
+        self.assertEqual(FastAPIClient.breaker_stats()['down']['state'], CircuitBreaker.OPEN)
+
+    def test_open_breaker_falls_over_to_in_process(self):
+        backend = DownBackend(threshold=1)
+        backend.breaker.record_failure()
+        client = FastAPIClient(backends=[backend, InProcessBackend()])
+        result = client.calculate_gifts_sync({'answers': SAMPLE_ANSWERS})
+        self.assertEqual(result['primary_gift'], 'Teaching')
+        self.assertEqual(backend.calls, 0)
+
+    def test_attempts_share_one_deadline_budget(self):
+        backend = DownBackend(threshold=100)
+        client = FastAPIClient(backends=[backend])
+        client.deadline = 0.3
+        start = time.perf_counter()
+        with self.assertRaises(CalculationUnavailable):
+            client.calculate_gifts_sync({'answers': SAMPLE_ANSWERS})
+        self.assertLess(time.perf_counter() - start, 0.3 + 0.05)
+        self.assertTrue(all(0 < timeout <= 0.3 for timeout in backend.timeouts))
+        self.assertTrue(backend.timeouts == sorted(backend.timeouts, reverse=True))
+
+    def test_deadline(self):
+        deadline = Deadline(0.02)
+        self.assertFalse(deadline.expired)
+        time.sleep(0.03)
+        self.assertTrue(deadline.expired)
+        self.assertEqual(deadline.remaining(), 0.0)
+
+
+@override_settings(GIFT_CALCULATION_BACKENDS=['http'], GIFT_BREAKER_FAILURES=1)
+class SubmitWhileFastAPIDownTests(TestCase):
+    def setUp(self):
+        reset_breakers()
+        self.addCleanup(reset_breakers)
+        self.client = APIClient()
+        self.questions = [
+            Question.objects.create(category='Test', text=f'Question {i}', gift_correlation=a['gift_correlation'])
+            for i, a in enumerate(SAMPLE_ANSWERS)
+        ]
+
+    def submit(self, username):
+        user = User.objects.create_user(username=username, email=f'{username}@example.com', password='pass12345')
+        self.client.force_authenticate(user=user)
+        answers = [{'question_id': q.id, 'answer': a['answer']} for q, a in zip(self.questions, SAMPLE_ANSWERS)]
+        return self.client.post(reverse('assessment-submit'), {'answers': answers}, format='json')
+
+    @patch.dict('os.environ', {'FASTAPI_URL': 'http://127.0.0.1:9'})
+    def test_submit_scores_locally_when_fastapi_is_down(self):
+        response = self.submit('first')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['primary_gift'], 'Teaching')
+        breaker = remote_label('http', 'http://127.0.0.1:9')
+        self.assertEqual(FastAPIClient.breaker_stats()[breaker]['state'], CircuitBreaker.OPEN)
+
+        # Breaker open: the next submit doesn't wait on the network at all
+        start = time.perf_counter()
+        response = self.submit('second')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        staff = User.objects.create_user(username='ops', email='ops@example.com', is_staff=True)
+        self.client.force_login(staff)
+        metrics = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn(f'pathfinders_calculation_breaker_state{{backend="{breaker}",state="open"}} 2', metrics)
+        self.assertNotIn('127.0.0.1', metrics)
+
+    @override_settings(METRICS_TOKEN='scrape-token')
+    def test_metrics_need_staff_or_the_scrape_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,131 @@
+import asyncio
+import random
+import time
+from unittest.mock import patch
+import httpx
+from django.test import SimpleTestCase
+from fastapi.testclient import TestClient
+from assessments.gift_calculator import GiftCalculator
+from assessments.question_bank import CompiledQuestionBank
+from fastapi_app import main
+from fastapi_app.coalescer import Histogram, ScoringCoalescer
+
+GIFTS = list(GiftCalculator.MOTIVATIONAL_GIFTS)
+
+
+class HistogramTests(SimpleTestCase):
+    def test_cumulative_buckets(self):
+        histogram = Histogram((1, 4, 16))
+        for value in (1, 2, 3, 20):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['buckets'], {'1': 1, '4': 3, '16': 3, '+Inf': 4})
+        self.assertEqual(snapshot['count'], 4)
+        self.assertEqual(snapshot['sum'], 26)
+        self.assertIn('size_bucket{le="+Inf"} 4', histogram.prometheus('size'))
+
+
+class CoalescedCalculationTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        question_ids = list(range(1, 22))
+        self.bank = CompiledQuestionBank(
+            question_ids,
+            [{GIFTS[i % 7]: 1.0, GIFTS[(i + 2) % 7]: round(rng.random(), 2)} for i in question_ids],
+            [1.0] * len(question_ids)
+        )
+        main.register_question_bank(self.bank)
+        self.requests = [
+            {
+                'question_bank_version': self.bank.version,
+                'answers': [{'question_id': q, 'answer': rng.randint(1, 5)} for q in question_ids]
+            }
+            for _ in range(24)
+        ]
+        main.result_cache.clear()
+        self.addCleanup(main.result_cache.clear)
+
+    def post_concurrently(self, payloads):
+        async def run():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                return await asyncio.gather(*(
+                    client.post('/calculate-gifts/', json=payload) for payload in payloads
+                ))
+        return asyncio.run(run())
+
+    def test_concurrent_requests_share_batches(self):
+        expected = [TestClient(main.app).post('/calculate-gifts/', json=p).json() for p in self.requests]
+        main.result_cache.clear()
+
+        coalescer = ScoringCoalescer(main.calculator, window_seconds=0.01, max_batch=8)
+        with patch.object(main, 'coalescer', coalescer):
+            responses = self.post_concurrently(self.requests)
+            metrics = TestClient(main.app).get('/metrics/').text
+
+        self.assertEqual([r.json() for r in responses], expected)
+        sizes = coalescer.batch_size.snapshot()
+        self.assertEqual(sizes['sum'], len(self.requests))
+        self.assertLess(sizes['count'], len(self.requests))
+        self.assertEqual(coalescer.queue_wait.snapshot()['count'], len(self.requests))
+        self.assertIn('pathfinders_gifts_coalesced_batch_size_bucket', metrics)
+        self.assertIn('pathfinders_gifts_coalesced_queue_wait_seconds_count 24', metrics)
+
+    def test_requests_without_a_bank_keep_their_own_correlations(self):
+        # Same question ids and answers, different client-sent correlations
+        payloads = [
+            {'answers': [
+                {'question_id': 1, 'answer': 5, 'gift_correlation': {first: 1.0}},
+                {'question_id': 2, 'answer': 1, 'gift_correlation': {second: 1.0}},
+            ]}
+            for first, second in (('TEACHING', 'SERVICE'), ('SERVICE', 'TEACHING'))
+        ]
+        expected = [TestClient(main.app).post('/calculate-gifts/', json=p).json() for p in payloads]
+        self.assertNotEqual(expected[0]['primary_gift'], expected[1]['primary_gift'])
+
+        coalescer = ScoringCoalescer(main.calculator, window_seconds=0.05, max_batch=2)
+        with patch.object(main, 'coalescer', coalescer):
+            responses = self.post_concurrently(payloads)
+        self.assertEqual(coalescer.batch_size.snapshot()['count'], 1)  # One shared batch
+        self.assertEqual([r.json() for r in responses], expected)
+
+    def test_full_batch_is_scored_without_waiting_for_the_window(self):
+        coalescer = ScoringCoalescer(main.calculator, window_seconds=10, max_batch=4)
+        with patch.object(main, 'coalescer', coalescer):
+            start = time.perf_counter()
+            responses = self.post_concurrently(self.requests[:4])
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertTrue(all(r.status_code == 200 for r in responses))
+        self.assertEqual(coalescer.batch_size.snapshot()['buckets']['4'], 1)
+
+    def test_bad_submission_does_not_fail_its_batch(self):
+        bad = {
+            'question_bank_version': self.bank.version,
+            'answers': [{'question_id': 999, 'answer': 3}]
+        }
+        coalescer = ScoringCoalescer(main.calculator, window_seconds=0.01, max_batch=8)
+        with patch.object(main, 'coalescer', coalescer):
+            responses = self.post_concurrently([self.requests[0], bad, self.requests[1]])
+        self.assertEqual([r.status_code for r in responses], [200, 400, 200])
+
+    def test_failed_off_loop_batch_fails_its_callers(self):
+        class Executor:
+            mode = 'process'
+
+        coalescer = ScoringCoalescer(main.calculator, window_seconds=0.001, max_batch=8, executor=Executor())
+
+        async def broken(items):
+            raise RuntimeError('worker died')
+
+        async def run():
+            with patch.object(coalescer, '_score_group_off_loop', broken):
+                return await asyncio.gather(
+                    coalescer.submit(self.requests[0]['answers'], self.bank),
+                    coalescer.submit(self.requests[1]['answers'], self.bank),
+                    return_exceptions=True
+                )
+
+        with self.assertLogs('fastapi_app.coalescer', 'ERROR'):
+            results = asyncio.run(asyncio.wait_for(run(), 5))
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(coalescer._tasks, set())
@@ -0,0 +1,137 @@
+import asyncio
+import random
+import threading
+import time
+from unittest.mock import patch
+import httpx
+from django.test import SimpleTestCase
+from assessments.gift_calculator import GiftCalculator
+from assessments.question_bank import CompiledQuestionBank
+from fastapi_app import main
+from fastapi_app.executor import ExecutorSaturated, ScoringExecutor, score_answer_sets
+
+GIFTS = list(GiftCalculator.MOTIVATIONAL_GIFTS)
+
+
+class SlowCalculator(GiftCalculator):
+    """Blocks in calculate_scores until released, like a long CPU-bound job"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def calculate_scores(self, answers, question_bank=None):
+        self.release.wait(5)
+        return super().calculate_scores(answers, question_bank=question_bank)
+
+
+class ScoringExecutorTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        question_ids = list(range(1, 15))
+        self.bank = CompiledQuestionBank(
+            question_ids,
+            [{GIFTS[i % 7]: 1.0, GIFTS[(i + 4) % 7]: round(rng.random(), 2)} for i in question_ids],
+            [1.0] * len(question_ids)
+        )
+        self.answer_sets = [
+            [{'question_id': q, 'answer': rng.randint(1, 5)} for q in question_ids]
+            for _ in range(6)
+        ]
+        self.expected = [
+            score_answer_sets(GiftCalculator(), [answers], self.bank)[0] for answers in self.answer_sets
+        ]
+
+    def run_modes(self, mode):
+        executor = ScoringExecutor(GiftCalculator(), mode=mode, workers=2)
+        self.addCleanup(executor.shutdown)
+
+        async def run():
+            single = await executor.score(self.answer_sets[:1], self.bank)
+            batch = await executor.score(self.answer_sets, self.bank)
+            return single, batch
+        return asyncio.run(run())
+
+    def test_every_mode_matches_inline(self):
+        for mode in ('inline', 'thread', 'process'):
+            with self.subTest(mode=mode):
+                single, batch = self.run_modes(mode)
+                self.assertEqual(single, self.expected[:1])
+                self.assertEqual(batch, self.expected)
+
+    def test_process_workers_receive_new_banks(self):
+        executor = ScoringExecutor(GiftCalculator(), mode='process', workers=1)
+        executor.start()  # No bank preloaded
+        self.addCleanup(executor.shutdown)
+        result = asyncio.run(executor.score(self.answer_sets[:1], self.bank))
+        self.assertEqual(result, self.expected[:1])
+
+    def test_saturated_queue_is_rejected(self):
+        calculator = SlowCalculator()
+        executor = ScoringExecutor(calculator, mode='thread', workers=1, max_queue=0)
+        self.addCleanup(executor.shutdown)
+
+        async def run():
+            first = asyncio.ensure_future(executor.score(self.answer_sets[:1], self.bank))
+            await asyncio.sleep(0.05)
+            with self.assertRaises(ExecutorSaturated):
+                await executor.score(self.answer_sets[:1], self.bank)
+            calculator.release.set()
+            return await first
+
+        self.assertEqual(asyncio.run(run()), self.expected[:1])
+        self.assertEqual(executor.stats()['rejected'], 1)
+
+
+class OffLoopEndpointTests(SimpleTestCase):
+    def setUp(self):
+        self.bank = CompiledQuestionBank(
+            [1, 2, 3],
+            [{'TEACHING': 1.0}, {'GIVING': 1.0}, {'SERVICE': 1.0}],
+            [1.0, 1.0, 1.0]
+        )
+        main.register_question_bank(self.bank)
+        self.payload = {
+            'question_bank_version': self.bank.version,
+            'answers': [{'question_id': q, 'answer': 4} for q in (1, 2, 3)]
+        }
+        main.result_cache.clear()
+        self.addCleanup(main.result_cache.clear)
+
+    async def request(self, client, method, url, **kwargs):
+        response = await client.request(method, url, **kwargs)
+        return response, time.perf_counter()
+
+    def test_scoring_does_not_block_health_checks(self):
+        calculator = SlowCalculator()
+        executor = ScoringExecutor(calculator, mode='thread', workers=1)
+        self.addCleanup(executor.shutdown)
+
+        async def run():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                scoring = asyncio.ensure_future(self.request(client, 'POST', '/calculate-gifts/', json=self.payload))
+                await asyncio.sleep(0.05)
+                health, health_done = await self.request(client, 'GET', '/health/')
+                calculator.release.set()
+                (scored, scored_done) = await scoring
+                return health, health_done, scored, scored_done
+
+        with patch.object(main, 'executor', executor):
+            health, health_done, scored, scored_done = asyncio.run(run())
+        self.assertEqual(health.status_code, 200)
+        self.assertEqual(scored.status_code, 200)
+        self.assertLess(health_done, scored_done)
+
+    def test_saturation_returns_503_with_retry_after(self):
+        executor = ScoringExecutor(GiftCalculator(), mode='thread', workers=1, max_queue=0, retry_after=7)
+        executor.in_flight = executor.capacity
+        with patch.object(main, 'executor', executor):
+            transport = httpx.ASGITransport(app=main.app)
+
+            async def run():
+                async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                    return await client.post('/calculate-gifts/', json=self.payload)
+            response = asyncio.run(run())
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '7')
@@ -0,0 +1,130 @@
+from django.test import TestCase
+from fastapi.testclient import TestClient
+from fastapi_app.main import app
+from fastapi_app.gift_api import app as gift_api_app
+from assessments.question_bank import CompiledQuestionBank, artifact_path
+from assessments.wire_format import pack_answers
+
+SAMPLE_ANSWERS = [
+    {'question_id': 1, 'answer': 5, 'gift_correlation': {'TEACHING': 1.0, 'PERCEPTION': 0.5, 'SERVICE': 0.2}},
+    {'question_id': 2, 'answer': 4, 'gift_correlation': {'GIVING': 1.0, 'COMPASSION': 0.7, 'SERVICE': 0.3}},
+    {'question_id': 3, 'answer': 3, 'gift_correlation': {'ADMINISTRATION': 0.8, 'EXHORTATION': 1.0, 'TEACHING': 0.4}},
+]
+
+
+class CalculateGiftsEndpointTests(TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def test_calculate_gifts(self):
+        response = self.client.post('/calculate-gifts/', json={'user_id': 1, 'answers': SAMPLE_ANSWERS})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['primary_gift'], 'Perception')
+        self.assertEqual(data['descriptions']['primary']['gift'], 'Perception (Prophecy)')
+
+    def test_batch_matches_single_requests(self):
+        answer_sets = [
+            SAMPLE_ANSWERS,
+            [dict(answer, answer=6 - answer['answer']) for answer in SAMPLE_ANSWERS],
+        ]
+        response = self.client.post('/calculate-gifts/batch/', json={
+            'assessments': [{'answers': answers} for answers in answer_sets]
+        })
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(len(results), 2)
+
+        for answers, result in zip(answer_sets, results):
+            single = self.client.post('/calculate-gifts/', json={'answers': answers}).json()
+            self.assertEqual(result, single)
+
+
+class GiftApiTests(TestCase):
+    def setUp(self):
+        self.client = TestClient(gift_api_app)
+
+    def test_no_answers_is_a_bad_request(self):
+        response = self.client.post('/calculate-gifts/', json={'answers': []})
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_scores_each_assessment_with_its_own_correlations(self):
+        # Same question ids, different correlations
+        swapped = [dict(answer, gift_correlation={'SERVICE': 1.0}) if answer['question_id'] == 1 else answer
+                   for answer in SAMPLE_ANSWERS]
+        response = self.client.post('/calculate-gifts/batch/', json={
+            'assessments': [{'answers': SAMPLE_ANSWERS}, {'answers': swapped}]
+        })
+        self.assertEqual(response.status_code, 200)
+        for answers, result in zip((SAMPLE_ANSWERS, swapped), response.json()['results']):
+            self.assertEqual(result, self.client.post('/calculate-gifts/', json={'answers': answers}).json())
+
+
+class QuestionBankEndpointTests(TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.bank = CompiledQuestionBank(
+            [a['question_id'] for a in SAMPLE_ANSWERS],
+            [a['gift_correlation'] for a in SAMPLE_ANSWERS],
+            [1.0] * len(SAMPLE_ANSWERS)
+        )
+
+    def test_unknown_bank_version_returns_conflict(self):
+        response = self.client.post('/calculate-gifts/', json={
+            'question_bank_version': 'not-published',
+            'answers': [{'question_id': 1, 'answer': 5}]
+        })
+        self.assertEqual(response.status_code, 409)
+
+    def test_published_bank_scores_compact_answers(self):
+        response = self.client.put('/question-bank/', json=self.bank.to_payload())
+        self.assertEqual(response.status_code, 200)
+
+        compact = [{'question_id': a['question_id'], 'answer': a['answer']} for a in SAMPLE_ANSWERS]
+        response = self.client.post('/calculate-gifts/', json={
+            'question_bank_version': self.bank.version,
+            'answers': compact
+        })
+        self.assertEqual(response.status_code, 200)
+        expected = self.client.post('/calculate-gifts/', json={'answers': SAMPLE_ANSWERS}).json()
+        self.assertEqual(response.json(), expected)
+
+    def test_startup_loads_compiled_artifact(self):
+        self.bank.save(artifact_path())
+        with TestClient(app) as client:
+            self.assertIn(self.bank.version, client.get('/question-bank/').json()['versions'])
+
+
+class CompactSubmissionTests(TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.bank = CompiledQuestionBank(
+            [a['question_id'] for a in SAMPLE_ANSWERS],
+            [a['gift_correlation'] for a in SAMPLE_ANSWERS],
+            [1.0] * len(SAMPLE_ANSWERS)
+        )
+        self.client.put('/question-bank/', json=self.bank.to_payload())
+
+    def test_v2_matches_v1(self):
+        expected = self.client.post('/calculate-gifts/', json={'answers': SAMPLE_ANSWERS}).json()
+        values = [a['answer'] for a in SAMPLE_ANSWERS]
+        for body in ({'answers': values}, {'packed': pack_answers(values)}):
+            response = self.client.post('/v2/calculate-gifts/', json={
+                'question_bank_version': self.bank.version, **body
+            })
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), expected)
+
+    def test_v2_question_order(self):
+        response = self.client.get(f'/question-bank/{self.bank.version}/')
+        self.assertEqual(response.json()['question_ids'], [1, 2, 3])
+
+    def test_v2_rejects_invalid_answers(self):
+        response = self.client.post('/v2/calculate-gifts/', json={
+            'question_bank_version': self.bank.version, 'answers': [5, 4]
+        })
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/v2/calculate-gifts/', json={
+            'question_bank_version': 'not-published', 'answers': [5, 4, 3]
+        })
+        self.assertEqual(response.status_code, 409)
@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+from django.test import SimpleTestCase
+from fastapi.testclient import TestClient
+from fastapi_app.http_pool import DeadlineExceeded, PoolConfig, UpstreamPool
+from fastapi_app.main import app, django_pool
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    peers = set()
+    closed = set()
+
+    def do_GET(self):
+        KeepAliveHandler.peers.add(self.client_address)
+        body = b'{"ok":true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def finish(self):
+        super().finish()
+        KeepAliveHandler.closed.add(self.client_address)
+
+    def log_message(self, *args):
+        pass
+
+
+class UpstreamPoolTests(SimpleTestCase):
+    def test_requests_reuse_one_keepalive_connection(self):
+        KeepAliveHandler.peers = set()
+        server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        pool = UpstreamPool('test', f'http://127.0.0.1:{server.server_port}')
+
+        async def run():
+            await pool.start()
+            for _ in range(5):
+                response = await pool.get('/progress/')
+                self.assertEqual(response.json(), {'ok': True})
+            stats = pool.stats()
+            await pool.aclose()
+            return stats
+
+        stats = asyncio.run(run())
+        self.assertEqual(len(KeepAliveHandler.peers), 1)  # One client port: one TCP connection
+        self.assertEqual(stats['requests'], 5)
+        self.assertEqual(stats['connections'], 1)
+        self.assertEqual(stats['in_flight'], 0)
+
+    def test_a_new_event_loop_closes_the_old_client(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        pool = UpstreamPool('test', f'http://127.0.0.1:{server.server_port}')
+
+        KeepAliveHandler.peers, KeepAliveHandler.closed = set(), set()
+        asyncio.run(pool.get('/progress/'))
+        first = pool.client
+        self.assertEqual(pool.stats()['connections'], 1)
+        streams = list(pool._streams)  # Held so garbage collection can't close them for us
+
+        asyncio.run(pool.get('/progress/'))
+        self.assertIsNot(pool.client, first)
+        self.assertTrue(first.is_closed)
+        asyncio.run(pool.aclose())
+
+        # The server saw both connections closed, the first one's included
+        deadline = time.monotonic() + 2
+        while KeepAliveHandler.closed != KeepAliveHandler.peers and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(KeepAliveHandler.peers), 2)
+        self.assertEqual(KeepAliveHandler.closed, KeepAliveHandler.peers)
+        del streams
+
+    def test_a_client_on_a_running_loop_is_closed_there(self):
+        pool = UpstreamPool('test', 'http://django',
+                            transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})))
+        first_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=first_loop.run_forever, daemon=True)
+        thread.start()
+        self.addCleanup(first_loop.close)
+        self.addCleanup(thread.join)
+        self.addCleanup(first_loop.call_soon_threadsafe, first_loop.stop)
+
+        asyncio.run_coroutine_threadsafe(pool.get('/progress/'), first_loop).result(5)
+        first = pool.client
+        asyncio.run(pool.get('/progress/'))
+        self.assertTrue(first.is_closed)
+        asyncio.run(pool.aclose())
+
+    def test_deadline_covers_the_whole_call(self):
+        async def slow(request):
+            await asyncio.sleep(1)
+            return httpx.Response(200, json={})
+
+        pool = UpstreamPool('test', 'http://django', PoolConfig(deadline=0.05),
+                            transport=httpx.MockTransport(slow))
+
+        async def run():
+            try:
+                await pool.get('/slow/')
+            finally:
+                await pool.aclose()
+
+        with self.assertRaises(DeadlineExceeded):
+            asyncio.run(run())
+        self.assertEqual(pool.stats()['deadlines_exceeded'], 1)
+
+    def test_http2_falls_back_without_h2(self):
+        pool = UpstreamPool('test', 'http://django', PoolConfig(http2=True))
+        asyncio.run(pool.start())
+        self.assertIsNotNone(pool.client)
+        asyncio.run(pool.aclose())
+
+
+class ProgressProxyTests(SimpleTestCase):
+    def setUp(self):
+        self.seen = []
+
+        async def handler(request):
+            self.seen.append(request.url.path)
+            if request.url.path.startswith('/api/assessments/get-progress/'):
+                await asyncio.sleep(1)
+            return httpx.Response(200, json={'status': 'progress saved'})
+
+        self.addCleanup(setattr, django_pool, 'transport', django_pool.transport)
+        django_pool.transport = httpx.MockTransport(handler)
+
+    def test_lifespan_owns_the_pool(self):
+        with TestClient(app) as client:
+            client_before = django_pool.client
+            for _ in range(3):
+                response = client.post('/progress/save/', json={
+                    'user_id': 1, 'assessment_id': 1, 'current_answers': []
+                })
+                self.assertEqual(response.status_code, 200, response.text)
+            self.assertIs(django_pool.client, client_before)
+            stats = client.get('/pool/stats/').json()['django']
+            self.assertTrue(stats['started'])
+        self.assertIsNone(django_pool.client)
+        self.assertEqual(self.seen, ['/api/assessments/save-progress/'] * 3)
+
+    def test_request_deadline_header(self):
+        with TestClient(app) as client:
+            response = client.get('/progress/1/', headers={'X-Deadline-Ms': '50'})
+        self.assertEqual(response.status_code, 504)
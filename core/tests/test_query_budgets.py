@@ -0,0 +1,140 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from assessments.models import Assessment, GiftProfile, Question
+from books.models import (
+    Book, BookAccess, Career, CareerBookmark, CareerCategory, CareerChoice,
+    CareerResearchNote, ReadingHistory, UserBookProgress
+)
+from core.query_inspector import QueryRecorder, duplicate_shapes, format_duplicates
+from counselors.models import Counselor, CounselorUserRelation
+
+User = get_user_model()
+
+GIFTS = ['PERCEPTION', 'SERVICE', 'TEACHING', 'EXHORTATION', 'GIVING', 'ADMINISTRATION', 'COMPASSION']
+
+# Endpoint name -> (who calls it, URL kwargs, budget). A budget of None means
+# the query count must not change between the two data sizes; a number is
+# the most queries allowed at either size.
+ENDPOINTS = {
+    'book-list': ('reader', {}, None),
+    'book-my-library': ('reader', {}, None),
+    'book-table-of-contents': ('reader', {'pk': 'book'}, None),
+    'book-careers': ('reader', {'pk': 'book'}, None),
+    'book-bookmarks': ('reader', {'pk': 'book'}, None),
+    'book-reading-history': ('reader', {'pk': 'book'}, None),
+    'book-career-choices': ('reader', {'pk': 'book'}, None),
+    'career-choice-list': ('reader', {}, None),
+    'assessment-latest-results': ('reader', {}, None),
+    'assessment-assessment-count': ('reader', {}, 0),  # Reads the user's counter
+    'question-list-all': ('reader', {}, None),
+    'counselor-dashboard': ('counselor', {}, None),
+    'counselor-my-users': ('counselor', {}, None),
+    'counselor-user-assessments': ('counselor', {'pk': 'counseled_user'}, None),
+}
+
+
+class EndpointQueryBudgetTests(TestCase):
+    """
+    Seeds every listed endpoint's data at two sizes and checks its query
+    count stays constant (or within its budget), so N+1s fail here instead
+    of in production. Failures list the repeated query shapes and where
+    they were run from.
+    """
+    SMALL = 2
+    LARGE = 6
+
+    def setUp(self):
+        self.reader = User.objects.create_user(username='reader', email='reader@example.com')
+        counselor_user = User.objects.create_user(username='counselor', email='counselor@example.com')
+        self.counselor = Counselor.objects.create(
+            user=counselor_user, professional_title='Counselor', institution='Test',
+            qualification='Test', phone_number='000'
+        )
+        self.clients = {'reader': APIClient(), 'counselor': APIClient()}
+        self.clients['reader'].force_authenticate(user=self.reader)
+        self.clients['counselor'].force_authenticate(user=counselor_user)
+
+        self.book = Book.objects.create(slug='main', title='Main', associated_gift='TEACHING',
+                                        copyright_info='Test', version='1.0')
+        BookAccess.objects.create(user=self.reader, book=self.book, access_reason='PRIMARY')
+        self.counseled_user = None
+        self.seeded = 0
+
+    def seed(self, count):
+        """Add count more of everything the endpoints list"""
+        for _ in range(count):
+            n = self.seeded = self.seeded + 1
+            gift = GIFTS[n % len(GIFTS)]
+
+            book = Book.objects.create(slug=f'book-{n}', title=f'Book {n}', associated_gift=gift,
+                                       copyright_info='Test', version='1.0')
+            BookAccess.objects.create(user=self.reader, book=book, access_reason='PURCHASED')
+            for target in (book, self.book):
+                category = CareerCategory.objects.create(book=target, title=f'Category {n}',
+                                                         description='', order=n)
+                career = Career.objects.create(category=category, title=f'Career {n}', possibility_rating='HP')
+                specialization = Career.objects.create(category=category, title=f'Specialist {n}',
+                                                       possibility_rating='P', parent=career)
+                CareerBookmark.objects.create(user=self.reader, career=career)
+                ReadingHistory.objects.create(user=self.reader, category=category)
+            UserBookProgress.objects.create(user=self.reader, book=book, current_category=category)
+            choice = CareerChoice.objects.create(user=self.reader, book=book,
+                                                 career_choice_1=career, career_choice_2=specialization)
+            CareerResearchNote.objects.create(career_choice=choice, note_type='RESEARCH', content='Note')
+            Question.objects.create(category='Test', text=f'Question {n}', gift_correlation={gift: 1.0})
+
+            for user in (self.reader, self.add_counseled_user(n)):
+                assessment = Assessment.objects.create(user=user, completion_status=True, results_data={})
+                GiftProfile.objects.create(user=user, assessment=assessment, primary_gift=gift,
+                                           secondary_gifts=[], scores={gift: 1.0})
+            Assessment.objects.create(user=self.counseled_user)
+
+    def add_counseled_user(self, n):
+        user = User.objects.create_user(username=f'counseled-{n}', email=f'counseled-{n}@example.com')
+        CounselorUserRelation.objects.create(counselor=self.counselor, user=user)
+        if self.counseled_user is None:
+            self.counseled_user = user
+        return user
+
+    def measure(self):
+        captured = {}
+        for name, (caller, kwargs, _) in ENDPOINTS.items():
+            kwargs = {key: getattr(self, value).pk for key, value in kwargs.items()}
+            cache.clear()  # Measure the uncached path
+            recorder = QueryRecorder()
+            with connection.execute_wrapper(recorder):
+                response = self.clients[caller].get(reverse(name, kwargs=kwargs))
+            self.assertEqual(response.status_code, 200, f"{name}: {response.content[:200]}")
+            captured[name] = recorder.queries
+        return captured
+
+    def test_query_counts_do_not_grow_with_data(self):
+        self.seed(self.SMALL)
+        small = self.measure()
+        self.seed(self.LARGE - self.SMALL)
+        large = self.measure()
+
+        for name, (_, _, budget) in ENDPOINTS.items():
+            with self.subTest(endpoint=name):
+                counts = (len(small[name]), len(large[name]))
+                repeated = format_duplicates(duplicate_shapes(large[name], threshold=self.LARGE))
+                if budget is None:
+                    self.assertEqual(counts[0], counts[1],
+                                     f"{name} ran {counts[0]} then {counts[1]} queries\n{repeated}")
+                else:
+                    self.assertLessEqual(max(counts), budget,
+                                         f"{name} ran {counts} queries, budget {budget}\n{repeated}")
+
+    def test_my_users_annotations_match_the_unannotated_serializer(self):
+        from users.serializers import UserSerializer
+
+        self.seed(self.SMALL)
+        listed = self.clients['counselor'].get(reverse('counselor-my-users')).data
+        self.assertEqual(len(listed), self.SMALL)
+        for relation in listed:
+            user = User.objects.get(pk=relation['user']['id'])
+            self.assertEqual(relation['user'], UserSerializer(user).data)
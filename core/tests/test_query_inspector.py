@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from core.query_inspector import QueryInspectorMiddleware, duplicate_shapes, query_shape
+
+User = get_user_model()
+
+
+class QueryShapeTests(SimpleTestCase):
+    def test_literals_and_parameter_lists_collapse(self):
+        self.assertEqual(
+            query_shape('SELECT "a"."id" FROM "a" WHERE "a"."id" = 12 AND "a"."name" = \'x\''),
+            query_shape('SELECT "a"."id" FROM "a" WHERE "a"."id" = 7 AND "a"."name" = \'it\'\'s\''),
+        )
+        self.assertEqual(
+            query_shape('SELECT 1 FROM "a" WHERE "a"."id" IN (%s, %s, %s)'),
+            query_shape('SELECT 1 FROM "a" WHERE "a"."id" IN (%s)'),
+        )
+
+    def test_duplicates_need_the_threshold(self):
+        queries = [{'sql': f'SELECT 1 FROM "a" WHERE "a"."id" = {i}'} for i in range(3)]
+        queries.append({'sql': 'SELECT 1 FROM "b"'})
+        self.assertEqual(duplicate_shapes(queries, threshold=4), [])
+        duplicates = duplicate_shapes(queries, threshold=3)
+        self.assertEqual(len(duplicates), 1)
+        self.assertEqual(duplicates[0]['count'], 3)
+
+
+class QueryInspectorMiddlewareTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com') for i in range(4)]
+
+    def n_plus_one(self, request):
+        for user in self.users:
+            User.objects.filter(pk=user.pk).first()
+        return HttpResponse('ok')
+
+    @override_settings(DEBUG=True, QUERY_INSPECTOR={'THRESHOLD': 3})
+    def test_repeated_queries_are_flagged_with_their_location(self):
+        middleware = QueryInspectorMiddleware(self.n_plus_one)
+        with self.assertLogs('core.query_inspector', level='WARNING') as logs:
+            response = middleware(RequestFactory().get('/api/users/'))
+
+        self.assertEqual(response['X-Query-Count'], '4')
+        self.assertEqual(response['X-Duplicate-Queries'], '4')
+        self.assertIn('4x SELECT', logs.output[0])
+        self.assertIn('test_query_inspector.py', logs.output[0])
+        self.assertIn('in n_plus_one', logs.output[0])
+
+    @override_settings(DEBUG=True)
+    def test_distinct_queries_pass_quietly(self):
+        middleware = QueryInspectorMiddleware(lambda request: HttpResponse(str(User.objects.count())))
+        response = middleware(RequestFactory().get('/'))
+        self.assertEqual(response['X-Query-Count'], '1')
+        self.assertNotIn('X-Duplicate-Queries', response)
+
+    @override_settings(DEBUG=False)
+    def test_not_loaded_without_debug(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryInspectorMiddleware(self.n_plus_one)
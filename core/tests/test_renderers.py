@@ -0,0 +1,62 @@
+import datetime
+import decimal
+import io
+import json
+import uuid
+import numpy as np
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from core.renderers import ORJSONParser, ORJSONRenderer
+from fastapi_app.responses import ORJSONResponse
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_matches_drf_output(self):
+        data = {
+            'created_at': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'date': datetime.date(2024, 5, 1),
+            'price': decimal.Decimal('9.99'),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'scores': {'TEACHING': 0.1 + 0.2, 'SERVICE': 12.5},
+            'text': 'café   line',
+            'nested': [None, True, 3, ['x']],
+            7: 'int key',
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_exponent_floats_are_equivalent(self):
+        # orjson writes 1e-7 where the stdlib writes 1e-07; same number
+        rendered = ORJSONRenderer().render({'score': 1e-7})
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render({'score': 1e-7})))
+
+    def test_numpy_values(self):
+        rendered = ORJSONRenderer().render({'scores': np.array([0.5, 1.25])})
+        self.assertEqual(rendered, b'{"scores":[0.5,1.25]}')
+
+    def test_indent_and_oversized_ints_fall_back(self):
+        renderer = ORJSONRenderer()
+        self.assertEqual(
+            renderer.render({'a': 1}, 'application/json; indent=2'),
+            JSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        )
+        self.assertEqual(renderer.render({'big': 2 ** 70}), JSONRenderer().render({'big': 2 ** 70}))
+        self.assertEqual(renderer.render(None), b'')
+
+
+class ORJSONParserTests(SimpleTestCase):
+    def test_parses_like_drf(self):
+        body = '{"answers": [{"question_id": 1, "answer": 5}], "note": "café"}'.encode()
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body))
+        )
+
+    def test_invalid_json(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"answers": '))
+
+    def test_fastapi_response(self):
+        response = ORJSONResponse({'version': 'abc', 'count': np.int64(3)})
+        self.assertEqual(response.body, b'{"version":"abc","count":3}')
@@ -1,9 +1,43 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
 from django.views.decorators.csrf import ensure_csrf_cookie
+from .circuit_breaker import CircuitBreaker, all_breakers
+from .calculation_backends import backend_stats
 
 def health_check(request):
     return JsonResponse({"status": "healthy"})
 
+def metrics_allowed(request):
+    """Staff users, or a scraper sending the METRICS_TOKEN bearer token"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return True
+    return request.user.is_authenticated and request.user.is_staff
+
+def metrics(request):
+    """Calculation breaker state and backend latency in Prometheus text format"""
+    if not metrics_allowed(request):
+        return JsonResponse({"error": "Forbidden"}, status=403)
+    prefix = 'pathfinders_calculation'
+    lines = [f'# TYPE {prefix}_breaker_state gauge']
+    breakers = sorted(all_breakers().items())
+    for name, breaker in breakers:
+        state = breaker.snapshot()
+        lines.append(f'{prefix}_breaker_state{{backend="{name}",state="{state["state"]}"}} '
+                     f'{CircuitBreaker.STATE_VALUES[state["state"]]}')
+    lines.append(f'# TYPE {prefix}_breaker_rejected_total counter')
+    for name, breaker in breakers:
+        lines.append(f'{prefix}_breaker_rejected_total{{backend="{name}"}} {breaker.snapshot()["rejected"]}')
+    lines.append(f'# TYPE {prefix}_backend_seconds summary')
+    for name, stats in sorted(backend_stats.snapshot().items()):
+        lines.append(f'{prefix}_backend_seconds_count{{backend="{name}"}} {stats["calls"]}')
+        lines.append(f'{prefix}_backend_seconds_sum{{backend="{name}"}} {stats["total_seconds"]:.9f}')
+    lines.append(f'# TYPE {prefix}_backend_failures_total counter')
+    for name, stats in sorted(backend_stats.snapshot().items()):
+        lines.append(f'{prefix}_backend_failures_total{{backend="{name}"}} {stats["failures"]}')
+    return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4')
+
 @ensure_csrf_cookie
 def serve_frontend(request, path=""):
     if request.path.startswith('/api/'):
@@ -3,7 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model, authenticate
 from django.db import transaction
-from django.db.models import Prefetch, Count
+from django.db.models import BooleanField, Count, ExpressionWrapper, OuterRef, Prefetch, Q, Subquery
 from rest_framework.authtoken.models import Token
 from .models import Counselor, CounselorUserRelation
 from .serializers import (
@@ -15,7 +15,7 @@ from .serializers import (
     CounselorRegistrationSerializer,
     CounselorLoginSerializer
 )
-from assessments.models import Assessment, GiftProfile
+from assessments.models import Assessment, GiftProfile, assessment_limit
 # Remove importing serializers from assessments to break circular dependency
 # from assessments.serializers import AssessmentSerializer, GiftProfileSerializer
 import string
@@ -164,9 +164,31 @@ class CounselorViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
+        # Each user's assessment count and newest assessment, without
+        # loading any assessment rows (or their results_data)
+        latest = Assessment.objects.filter(user=OuterRef('pk')).order_by('-timestamp')
+        users = User.objects.select_related('profile').annotate(
+            assessment_total=Count('assessment'),
+            latest_assessment_id=Subquery(latest.values('id')[:1]),
+            latest_assessment_timestamp=Subquery(latest.values('timestamp')[:1]),
+            latest_assessment_complete=Subquery(latest.annotate(
+                complete=ExpressionWrapper(
+                    Q(completion_status=True, results_data__isnull=False),
+                    output_field=BooleanField()
+                )
+            ).values('complete')[:1])
+        )
+
         relations = CounselorUserRelation.objects.filter(
             counselor=request.user.counselor_profile
-        ).select_related('user')
+        ).prefetch_related(
+            Prefetch('user', queryset=users),
+            Prefetch(
+                'user__giftprofile_set',
+                queryset=GiftProfile.objects.order_by('-timestamp'),
+                to_attr='latest_gift_profiles'
+            )
+        )
 
         serializer = CounselorUserRelationSerializer(relations, many=True)
         return Response(serializer.data)
@@ -176,7 +198,7 @@ class CounselorViewSet(viewsets.ModelViewSet):
         """Get assessments for a specific user with limit information"""
         try:
             # Check if relationship exists
-            relation = CounselorUserRelation.objects.get(
+            relation = CounselorUserRelation.objects.select_related('user').get(
                 counselor=request.user.counselor_profile,
                 user_id=pk
             )
@@ -186,11 +208,11 @@ class CounselorViewSet(viewsets.ModelViewSet):
             # Get assessments
             assessments = Assessment.objects.filter(user=user).order_by('-created_at')
             
-            # Count completed assessments
-            completed_count = assessments.filter(completion_status=True).count()
+            # Completed assessments come from the user's maintained counter
+            completed_count = user.completed_assessments
             
             # Get the maximum assessment limit
-            max_limit = 3  # Hardcoded for now, could be made configurable
+            max_limit = assessment_limit()
             
             # Format assessment data
             assessment_data = []
@@ -250,13 +272,11 @@ class CounselorViewSet(viewsets.ModelViewSet):
             )
         )
 
+        max_limit = assessment_limit()
         data = []
         for relation in relations:
-            # Count completed assessments
-            completed_count = Assessment.objects.filter(
-                user=relation.user, 
-                completion_status=True
-            ).count()
+            # Completed assessments come from the user's maintained counter
+            completed_count = relation.user.completed_assessments
             
             user_data = {
                 'user_id': relation.user.id,
@@ -268,8 +288,8 @@ class CounselorViewSet(viewsets.ModelViewSet):
                 'assessments': [],
                 'gift_profile': None,
                 'assessment_count': completed_count,
-                'max_limit': 3,
-                'can_take_more': completed_count < 3
+                'max_limit': max_limit,
+                'can_take_more': completed_count < max_limit
             }
 
             # Add latest assessment data
@@ -0,0 +1,207 @@
+#fastapi_app/coalescer.py
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncio
+import bisect
+import logging
+import os
+import threading
+import time
+from .executor import ExecutorSaturated, score_answer_sets
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.total = 0.0
+        self.observations = 0
+
+    def observe(self, value: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.total += value
+            self.observations += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            cumulative, running = [], 0
+            for count in self.counts:
+                running += count
+                cumulative.append(running)
+            return {
+                'buckets': dict(zip([*map(str, self.buckets), '+Inf'], cumulative)),
+                'sum': self.total,
+                'count': self.observations,
+            }
+
+    def prometheus(self, name: str) -> List[str]:
+        snapshot = self.snapshot()
+        lines = [f'# TYPE {name} histogram']
+        for bound, count in snapshot['buckets'].items():
+            lines.append(f'{name}_bucket{{le="{bound}"}} {count}')
+        lines.append(f'{name}_sum {snapshot["sum"]:.9f}')
+        lines.append(f'{name}_count {snapshot["count"]}')
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.total = 0.0
+            self.observations = 0
+
+
+class ScoringCoalescer:
+    """
+    Collects /calculate-gifts/ requests that arrive within window_seconds
+    of each other (or until max_batch are waiting) and scores them as one
+    calculate_scores_batch call, resolving each caller's future with its
+    own (scores, primary_gift, secondary_gifts, body). With an off-loop
+    executor the batch runs there as a single job.
+
+    Requests without a question bank carry their own correlations;
+    calculate_scores_batch only shares a matrix between answer sets whose
+    question ids and correlations both match, so one caller's correlations
+    never score another's answers.
+    """
+
+    BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+    WAIT_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+    def __init__(self, calculator, window_seconds: float = 0.002, max_batch: int = 64,
+                 executor=None):
+        self.calculator = calculator
+        self.executor = executor
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self.batch_size = Histogram(self.BATCH_BUCKETS)
+        self.queue_wait = Histogram(self.WAIT_BUCKETS)
+        self._pending: List[Tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only holds tasks weakly; in-flight off-loop batches live here
+        self._tasks = set()
+
+    @classmethod
+    def from_env(cls, calculator, executor=None) -> Optional['ScoringCoalescer']:
+        if os.getenv('GIFT_COALESCE', 'False') != 'True':
+            return None
+        return cls(
+            calculator,
+            executor=executor,
+            window_seconds=float(os.getenv('GIFT_COALESCE_WINDOW_MS', '2')) / 1000,
+            max_batch=int(os.getenv('GIFT_COALESCE_MAX_BATCH', '64')),
+        )
+
+    async def submit(self, answers: List[Dict], question_bank=None):
+        """Score one assessment as part of the next batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((answers, question_bank, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self.flush)
+        return await future
+
+    def flush(self):
+        """Score everything waiting; runs on the event loop"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        started = time.perf_counter()
+        self.batch_size.observe(len(pending))
+        for _, _, _, queued_at in pending:
+            self.queue_wait.observe(started - queued_at)
+
+        # One batch per question bank; almost always a single group
+        groups = {}
+        for item in pending:
+            groups.setdefault(id(item[1]), []).append(item)
+        for items in groups.values():
+            self._score_group(items)
+
+    def _score_group(self, items):
+        if self.executor is not None and self.executor.mode != 'inline':
+            # Off the loop: the batch is one executor job
+            task = asyncio.ensure_future(self._score_group_off_loop(items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(lambda task: self._fail_unresolved(task, items))
+            return
+        try:
+            results = score_answer_sets(
+                self.calculator, [answers for answers, _, _, _ in items], items[0][1]
+            )
+        except Exception:
+            # One bad submission mustn't fail its neighbours: score them apart
+            for answers, bank, future, _ in items:
+                try:
+                    result = score_answer_sets(self.calculator, [answers], bank)[0]
+                except Exception as e:
+                    _resolve(future, exception=e)
+                else:
+                    _resolve(future, result)
+            return
+        for (_, _, future, _), result in zip(items, results):
+            _resolve(future, result)
+
+    async def _score_group_off_loop(self, items):
+        question_bank = items[0][1]
+        try:
+            results = await self.executor.score([answers for answers, _, _, _ in items], question_bank)
+        except ExecutorSaturated as e:
+            for _, _, future, _ in items:
+                _resolve(future, exception=e)
+            return
+        except Exception:
+            for answers, bank, future, _ in items:
+                try:
+                    result = (await self.executor.score([answers], bank))[0]
+                except Exception as e:
+                    _resolve(future, exception=e)
+                else:
+                    _resolve(future, result)
+            return
+        for (_, _, future, _), result in zip(items, results):
+            _resolve(future, result)
+
+    @staticmethod
+    def _fail_unresolved(task, items):
+        """A batch task that died (or was cancelled) fails its callers rather than stranding them"""
+        if task.cancelled():
+            error = asyncio.CancelledError()
+        elif task.exception() is not None:
+            error = task.exception()
+            logger.error("Coalesced scoring batch failed", exc_info=error)
+        else:
+            return
+        for _, _, future, _ in items:
+            _resolve(future, exception=error)
+
+    def export_prometheus(self, prefix: str = 'pathfinders_gifts') -> str:
+        lines = self.batch_size.prometheus(f'{prefix}_coalesced_batch_size')
+        lines += self.queue_wait.prometheus(f'{prefix}_coalesced_queue_wait_seconds')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        self.batch_size.reset()
+        self.queue_wait.reset()
+
+
+def _resolve(future, result=None, exception=None):
+    if future.done():
+        return  # The caller went away
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
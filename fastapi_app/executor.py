@@ -0,0 +1,189 @@
+#fastapi_app/executor.py
+
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+MODES = ('inline', 'thread', 'process')
+
+
+class ExecutorSaturated(Exception):
+    """Every worker is busy and the queue is full; the caller should retry later"""
+
+
+class UnknownBank(Exception):
+    """A process worker hasn't seen this question bank version yet"""
+
+
+def score_answer_sets(calculator, answer_sets: List[List[Dict]], question_bank=None) -> List[Tuple]:
+    """
+    Score assessments and serialize each result. Returns (scores,
+    primary_gift, secondary_gifts, body) per assessment. A single
+    assessment takes the same path as before; several are one batch.
+    """
+    if len(answer_sets) == 1:
+        scores = calculator.calculate_scores(answer_sets[0], question_bank=question_bank)
+        selections = [calculator.identify_gifts(scores, threshold_factor=0.80)]
+        all_scores = [scores]
+    else:
+        all_scores = calculator.calculate_scores_batch(answer_sets, question_bank=question_bank)
+        selections = calculator.identify_gifts_batch(all_scores, threshold_factor=0.80)
+    # Descriptions are pre-serialized per gift combination; roles are left
+    # empty here for consistency with the Django results
+    return [
+        (scores, primary_gift, secondary_gifts,
+         calculator.catalog.result_json(scores, primary_gift, secondary_gifts, with_roles=False))
+        for scores, (primary_gift, secondary_gifts) in zip(all_scores, selections)
+    ]
+
+
+# Process workers: a calculator and the banks they've been sent, loaded once
+_worker_calculator = None
+_worker_banks: "OrderedDict[str, object]" = OrderedDict()
+MAX_WORKER_BANKS = 4
+
+
+def _register_worker_bank(bank):
+    _worker_banks[bank.version] = bank
+    _worker_banks.move_to_end(bank.version)
+    while len(_worker_banks) > MAX_WORKER_BANKS:
+        _worker_banks.popitem(last=False)
+
+
+def init_worker(bank_payload: Optional[Dict] = None):
+    """Process pool initializer: build the calculator and preload a bank"""
+    global _worker_calculator
+    from assessments.gift_calculator import GiftCalculator
+    from assessments.question_bank import CompiledQuestionBank
+
+    _worker_calculator = GiftCalculator()
+    if bank_payload is not None:
+        _register_worker_bank(CompiledQuestionBank.from_payload(bank_payload))
+
+
+def worker_score(answer_sets, bank_version: Optional[str], bank_payload: Optional[Dict] = None):
+    from assessments.question_bank import CompiledQuestionBank
+
+    if _worker_calculator is None:
+        init_worker()
+    question_bank = None
+    if bank_version is not None:
+        question_bank = _worker_banks.get(bank_version)
+        if question_bank is None:
+            if bank_payload is None:
+                raise UnknownBank(bank_version)
+            question_bank = CompiledQuestionBank.from_payload(bank_payload)
+            _register_worker_bank(question_bank)
+    return score_answer_sets(_worker_calculator, answer_sets, question_bank)
+
+
+class ScoringExecutor:
+    """
+    Where CPU-bound scoring runs, so it can't stall the event loop:
+
+    inline  - on the loop, as before (no queue limit)
+    thread  - a thread pool; numpy releases the GIL for the matrix work
+    process - a process pool whose workers preload the calculator and bank
+
+    thread and process modes admit at most workers + max_queue jobs at a
+    time; beyond that ExecutorSaturated is raised, which the endpoints
+    turn into 503 with Retry-After.
+    """
+
+    def __init__(self, calculator, mode: str = 'inline', workers: Optional[int] = None,
+                 max_queue: int = 64, retry_after: int = 1):
+        if mode not in MODES:
+            raise ValueError(f"Unknown executor mode: {mode}")
+        self.calculator = calculator
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.pool = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls, calculator) -> 'ScoringExecutor':
+        workers = os.getenv('GIFT_EXECUTOR_WORKERS')
+        return cls(
+            calculator,
+            mode=os.getenv('GIFT_EXECUTOR', 'inline'),
+            workers=int(workers) if workers else None,
+            max_queue=int(os.getenv('GIFT_EXECUTOR_QUEUE', '64')),
+            retry_after=int(os.getenv('GIFT_EXECUTOR_RETRY_AFTER', '1')),
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def start(self, bank=None):
+        if self.pool is not None or self.mode == 'inline':
+            return
+        if self.mode == 'thread':
+            self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scoring')
+        else:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(bank.to_payload() if bank is not None else None,)
+            )
+        logger.info(f"Scoring executor started: {self.mode} x{self.workers}, queue {self.max_queue}")
+
+    def shutdown(self):
+        pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    async def score(self, answer_sets: List[List[Dict]], question_bank=None) -> List[Tuple]:
+        if self.mode == 'inline':
+            return score_answer_sets(self.calculator, answer_sets, question_bank)
+
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                raise ExecutorSaturated(f"{self.in_flight} scoring jobs already queued")
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.pool is None:
+                self.start(question_bank)
+            loop = asyncio.get_running_loop()
+            if self.mode == 'thread':
+                return await loop.run_in_executor(
+                    self.pool, score_answer_sets, self.calculator, answer_sets, question_bank
+                )
+            version = question_bank.version if question_bank is not None else None
+            try:
+                return await loop.run_in_executor(self.pool, worker_score, answer_sets, version)
+            except UnknownBank:
+                # First use of this bank in that worker: send it along once
+                return await loop.run_in_executor(
+                    self.pool, worker_score, answer_sets, version, question_bank.to_payload()
+                )
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'workers': self.workers if self.mode != 'inline' else 0,
+                'max_queue': self.max_queue,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected,
+            }
@@ -1,12 +1,12 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
 from typing import List, Dict
 from assessments.gift_calculator import GiftCalculator
-from users.ministry_roles import MINISTRY_ROLE_MAPPINGS
+from .responses import ORJSONResponse
 
 
 # Create FastAPI app instance
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 calculator = GiftCalculator()
 
@@ -18,12 +18,37 @@ class Answer(BaseModel):
 class AssessmentRequest(BaseModel):
     answers: List[Answer]
 
+class BatchAssessmentRequest(BaseModel):
+    assessments: List[AssessmentRequest]
+
 class GiftResult(BaseModel):
     scores: Dict[str, float]
     primary_gift: str
     secondary_gifts: List[str]
     descriptions: Dict
 
+class BatchGiftResult(BaseModel):
+    results: List[GiftResult]
+
+def format_answers(answers) -> List[Dict]:
+    """Convert answers to the format expected by calculator"""
+    return [
+        {
+            'question_id': a.question_id,
+            'answer': a.answer,
+            'gift_correlation': {
+                k.upper(): float(v)  # Ensure uppercase keys and float values
+                for k, v in a.gift_correlation.items()
+            }
+        }
+        for a in answers
+    ]
+
+def build_result(scores: Dict[str, float], primary_gift: str, secondary_gifts: List[str]) -> bytes:
+    """Serialized result with descriptions and role recommendations attached"""
+    # Descriptions and roles are pre-serialized per gift combination
+    return calculator.catalog.result_json(scores, primary_gift, secondary_gifts)
+
 @app.post("/calculate-gifts/", response_model=GiftResult)
 async def calculate_gifts(assessment: AssessmentRequest):
     try:
@@ -35,17 +60,7 @@ async def calculate_gifts(assessment: AssessmentRequest):
             )
 
         # Convert answers to the format expected by calculator
-        formatted_answers = [
-            {
-                'question_id': a.question_id,
-                'answer': a.answer,
-                'gift_correlation': {
-                    k.upper(): float(v)  # Ensure uppercase keys and float values
-                    for k, v in a.gift_correlation.items()
-                }
-            }
-            for a in assessment.answers
-        ]
+        formatted_answers = format_answers(assessment.answers)
 
         # Calculate results
         scores = calculator.calculate_scores(formatted_answers)
@@ -57,62 +72,48 @@ async def calculate_gifts(assessment: AssessmentRequest):
             threshold_factor=threshold_factor
         )
         
-        descriptions = calculator.get_gift_descriptions(primary_gift, secondary_gifts)
+        return Response(
+            content=build_result(scores, primary_gift, secondary_gifts),
+            media_type="application/json"
+        )
 
-        # Get role recommendations from ministry roles mapping
-        roles = {
-            'primary_roles': [],
-            'secondary_roles': [],
-            'ministry_areas': set()  # Using set to avoid duplicates
-        }
-        
-        # Add roles from primary gift
-        if primary_gift in MINISTRY_ROLE_MAPPINGS:
-            mapping = MINISTRY_ROLE_MAPPINGS[primary_gift]
-            roles['primary_roles'].extend(mapping['primary'])
-            roles['ministry_areas'].update(mapping['secondary'])
-        
-        # Add roles from secondary gifts
-        for gift in secondary_gifts:
-            if gift in MINISTRY_ROLE_MAPPINGS:
-                mapping = MINISTRY_ROLE_MAPPINGS[gift]
-                # Add top 2 primary roles from each secondary gift
-                roles['secondary_roles'].extend(mapping['primary'][:2])
-                roles['ministry_areas'].update(mapping['secondary'])
-
-        # Convert set to list for JSON serialization
-        roles['ministry_areas'] = sorted(list(roles['ministry_areas']))
-        
-        # Remove duplicates while preserving order
-        roles['primary_roles'] = list(dict.fromkeys(roles['primary_roles']))
-        roles['secondary_roles'] = list(dict.fromkeys(roles['secondary_roles']))
-
-        return {
-            'scores': scores,
-            'primary_gift': primary_gift,
-            'secondary_gifts': secondary_gifts,
-            'descriptions': {
-                'primary': {
-                    'gift': descriptions['primary']['gift'],
-                    'description': descriptions['primary']['description'],
-                    'details': descriptions['primary']['details']
-                },
-                'secondary': [
-                    {
-                        'gift': g['gift'],
-                        'description': g['description'],
-                        'details': g['details']
-                    }
-                    for g in descriptions['secondary']
-                ]
-            },
-            'recommended_roles': roles
-        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
 
+@app.post("/calculate-gifts/batch/", response_model=BatchGiftResult)
+async def calculate_gifts_batch(batch: BatchAssessmentRequest):
+    try:
+        if any(not assessment.answers for assessment in batch.assessments):
+            raise HTTPException(
+                status_code=400,
+                detail="No answers provided"
+            )
+
+        answer_sets = [format_answers(a.answers) for a in batch.assessments]
+        all_scores = calculator.calculate_scores_batch(answer_sets)
+
+        # Use consistent threshold factor with the single-assessment endpoint
+        selections = calculator.identify_gifts_batch(all_scores, threshold_factor=0.95)
+
+        body = b','.join(
+            build_result(scores, primary_gift, secondary_gifts)
+            for scores, (primary_gift, secondary_gifts) in zip(all_scores, selections)
+        )
+        return Response(content=b'{"results":[' + body + b']}', media_type="application/json")
+
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
-        ) 
\ No newline at end of file
+        )
@@ -0,0 +1,194 @@
+#fastapi_app/http_pool.py
+
+from typing import Dict, Optional
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+import weakref
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(Exception):
+    """The whole upstream call (queueing for a connection included) ran out of time"""
+
+
+class PoolConfig:
+    """Connection pool settings for one upstream, read from the environment"""
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0, connect_timeout: float = 5.0,
+                 deadline: float = 30.0, http2: bool = False):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self.deadline = deadline
+        self.http2 = http2
+
+    @classmethod
+    def from_env(cls, prefix: str = 'DJANGO_POOL') -> 'PoolConfig':
+        return cls(
+            max_connections=int(os.getenv(f'{prefix}_MAX_CONNECTIONS', '100')),
+            max_keepalive_connections=int(os.getenv(f'{prefix}_MAX_KEEPALIVE', '20')),
+            keepalive_expiry=float(os.getenv(f'{prefix}_KEEPALIVE_EXPIRY', '30')),
+            connect_timeout=float(os.getenv(f'{prefix}_CONNECT_TIMEOUT', '5')),
+            deadline=float(os.getenv(f'{prefix}_DEADLINE', '30')),
+            http2=os.getenv(f'{prefix}_HTTP2', 'False') == 'True',
+        )
+
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  (installed with httpx[http2])
+    except ImportError:
+        return False
+    return True
+
+
+class UpstreamPool:
+    """
+    One long-lived httpx.AsyncClient per upstream service, so requests reuse
+    keep-alive connections instead of opening a TCP connection each call.
+
+    start()/aclose() are driven by the app lifespan; a pool used before
+    start() (e.g. a TestClient outside a `with` block) starts itself.
+    Every request runs under a total deadline, and request counts,
+    concurrency and latency are kept for /pool/stats/.
+    """
+
+    def __init__(self, name: str, base_url: str, config: Optional[PoolConfig] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.name = name
+        self.base_url = base_url
+        self.config = config or PoolConfig()
+        self.transport = transport
+        self.client: Optional[httpx.AsyncClient] = None
+        self._loop = None
+        # Connections that have served a response, from httpx's public
+        # network_stream extension; they drop out when the pool discards them
+        self._streams = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.deadlines_exceeded = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_seconds = 0.0
+
+    async def start(self):
+        if self.client is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._streams = weakref.WeakSet()
+        config = self.config
+        http2 = config.http2
+        if http2 and not http2_available():
+            logger.warning(f"HTTP/2 requested for {self.name} but h2 is not installed; using HTTP/1.1")
+            http2 = False
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=http2,
+            transport=self.transport,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            # Per-operation timeouts never exceed the overall deadline
+            timeout=httpx.Timeout(config.deadline, connect=min(config.connect_timeout, config.deadline)),
+            event_hooks={'response': [self._track_connection]},
+        )
+
+    async def _track_connection(self, response: httpx.Response):
+        stream = response.extensions.get('network_stream')
+        if stream is not None:
+            self._streams.add(stream)
+
+    async def aclose(self):
+        # Swapped out before any await, so only one caller closes a client
+        client, loop, self.client = self.client, self._loop, None
+        if client is None:
+            return
+        if loop is asyncio.get_running_loop():
+            await client.aclose()
+        else:
+            await self._close_stale(client, loop, list(self._streams))
+
+    async def _close_stale(self, client: httpx.AsyncClient, loop, streams):
+        """Close a client opened on another event loop, on that loop if it still runs"""
+        if loop is not None and loop.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+            return
+        # A closed loop can't close its transports: shut the sockets down so
+        # the upstream releases them, and leave the descriptors to the GC
+        for stream in streams:
+            sock = stream.get_extra_info('socket')
+            try:
+                if sock is not None:
+                    sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # Already closed
+        try:
+            await client.aclose()
+        except Exception:
+            logger.debug(f"Stale {self.name} client closed with errors", exc_info=True)
+
+    async def request(self, method: str, url: str, deadline: Optional[float] = None,
+                      **kwargs) -> httpx.Response:
+        """Send a request; DeadlineExceeded if it doesn't finish within deadline seconds"""
+        if self.client is not None and self._loop is not asyncio.get_running_loop():
+            # Connections belong to the loop that opened them
+            await self.aclose()
+        if self.client is None:
+            await self.start()
+        deadline = self.config.deadline if deadline is None else deadline
+
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(self.client.request(method, url, **kwargs), deadline)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.deadlines_exceeded += 1
+            raise DeadlineExceeded(f"{self.name} {method} {url} exceeded {deadline}s")
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.total_seconds += time.perf_counter() - start
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, **kwargs)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = {
+                'started': self.client is not None,
+                'base_url': self.base_url,
+                'http2': bool(self.config.http2 and http2_available()),
+                'max_connections': self.config.max_connections,
+                'max_keepalive_connections': self.config.max_keepalive_connections,
+                'requests': self.requests,
+                'errors': self.errors,
+                'deadlines_exceeded': self.deadlines_exceeded,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'mean_seconds': self.total_seconds / self.requests if self.requests else 0.0,
+            }
+            # Open connections that have served a response
+            stats['connections'] = len(self._streams)
+        return stats
@@ -1,15 +1,27 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Response, Header
 from fastapi.middleware.cors import CORSMiddleware
 from .models import (
     AssessmentRequest, 
+    AssessmentRequestV2,
+    BatchAssessmentRequest,
     GiftResult, 
+    BatchGiftResult,
+    QuestionBankPayload,
     ProgressData, 
     GiftDescription,
     GiftDescriptions
 )
 from assessments.gift_calculator import GiftCalculator
-import httpx
-from typing import List
+from assessments.question_bank import CompiledQuestionBank, load_artifact
+from assessments.result_cache import ResultCache, result_key
+from assessments.wire_format import decode_answers
+from .http_pool import DeadlineExceeded, PoolConfig, UpstreamPool
+from .coalescer import ScoringCoalescer
+from .executor import ExecutorSaturated, ScoringExecutor
+from .responses import ORJSONResponse
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import List, Optional
 import os
 import logging
 
@@ -17,7 +29,29 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Pathfinders Gift Assessment API")
+# Update the httpx client calls to use environment variables
+DJANGO_API_URL = os.getenv('DJANGO_API_URL', 'http://localhost:8000')
+
+# Shared keep-alive pool for the progress proxies; opened and closed by the lifespan
+django_pool = UpstreamPool('django', DJANGO_API_URL, PoolConfig.from_env('DJANGO_POOL'))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    load_compiled_question_bank()
+    await django_pool.start()
+    # Process workers preload the calculator and the newest bank
+    executor.start(next(reversed(question_banks.values()), None))
+    try:
+        yield
+    finally:
+        await django_pool.aclose()
+        executor.shutdown()
+
+app = FastAPI(
+    title="Pathfinders Gift Assessment API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # CORS configuration for development and production
 app.add_middleware(
@@ -35,80 +69,166 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Update the httpx client calls to use environment variables
-DJANGO_API_URL = os.getenv('DJANGO_API_URL', 'http://localhost:8000')
-
 calculator = GiftCalculator()
 
+# Where scoring runs: on the loop, or a thread/process pool (GIFT_EXECUTOR)
+executor = ScoringExecutor.from_env(calculator)
+
+# Optional micro-batching of concurrent calculations (GIFT_COALESCE=True)
+coalescer = ScoringCoalescer.from_env(calculator, executor)
+
+# Memoized results for bank-versioned requests; in-process only, Django
+# keeps the shared tier
+result_cache = ResultCache(max_entries=int(os.getenv('GIFT_RESULT_CACHE_ENTRIES', '4096')))
+
+# Compiled question banks pushed by Django, keyed by content version
+MAX_QUESTION_BANKS = 4
+question_banks: "OrderedDict[str, CompiledQuestionBank]" = OrderedDict()
+
+def resolve_question_bank(version: Optional[str]) -> Optional[CompiledQuestionBank]:
+    """Look up a pushed question bank; 409 tells the caller to publish it"""
+    if version is None:
+        return None
+    bank = question_banks.get(version)
+    if bank is None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Unknown question bank version: {version}"
+        )
+    return bank
+
+def register_question_bank(bank: CompiledQuestionBank):
+    """Add a bank to the registry, dropping the least recently added beyond the limit"""
+    question_banks[bank.version] = bank
+    question_banks.move_to_end(bank.version)
+    while len(question_banks) > MAX_QUESTION_BANKS:
+        question_banks.popitem(last=False)
+
+def load_compiled_question_bank():
+    """Serve the bank compiled by load_questions from the first request on"""
+    bank = load_artifact()
+    if bank is not None:
+        register_question_bank(bank)
+        logger.info(f"Loaded compiled question bank {bank.version} with {len(bank)} questions")
+
+def format_answers(answers, question_bank: Optional[CompiledQuestionBank] = None) -> List[dict]:
+    """Convert request answers to the format expected by calculator"""
+    if question_bank is not None:
+        # Correlations are resolved from the bank; anything the client sent is ignored
+        return [{'question_id': a.question_id, 'answer': a.answer} for a in answers]
+    if any(a.gift_correlation is None for a in answers):
+        raise HTTPException(
+            status_code=400,
+            detail="Answers without gift_correlation require a question_bank_version"
+        )
+    return [
+        {
+            'question_id': a.question_id,
+            'answer': a.answer,
+            'gift_correlation': {
+                k.upper(): v  # Ensure gift keys are uppercase
+                for k, v in a.gift_correlation.items()
+            }
+        }
+        for a in answers
+    ]
+
+def build_gift_result(scores, primary_gift, secondary_gifts) -> bytes:
+    """Serialized GiftResult for one scored assessment"""
+    # Descriptions are pre-serialized per gift combination; roles are left
+    # empty here for consistency with the Django results
+    return calculator.catalog.result_json(
+        scores, primary_gift, secondary_gifts, with_roles=False
+    )
+
+def saturated(error: ExecutorSaturated) -> HTTPException:
+    """503 telling the caller when to come back"""
+    logger.warning(f"Scoring executor saturated: {str(error)}")
+    return HTTPException(
+        status_code=503,
+        detail="Scoring is at capacity, retry shortly",
+        headers={'Retry-After': str(executor.retry_after)}
+    )
+
+async def score_submission(formatted_answers: List[dict],
+                           question_bank: Optional[CompiledQuestionBank]) -> Response:
+    """Score one formatted submission: memo, then coalescer or executor"""
+    # Identical submissions against a known bank are served from the memo
+    key = None
+    if question_bank is not None:
+        key = result_key(question_bank.version, formatted_answers)
+        cached = result_cache.get(key)
+        if cached is not None:
+            return Response(
+                content=build_gift_result(
+                    cached['scores'], cached['primary_gift'], cached['secondary_gifts']
+                ),
+                media_type="application/json"
+            )
+
+    # Calculate results; per-stage timings come from the calculator's
+    # instrumentation (GET /metrics/) rather than per-request logs
+    if coalescer is not None:
+        scores, primary_gift, secondary_gifts, body = await coalescer.submit(
+            formatted_answers, question_bank
+        )
+    else:
+        # Scoring and serialization run wherever the executor puts them
+        (scores, primary_gift, secondary_gifts, body), = await executor.score(
+            [formatted_answers], question_bank
+        )
+    if key is not None:
+        result_cache.set(key, {
+            'scores': scores,
+            'primary_gift': primary_gift,
+            'secondary_gifts': secondary_gifts
+        })
+    return Response(content=body, media_type="application/json")
+
 @app.post("/calculate-gifts/")
 async def calculate_gifts(assessment: AssessmentRequest):
     """
     Calculate motivational gifts based on assessment answers
     """
     try:
-        logger.info(f"Received assessment request with {len(assessment.answers)} answers")
+        logger.debug(f"Received assessment request with {len(assessment.answers)} answers")
         
         # Convert answers to the format expected by calculator
-        formatted_answers = [
-            {
-                'question_id': a.question_id,
-                'answer': a.answer,
-                'gift_correlation': {
-                    k.upper(): v  # Ensure gift keys are uppercase
-                    for k, v in a.gift_correlation.items()
-                }
-            }
-            for a in assessment.answers
-        ]
+        question_bank = resolve_question_bank(assessment.question_bank_version)
+        formatted_answers = format_answers(assessment.answers, question_bank)
 
-        # Calculate results
-        logger.info("Calculating gift scores")
-        scores = calculator.calculate_scores(formatted_answers)
-        
-        # Log scores with high precision for debugging
-        logger.info("Gift scores with high precision:")
-        for gift, score in sorted(scores.items(), key=lambda x: x[1], reverse=True):
-            logger.info(f"  {gift}: {score:.4f}")
-        
-        logger.info("Identifying primary and secondary gifts")
-        primary_gift, secondary_gifts = calculator.identify_gifts(
-            scores,
-            threshold_factor=0.80  # Match threshold
-        )
-        
-        logger.info(f"Primary gift: {primary_gift}, Secondary gifts: {secondary_gifts}")
-        descriptions = calculator.get_gift_descriptions(primary_gift, secondary_gifts)
-
-        # Get role recommendations from ministry roles mapping
-        roles = {
-            'primary_roles': [],
-            'secondary_roles': [],
-            'ministry_areas': []
-        }
+        return await score_submission(formatted_answers, question_bank)
 
-        logger.info("Returning assessment results")
-        return GiftResult(
-            scores=scores,
-            primary_gift=primary_gift,
-            secondary_gifts=secondary_gifts,
-            descriptions=GiftDescriptions(
-                primary=GiftDescription(
-                    gift=descriptions['primary']['gift'],
-                    description=descriptions['primary']['description'],
-                    details=descriptions['primary']['details']
-                ),
-                secondary=[
-                    GiftDescription(
-                        gift=g['gift'],
-                        description=g['description'],
-                        details=g['details']
-                    )
-                    for g in descriptions['secondary']
-                ]
-            ),
-            recommended_roles=roles  # Include empty roles structure for consistency
+    except HTTPException:
+        raise
+    except ExecutorSaturated as e:
+        raise saturated(e)
+    except Exception as e:
+        logger.error(f"Error calculating gifts: {str(e)}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Calculation failed: {str(e)}"
         )
 
+@app.post("/v2/calculate-gifts/")
+async def calculate_gifts_v2(assessment: AssessmentRequestV2):
+    """
+    Calculate gifts from the compact v2 format: one 1-5 value per question
+    of the referenced bank, positionally or packed, validated in one pass
+    """
+    try:
+        question_bank = resolve_question_bank(assessment.question_bank_version)
+        try:
+            formatted_answers = decode_answers(question_bank, assessment.answers, assessment.packed)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return await score_submission(formatted_answers, question_bank)
+
+    except HTTPException:
+        raise
+    except ExecutorSaturated as e:
+        raise saturated(e)
     except Exception as e:
         logger.error(f"Error calculating gifts: {str(e)}")
         raise HTTPException(
@@ -116,37 +236,134 @@ async def calculate_gifts(assessment: AssessmentRequest):
             detail=f"Calculation failed: {str(e)}"
         )
 
+@app.post("/calculate-gifts/batch/")
+async def calculate_gifts_batch(batch: BatchAssessmentRequest):
+    """
+    Calculate motivational gifts for many assessments in one call
+    """
+    try:
+        logger.debug(f"Received batch request with {len(batch.assessments)} assessments")
+
+        versions = {a.question_bank_version for a in batch.assessments}
+        if len(versions) > 1:
+            raise HTTPException(
+                status_code=400,
+                detail="All assessments in a batch must use the same question bank version"
+            )
+        question_bank = resolve_question_bank(versions.pop() if versions else None)
+
+        answer_sets = [format_answers(a.answers, question_bank) for a in batch.assessments]
+        results = await executor.score(answer_sets, question_bank) if answer_sets else []
+
+        body = b','.join(result[3] for result in results)
+        return Response(content=b'{"results":[' + body + b']}', media_type="application/json")
+
+    except HTTPException:
+        raise
+    except ExecutorSaturated as e:
+        raise saturated(e)
+    except Exception as e:
+        logger.error(f"Error calculating batch gifts: {str(e)}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch calculation failed: {str(e)}"
+        )
+
+@app.put("/question-bank/")
+async def publish_question_bank(payload: QuestionBankPayload):
+    """
+    Register a compiled question bank published by the Django service
+    """
+    try:
+        bank = CompiledQuestionBank.from_payload(payload.dict())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    register_question_bank(bank)
+    logger.info(f"Loaded question bank {bank.version} with {len(bank)} questions")
+    return {'version': bank.version, 'questions': len(bank)}
+
+@app.get("/question-bank/")
+async def list_question_banks():
+    return {'versions': list(question_banks)}
+
+@app.get("/question-bank/{version}/")
+async def question_bank_order(version: str):
+    """Question order v2 clients answer in"""
+    bank = resolve_question_bank(version)
+    return {'version': bank.version, 'question_ids': bank.question_ids.tolist()}
+
+def request_deadline(x_deadline_ms: Optional[int] = Header(None)) -> Optional[float]:
+    """Caller's remaining budget in seconds, capped by the pool's own deadline"""
+    if x_deadline_ms is None:
+        return None
+    return min(max(x_deadline_ms, 0) / 1000, django_pool.config.deadline)
+
 @app.post("/progress/save/")
-async def save_progress(progress: ProgressData):
+async def save_progress(progress: ProgressData, deadline: Optional[float] = Depends(request_deadline)):
     """
     Save assessment progress to Django backend
     """
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{DJANGO_API_URL}/api/assessments/save-progress/",
-                json=progress.dict(),
-                timeout=30.0  # Add timeout for production
-            )
-            return response.json()
-        except Exception as e:
-            logger.error(f"Failed to save progress: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Failed to save progress: {str(e)}")
+    try:
+        response = await django_pool.post(
+            "/api/assessments/save-progress/",
+            json=progress.dict(),
+            deadline=deadline
+        )
+        return response.json()
+    except DeadlineExceeded as e:
+        logger.error(f"Failed to save progress: {str(e)}")
+        raise HTTPException(status_code=504, detail=f"Failed to save progress: {str(e)}")
+    except Exception as e:
+        logger.error(f"Failed to save progress: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to save progress: {str(e)}")
 
 @app.get("/progress/{user_id}/")
-async def get_progress(user_id: int):
+async def get_progress(user_id: int, deadline: Optional[float] = Depends(request_deadline)):
     """
     Retrieve assessment progress from Django backend
     """
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{DJANGO_API_URL}/api/assessments/get-progress/{user_id}/"
-            )
-            return response.json()
-        except Exception as e:
-            logger.error(f"Failed to get progress: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Failed to get progress: {str(e)}")
+    try:
+        response = await django_pool.get(
+            f"/api/assessments/get-progress/{user_id}/",
+            deadline=deadline
+        )
+        return response.json()
+    except DeadlineExceeded as e:
+        logger.error(f"Failed to get progress: {str(e)}")
+        raise HTTPException(status_code=504, detail=f"Failed to get progress: {str(e)}")
+    except Exception as e:
+        logger.error(f"Failed to get progress: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get progress: {str(e)}")
+
+@app.get("/pool/stats/")
+async def pool_stats():
+    return {django_pool.name: django_pool.stats()}
+
+@app.get("/metrics/")
+async def metrics():
+    """
+    Scoring stage timers, counters and batching histograms in Prometheus text format
+    """
+    if calculator.instrumentation is None and coalescer is None:
+        raise HTTPException(status_code=404, detail="Instrumentation is disabled")
+    sections = []
+    if calculator.instrumentation is not None:
+        sections.append(calculator.instrumentation.export_prometheus())
+    if coalescer is not None:
+        sections.append(coalescer.export_prometheus())
+    return Response(
+        content=''.join(sections),
+        media_type="text/plain; version=0.0.4"
+    )
+
+@app.get("/executor/stats/")
+async def executor_stats():
+    return executor.stats()
+
+@app.get("/cache/stats/")
+async def cache_stats():
+    return result_cache.stats()
 
 @app.get("/health/")
 async def health_check():
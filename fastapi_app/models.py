@@ -5,15 +5,28 @@ from datetime import datetime
 class Answer(BaseModel):
     question_id: int
     answer: int
-    gift_correlation: Dict[str, float]
+    # Omitted when the request references a question bank version
+    gift_correlation: Optional[Dict[str, float]] = None
 
 class AssessmentRequest(BaseModel):
     user_id: int | None = None
+    question_bank_version: Optional[str] = None
     answers: List[Answer]
     is_counselor_session: bool = False
     counselor_notes: Optional[str] = None
     session_date: Optional[datetime] = None
 
+class AssessmentRequestV2(BaseModel):
+    # Compact form: one 1-5 value per question, in the bank's question_ids
+    # order, either as a list or packed 3 bits each in base64
+    question_bank_version: str
+    answers: Optional[List[int]] = None
+    packed: Optional[str] = None
+    user_id: int | None = None
+
+class BatchAssessmentRequest(BaseModel):
+    assessments: List[AssessmentRequest]
+
 class GiftDescription(BaseModel):
     gift: str
     description: str
@@ -33,6 +46,15 @@ class GiftResult(BaseModel):
     class Config:
         arbitrary_types_allowed = True
 
+class BatchGiftResult(BaseModel):
+    results: List[GiftResult]
+
+class QuestionBankPayload(BaseModel):
+    version: str
+    question_ids: List[int]
+    weights: List[float]
+    gift_correlations: List[Dict[str, float]]
+
 class ProgressData(BaseModel):
     user_id: int
     assessment_id: int | None = None
@@ -0,0 +1,22 @@
+#fastapi_app/responses.py
+
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the stdlib encoder
+    orjson = None
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    Default response class for the FastAPI apps: orjson when installed,
+    otherwise exactly JSONResponse. Kept here rather than using
+    fastapi.responses.ORJSONResponse, which newer FastAPI releases deprecate.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
@@ -45,8 +45,7 @@ export default function TakeAssessmentPage() {
       ...answers,
       [question.id]: {
         question_id: question.id,
-        answer: value,
-        gift_correlation: question.gift_correlation
+        answer: value
       }
     });
 
@@ -63,12 +62,10 @@ export default function TakeAssessmentPage() {
 
     setSubmitting(true);
     try {
+      // Correlations are resolved server-side from the question bank
       const formattedAnswers = Object.values(answers).map(answer => ({
         question_id: answer.question_id,
-        answer: answer.answer,
-        gift_correlation: Object.fromEntries(
-          Object.entries(answer.gift_correlation).map(([k, v]) => [k.toUpperCase(), v])
-        )
+        answer: answer.answer
       }));
 
       const result = await assessmentApi.submitAnswers(formattedAnswers);
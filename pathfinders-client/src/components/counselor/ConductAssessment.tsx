@@ -42,8 +42,7 @@ const ConductAssessment: React.FC<ConductAssessmentProps> = ({
       // Initialize answers array
       const initialAnswers = questionData.map(q => ({
         question_id: q.id,
-        answer: 0,
-        gift_correlation: q.gift_correlation
+        answer: 0
       }));
       setAnswers(initialAnswers);
       
@@ -9,7 +9,6 @@ export interface Question {
 export interface Answer {
   question_id: number;
   answer: number;
-  gift_correlation: Record<string, number>;
 }
 
 export interface GiftScore {
@@ -11,6 +11,7 @@ import os
 from django.core.asgi import get_asgi_application
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi_app.responses import ORJSONResponse
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pathfinders_project.settings')
 
@@ -18,7 +19,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pathfinders_project.settings')
 django_application = get_asgi_application()
 
 # Initialize FastAPI application
-fastapi_application = FastAPI()
+fastapi_application = FastAPI(default_response_class=ORJSONResponse)
 
 # Add CORS middleware
 fastapi_application.add_middleware(
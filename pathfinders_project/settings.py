@@ -66,8 +66,17 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Debug only; logs N+1-style repeated queries per request
+    'core.query_inspector.QueryInspectorMiddleware',
 ]
 
+# Repeated-query detector (core/query_inspector.py): query shapes run
+# THRESHOLD or more times in one request are logged with their call sites
+QUERY_INSPECTOR = {
+    'ENABLED': os.getenv('QUERY_INSPECTOR', 'True') == 'True',
+    'THRESHOLD': int(os.getenv('QUERY_INSPECTOR_THRESHOLD', '3')),
+}
+
 ROOT_URLCONF = 'pathfinders_project.urls'
 
 TEMPLATES = [
@@ -197,6 +206,28 @@ DATABASES['default']['TEST'] = {
 
 FASTAPI_URL = os.getenv('FASTAPI_URL', 'http://127.0.0.1:8001')
 
+# Where gift calculations run, in failover order: inprocess, http, uds
+GIFT_CALCULATION_BACKENDS = os.getenv('GIFT_CALCULATION_BACKENDS', 'http').split(',')
+FASTAPI_UDS_PATH = os.getenv('FASTAPI_UDS_PATH', '')
+
+# Budget for one calculation across retries and backends, and when to stop
+# calling an unhealthy remote (consecutive failures, seconds until a probe)
+GIFT_CALCULATION_DEADLINE = float(os.getenv('GIFT_CALCULATION_DEADLINE', '5'))
+GIFT_BREAKER_FAILURES = int(os.getenv('GIFT_BREAKER_FAILURES', '5'))
+GIFT_BREAKER_RESET_SECONDS = float(os.getenv('GIFT_BREAKER_RESET_SECONDS', '30'))
+
+# Bearer token that lets a metrics scraper read /metrics/ without a staff login
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Completed assessments allowed per user (counselor sessions are exempt)
+ASSESSMENT_LIMIT = int(os.getenv('ASSESSMENT_LIMIT', '3'))
+
+# Rows scored and written per transaction by the bulk paper-assessment import
+ASSESSMENT_BULK_CHUNK_SIZE = int(os.getenv('ASSESSMENT_BULK_CHUNK_SIZE', '500'))
+
+# Browser caching of the (authenticated) question list; clients revalidate with its ETag
+QUESTION_BANK_CACHE_CONTROL = os.getenv('QUESTION_BANK_CACHE_CONTROL', 'private, max-age=300, must-revalidate')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
@@ -205,6 +236,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson-backed JSON (falls back to DRF's encoder when orjson is missing)
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # Cache configuration
@@ -230,6 +271,27 @@ else:
         }
     }
 
+# Memoized gift results (assessments/result_cache.py). The shared tier only
+# helps when the cache is shared between processes, i.e. not LocMemCache.
+GIFT_RESULT_CACHE = {
+    'MAX_ENTRIES': int(os.getenv('GIFT_RESULT_CACHE_ENTRIES', '4096')),
+    'SHARED': not (DEBUG or IS_DEVELOPMENT),
+    'TIMEOUT': 60 * 60 * 24,
+}
+
+# Write-behind buffer for progress-delta autosaves (assessments/progress_buffer.py):
+# buffered answers are written once they're FLUSH_INTERVAL seconds old or
+# MAX_PENDING are waiting, and on submit, session end and clean shutdown.
+# BACKGROUND_FLUSH runs a thread in each process that writes out idle sessions
+PROGRESS_BUFFER = {
+    'FLUSH_INTERVAL': float(os.getenv('PROGRESS_FLUSH_INTERVAL', '30')),
+    'MAX_PENDING': int(os.getenv('PROGRESS_MAX_PENDING', '50')),
+    'BACKGROUND_FLUSH': os.getenv('PROGRESS_BACKGROUND_FLUSH', 'True') == 'True',
+}
+
+# Seconds to cache each user's latest_results response; 0 disables it
+LATEST_RESULTS_CACHE_TIMEOUT = int(os.getenv('LATEST_RESULTS_CACHE_TIMEOUT', '300'))
+
 # AWS S3 settings - Only use in production
 if IS_PRODUCTION:
     AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
@@ -20,7 +20,7 @@ from rest_framework.routers import DefaultRouter
 from users.views import UserViewSet, ProfileViewSet, LoginView, LogoutView, CsrfTokenView
 from assessments.views import QuestionViewSet, AssessmentViewSet
 from books.views import BookViewSet, CareerChoiceViewSet, CareerResearchNoteViewSet
-from core.views import serve_frontend, health_check
+from core.views import serve_frontend, health_check, metrics
 from counselors.views import CounselorViewSet
 
 router = DefaultRouter()
@@ -36,6 +36,7 @@ router.register(r'counselors', CounselorViewSet, basename='counselor')
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('health/', health_check, name='health-check'),
+    path('metrics/', metrics, name='metrics'),
     path('api/', include([
         path('', include(router.urls)),
         path('auth/', include([
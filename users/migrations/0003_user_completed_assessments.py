@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:10
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_existing(apps, schema_editor):
+    """Backfill the counter from the assessments completed before this migration"""
+    User = apps.get_model('users', 'User')
+    Assessment = apps.get_model('assessments', 'Assessment')
+    completed = Assessment.objects.filter(
+        user=OuterRef('pk'), completion_status=True
+    ).values('user').annotate(count=Count('id')).values('count')
+    User.objects.update(completed_assessments=Coalesce(Subquery(completed), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_user_email_alter_user_username'),
+        ('assessments', '0002_giftprofile_materialized_results'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='completed_assessments',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_existing, migrations.RunPython.noop),
+    ]
@@ -23,6 +23,9 @@ class User(AbstractUser):
     username = models.CharField(max_length=150, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Completed assessments, maintained with F() updates where they complete;
+    # reconcile_assessment_counts repairs drift
+    completed_assessments = models.PositiveIntegerField(default=0)
     
     class Meta:
         ordering = ['-created_at']
@@ -33,6 +36,10 @@ class User(AbstractUser):
     
     def get_latest_gift_profile(self):
         """Get user's most recent gift profile"""
+        # Lists prefetch these newest first into latest_gift_profiles
+        prefetched = getattr(self, 'latest_gift_profiles', None)
+        if prefetched is not None:
+            return prefetched[0] if prefetched else None
         return self.giftprofile_set.order_by('-timestamp').first()
     
     def get_gift_progress(self):
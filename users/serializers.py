@@ -25,9 +25,20 @@ class UserSerializer(serializers.ModelSerializer):
                  'created_at', 'profile', 'assessment_count', 'latest_assessment')
         
     def get_assessment_count(self, obj):
+        # Lists annotate the count and the newest assessment's fields
+        if hasattr(obj, 'assessment_total'):
+            return obj.assessment_total
         return obj.assessment_set.count()
         
     def get_latest_assessment(self, obj):
+        if hasattr(obj, 'latest_assessment_id'):
+            if obj.latest_assessment_id is None:
+                return None
+            return {
+                'id': obj.latest_assessment_id,
+                'timestamp': obj.latest_assessment_timestamp,
+                'is_complete': bool(obj.latest_assessment_complete)
+            }
         latest = obj.assessment_set.order_by('-timestamp').first()
         if latest:
             return {